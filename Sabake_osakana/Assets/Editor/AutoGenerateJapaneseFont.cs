@@ -4,17 +4,22 @@ using UnityEditor;
 using TMPro;
 using TMPro.EditorUtilities;
 using System.Collections.Generic;
+using System.IO;
 
 /// <summary>
 /// 日本語TMPフォントアセットを自動生成するエディタスクリプト
 /// </summary>
 public class AutoGenerateJapaneseFont : Editor
 {
+    const string SubsetFontPath = "Assets/Fonts/Subset/x12y16pxMaruMonica.ttf";
+    const string SubsetCharactersPath = "Assets/Fonts/Subset/characters.txt";
+
     [MenuItem("Tools/Auto Generate Japanese Font Asset")]
     public static void GenerateJapaneseFont()
     {
         // フォントパス (MaruMonica ピクセルフォント)
-        string fontPath = "Assets/Fonts/x12y16pxMaruMonica.ttf";
+        // Tools/subset_fonts.py のサブセットがあればそちらを使う（ゲームで表示する文字だけ）
+        string fontPath = File.Exists(SubsetFontPath) ? SubsetFontPath : "Assets/Fonts/x12y16pxMaruMonica.ttf";
 
         // フォントをロード
         Font sourceFont = AssetDatabase.LoadAssetAtPath<Font>(fontPath);
@@ -122,6 +127,12 @@ public class AutoGenerateJapaneseFont : Editor
 
     static string GetGameCharacters()
     {
+        // Tools/subset_fonts.py が TextData.csv などから集めた文字セットがあればそれを使う
+        if (File.Exists(SubsetCharactersPath))
+        {
+            return File.ReadAllText(SubsetCharactersPath).TrimEnd('\n');
+        }
+
         // ASCII基本文字
         string ascii = " !\"#$%&'()*+,-./0123456789:;<=>?@ABCDEFGHIJKLMNOPQRSTUVWXYZ[\\]^_`abcdefghijklmnopqrstuvwxyz{|}~";
 
@@ -8,11 +8,14 @@ using System.IO;
 /// </summary>
 public class CreateJapaneseFontAsset
 {
+    const string SubsetFontPath = "Assets/Fonts/Subset/meiryo.ttf";
+    const string SubsetCharactersPath = "Assets/Fonts/Subset/characters.txt";
+
     [MenuItem("Tools/Create Japanese TMP Font (Auto)")]
     public static void CreateFont()
     {
-        // Meiryoフォントのパス
-        string fontPath = "Assets/Fonts/meiryo.ttc";
+        // Meiryoフォントのパス（Tools/subset_fonts.py のサブセットがあればそちらを使う）
+        string fontPath = File.Exists(SubsetFontPath) ? SubsetFontPath : "Assets/Fonts/meiryo.ttc";
         Font sourceFont = AssetDatabase.LoadAssetAtPath<Font>(fontPath);
 
         if (sourceFont == null)
@@ -61,7 +64,7 @@ public class CreateJapaneseFontAsset
             "TMP Font Assetの自動生成には Font Asset Creator を使用する必要があります。\n\n" +
             "手順:\n" +
             "1. Window > TextMeshPro > Font Asset Creator を開く\n" +
-            "2. Source Font: Assets/Fonts/meiryo.ttc\n" +
+            "2. Source Font: " + fontPath + "\n" +
             "3. Atlas Resolution: 2048 x 2048\n" +
             "4. Character Set: Custom Characters\n" +
             "5. 「Copy Characters」ボタンで文字をコピー\n" +
@@ -78,6 +81,12 @@ public class CreateJapaneseFontAsset
 
     static string GetGameCharacters()
     {
+        // Tools/subset_fonts.py が TextData.csv などから集めた文字セットがあればそれを使う
+        if (File.Exists(SubsetCharactersPath))
+        {
+            return File.ReadAllText(SubsetCharactersPath).TrimEnd('\n');
+        }
+
         // ASCII
         string ascii = " !\"#$%&'()*+,-./0123456789:;<=>?@ABCDEFGHIJKLMNOPQRSTUVWXYZ[\\]^_`abcdefghijklmnopqrstuvwxyz{|}~";
 
@@ -24,6 +24,10 @@ public class BallController : MonoBehaviour
     private Vector3 offsetFromPaddle = new Vector3(0, 0.5f, 0);
     private Transform knifeVisual;  // 包丁の見た目（回転用）
     private const float KNIFE_ROTATION_OFFSET = -50f;  // 包丁画像の初期向きオフセット（Twemoji用）
+    #if KNIFE_ROTATION_SHEETS
+    private SpriteRenderer knifeRenderer;
+    private KnifeRotationSheet knifeSheet;  // 回転済みシート（あれば Transform を回さずコマを差し替える）
+    #endif
 
     void Awake()
     {
@@ -127,6 +131,10 @@ public class BallController : MonoBehaviour
             sr.sprite = knifeSprite;
             sr.color = Color.white;
             Debug.Log("[BallController] Knife sprite loaded");
+            #if KNIFE_ROTATION_SHEETS
+            knifeRenderer = sr;
+            knifeSheet = KnifeRotationSheet.Load("knife");
+            #endif
         }
         else
         {
@@ -161,6 +169,13 @@ public class BallController : MonoBehaviour
         // 進行方向から角度を計算
         float angle = Mathf.Atan2(direction.y, direction.x) * Mathf.Rad2Deg;
         // オフセットを適用して切っ先が進行方向を向くように
+        #if KNIFE_ROTATION_SHEETS
+        if (knifeSheet != null)
+        {
+            knifeRenderer.sprite = knifeSheet.FrameFor(angle - KNIFE_ROTATION_OFFSET);
+            return;
+        }
+        #endif
         knifeVisual.rotation = Quaternion.Euler(0, 0, angle - KNIFE_ROTATION_OFFSET);
     }
 
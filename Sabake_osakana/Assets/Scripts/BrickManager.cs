@@ -37,6 +37,7 @@ public class BrickManager : MonoBehaviour
     private GameObject bricksParent;
     private GameObject boneBackground;
     private Texture2D fishTexture;
+    private SpriteTrimData.Entry fishTrim;  // 透明な縁を切り落とした場合の元サイズとオフセット
     private Material brickMaterial;
     private Vector2 calculatedStartPos;
 
@@ -156,7 +157,7 @@ public class BrickManager : MonoBehaviour
         if (!autoAdjustToImage || fishTexture == null) return;
 
         // 画像のアスペクト比
-        float imageAspect = (float)fishTexture.width / fishTexture.height;
+        float imageAspect = (float)fishTrim.sourceWidth / fishTrim.sourceHeight;
 
         // 画像全体が収まるようにブロックサイズを計算
         brickHeight = (gridCols * brickWidth) / (gridRows * imageAspect);
@@ -171,8 +172,11 @@ public class BrickManager : MonoBehaviour
     {
         if (fishTexture == null) return;
 
-        float pixelWidth = (float)fishTexture.width / gridCols;
-        float pixelHeight = (float)fishTexture.height / gridRows;
+        // 焼き込み済みパターンがあればテクスチャのサンプリングを省略
+        if (LoadBakedPattern()) return;
+
+        float pixelWidth = (float)fishTrim.sourceWidth / gridCols;
+        float pixelHeight = (float)fishTrim.sourceHeight / gridRows;
 
         // 各セルの中央付近のアルファ値をサンプリング
         for (int row = 0; row < gridRows; row++)
@@ -190,6 +194,55 @@ public class BrickManager : MonoBehaviour
         Debug.Log($"[BrickManager] GeneratePatternFromImage: Pattern regenerated from image alpha");
     }
 
+    /// <summary>
+    /// Tools/bake_brick_patterns.py で事前計算したパターンを読み込む
+    /// （Resources/BrickPatterns/stage_{id}.txt）
+    /// 魚画像・グリッドサイズ・テクスチャサイズが現在のステージと一致する場合のみ使用
+    /// </summary>
+    bool LoadBakedPattern()
+    {
+        TextAsset bakedAsset = Resources.Load<TextAsset>($"BrickPatterns/stage_{stageId}");
+        if (bakedAsset == null) return false;
+
+        string expectedImage = $"fish_image={fishImagePath}";
+        string expectedGrid = $"grid={gridCols}x{gridRows}";
+        string expectedTexture = $"texture={fishTrim.sourceWidth}x{fishTrim.sourceHeight}";
+
+        int[,] pattern = new int[gridRows, gridCols];
+        int row = 0;
+        bool headerMatched = false;
+        foreach (string line in bakedAsset.text.Split('\n'))
+        {
+            string trimmed = line.Trim();
+            if (string.IsNullOrEmpty(trimmed)) continue;
+
+            if (trimmed.StartsWith("#"))
+            {
+                var tokens = new System.Collections.Generic.List<string>(trimmed.Substring(1).Trim().Split(' '));
+                if (!tokens.Contains(expectedImage) || !tokens.Contains(expectedGrid) || !tokens.Contains(expectedTexture))
+                {
+                    Debug.LogWarning($"[BrickManager] LoadBakedPattern: Baked pattern does not match stage ({trimmed}), sampling texture instead");
+                    return false;
+                }
+                headerMatched = true;
+                continue;
+            }
+
+            if (row >= gridRows || trimmed.Length != gridCols) return false;
+            for (int col = 0; col < gridCols; col++)
+            {
+                pattern[row, col] = (trimmed[col] == '1') ? 1 : 0;
+            }
+            row++;
+        }
+
+        if (!headerMatched || row != gridRows) return false;
+
+        fishPattern = pattern;
+        Debug.Log($"[BrickManager] LoadBakedPattern: Loaded baked pattern for stage {stageId}");
+        return true;
+    }
+
     float SampleAverageAlpha(int col, int row, float pixelWidth, float pixelHeight)
     {
         float totalAlpha = 0f;
@@ -203,11 +256,18 @@ public class BrickManager : MonoBehaviour
                 int px = Mathf.RoundToInt((col + dx) * pixelWidth);
                 int py = Mathf.RoundToInt((gridRows - 1 - row + dy) * pixelHeight);
 
-                px = Mathf.Clamp(px, 0, fishTexture.width - 1);
-                py = Mathf.Clamp(py, 0, fishTexture.height - 1);
+                px = Mathf.Clamp(px, 0, fishTrim.sourceWidth - 1) - fishTrim.offsetX;
+                py = Mathf.Clamp(py, 0, fishTrim.sourceHeight - 1) - fishTrim.offsetY;
+
+                // 縮小したテクスチャ（解像度ティア）ではテクスチャのピクセルに換算
+                int tx = Mathf.FloorToInt(px * fishTrim.scale);
+                int ty = Mathf.FloorToInt(py * fishTrim.scale);
 
-                Color pixel = fishTexture.GetPixel(px, py);
-                totalAlpha += pixel.a;
+                // 切り落とした縁は透明
+                if (px >= 0 && tx < fishTexture.width && py >= 0 && ty < fishTexture.height)
+                {
+                    totalAlpha += fishTexture.GetPixel(tx, ty).a;
+                }
                 sampleCount++;
             }
         }
@@ -290,8 +350,9 @@ public class BrickManager : MonoBehaviour
             sr.sprite = boneSprite;
             sr.color = Color.white;
 
-            // 画像のアスペクト比を保持してフィット
-            float imageAspect = (float)boneSprite.texture.width / boneSprite.texture.height;
+            // 画像のアスペクト比を保持してフィット（トリミング済みなら元画像のサイズで計算）
+            SpriteTrimData.Entry boneTrim = SpriteTrimData.Get("Sprites/bone_image", boneSprite.texture);
+            float imageAspect = (float)boneTrim.sourceWidth / boneTrim.sourceHeight;
             float targetAspect = totalWidth / totalHeight;
 
             float scaleX, scaleY;
@@ -311,8 +372,8 @@ public class BrickManager : MonoBehaviour
             // ピクセル単位からワールド単位へ変換
             float pixelsPerUnit = boneSprite.pixelsPerUnit;
             boneBackground.transform.localScale = new Vector3(
-                scaleX / (boneSprite.texture.width / pixelsPerUnit),
-                scaleY / (boneSprite.texture.height / pixelsPerUnit),
+                scaleX / (boneTrim.sourceWidth * boneTrim.scale / pixelsPerUnit),
+                scaleY / (boneTrim.sourceHeight * boneTrim.scale / pixelsPerUnit),
                 1
             );
 
@@ -364,6 +425,8 @@ public class BrickManager : MonoBehaviour
             shader = Shader.Find("Sprites/Default");
         }
 
+        fishTrim = SpriteTrimData.Get(fishImagePath, fishTexture);
+
         brickMaterial = new Material(shader);
         brickMaterial.mainTexture = fishTexture;
 
@@ -405,18 +468,35 @@ public class BrickManager : MonoBehaviour
                     SpriteRenderer sr = brick.GetComponent<SpriteRenderer>();
                     if (sr != null && fishTexture != null)
                     {
-                        float pixelWidth = (float)fishTexture.width / gridCols;
-                        float pixelHeight = (float)fishTexture.height / gridRows;
-                        float pixelX = col * pixelWidth;
-                        float pixelY = (gridRows - 1 - row) * pixelHeight;
-
-                        Rect spriteRect = new Rect(pixelX, pixelY, pixelWidth, pixelHeight);
-                        Vector2 pivot = new Vector2(0.5f, 0.5f);
-                        float pixelsPerUnit = pixelWidth / brickWidth;
-                        Sprite brickSprite = Sprite.Create(fishTexture, spriteRect, pivot, pixelsPerUnit);
-
-                        sr.sprite = brickSprite;
-                        sr.color = Color.white;
+                        float pixelWidth = (float)fishTrim.sourceWidth / gridCols;
+                        float pixelHeight = (float)fishTrim.sourceHeight / gridRows;
+                        float pixelX = col * pixelWidth - fishTrim.offsetX;
+                        float pixelY = (gridRows - 1 - row) * pixelHeight - fishTrim.offsetY;
+
+                        // トリミング済みテクスチャに収まる部分だけ切り出し、ピボットでセル中央を合わせる
+                        // （縮小したテクスチャでは scale でテクスチャのピクセルに換算）
+                        float texScale = fishTrim.scale;
+                        Rect cellRect = new Rect(pixelX * texScale, pixelY * texScale,
+                                                 pixelWidth * texScale, pixelHeight * texScale);
+                        Rect spriteRect = Rect.MinMaxRect(
+                            Mathf.Max(cellRect.xMin, 0f), Mathf.Max(cellRect.yMin, 0f),
+                            Mathf.Min(cellRect.xMax, fishTexture.width), Mathf.Min(cellRect.yMax, fishTexture.height));
+                        if (spriteRect.width > 0f && spriteRect.height > 0f)
+                        {
+                            Vector2 pivot = new Vector2(
+                                (cellRect.center.x - spriteRect.xMin) / spriteRect.width,
+                                (cellRect.center.y - spriteRect.yMin) / spriteRect.height);
+                            float pixelsPerUnit = pixelWidth * texScale / brickWidth;
+                            Sprite brickSprite = Sprite.Create(fishTexture, spriteRect, pivot, pixelsPerUnit);
+
+                            sr.sprite = brickSprite;
+                            sr.color = Color.white;
+                        }
+                        else
+                        {
+                            // セル全体が切り落とした縁（透明）
+                            sr.enabled = false;
+                        }
                         brick.transform.localScale = Vector3.one;
                     }
                     else if (sr != null)
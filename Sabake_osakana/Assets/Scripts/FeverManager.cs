@@ -166,7 +166,9 @@ public class FeverManager : MonoBehaviour
         if (fishSprite != null)
         {
             sr.sprite = fishSprite;
-            float scale = targetFishSize / (fishSprite.texture.width / fishSprite.pixelsPerUnit);
+            // トリミング済みなら元画像の幅を基準にする（ピボットは .meta で元画像の中央に合わせてある）
+            SpriteTrimData.Entry trim = SpriteTrimData.Get("Sprites/sakana_normal", fishSprite.texture);
+            float scale = targetFishSize / (trim.sourceWidth * trim.scale / fishSprite.pixelsPerUnit);
             currentTargetFish.transform.localScale = Vector3.one * scale;
         }
 
@@ -307,7 +309,8 @@ public class FeverManager : MonoBehaviour
             if (fishSprite != null)
             {
                 fishSr.sprite = fishSprite;
-                float scale = 0.8f / (fishSprite.texture.width / fishSprite.pixelsPerUnit);
+                SpriteTrimData.Entry trim = SpriteTrimData.Get("Sprites/sakana_normal", fishSprite.texture);
+                float scale = 0.8f / (trim.sourceWidth * trim.scale / fishSprite.pixelsPerUnit);
                 fish.transform.localScale = Vector3.one * scale;
             }
 
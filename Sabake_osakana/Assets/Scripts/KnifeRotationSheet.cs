@@ -0,0 +1,105 @@
+using UnityEngine;
+using System.Collections.Generic;
+
+/// <summary>
+/// Tools/bake_knife_rotations.py で回転済みにした包丁のスプライトシート
+/// Resources/Sprites/KnifeRotations/&lt;name&gt;_&lt;FrameCount&gt;.png と対応表（_frames.csv）からコマを作り、
+/// 角度に一番近いコマを返す。スクリプティングシンボル KNIFE_ROTATION_SHEETS を定義したビルドで、
+/// BallController / SubBall が Transform の回転の代わりに使う
+/// </summary>
+public class KnifeRotationSheet
+{
+    /// <summary>
+    /// シートの方向数（bake_knife_rotations.py の DEFAULT_FRAMES と合わせる）
+    /// </summary>
+    public const int FrameCount = 32;
+
+    private static Dictionary<string, KnifeRotationSheet> sheets = new Dictionary<string, KnifeRotationSheet>();
+
+    private readonly Sprite[] frames;
+    private readonly float step;
+
+    private KnifeRotationSheet(Sprite[] frames)
+    {
+        this.frames = frames;
+        step = 360f / frames.Length;
+    }
+
+    /// <summary>
+    /// 包丁の名前（"knife" など。Resources にあるのは bake_knife_rotations.py の GAME_KNIVES だけ）のシートを読み込む（同じ名前は使い回す）
+    /// シートがなければ null（呼び出し側は Transform の回転に戻す）
+    /// </summary>
+    public static KnifeRotationSheet Load(string name)
+    {
+        if (sheets.TryGetValue(name, out KnifeRotationSheet cached)) return cached;
+
+        string path = $"Sprites/KnifeRotations/{name}_{FrameCount}";
+        Texture2D texture = Resources.Load<Texture2D>(path);
+        TextAsset csvAsset = Resources.Load<TextAsset>($"{path}_frames");
+        KnifeRotationSheet sheet = null;
+        if (texture != null && csvAsset != null)
+        {
+            Sprite[] frames = ParseCSV(csvAsset.text, texture, name);
+            if (frames != null)
+            {
+                sheet = new KnifeRotationSheet(frames);
+                Debug.Log($"[KnifeRotationSheet] Loaded {path} ({frames.Length} frames)");
+            }
+        }
+        else
+        {
+            Debug.LogWarning($"[KnifeRotationSheet] {path} not found, using runtime rotation");
+        }
+
+        sheets[name] = sheet;
+        return sheet;
+    }
+
+    private static Sprite[] ParseCSV(string csvText, Texture2D texture, string name)
+    {
+        var frames = new List<Sprite>();
+        foreach (string line in csvText.Split('\n'))
+        {
+            string trimmed = line.Trim();
+            if (string.IsNullOrEmpty(trimmed) || trimmed.StartsWith("#")) continue;
+
+            string[] parts = trimmed.Split(',');
+            if (parts.Length < 7 || parts[0] == "frame") continue; // ヘッダー行スキップ
+
+            // 矩形は整数とは限らない（export_resolution_tiers.py で縮小したシートは 20.5 などになる）
+            if (TryParseFloat(parts[2], out float x) &&
+                TryParseFloat(parts[3], out float y) &&
+                TryParseFloat(parts[4], out float width) &&
+                TryParseFloat(parts[5], out float height) &&
+                TryParseFloat(parts[6], out float pixelsPerUnit))
+            {
+                Sprite sprite = Sprite.Create(texture, new Rect(x, y, width, height),
+                                              new Vector2(0.5f, 0.5f), pixelsPerUnit, 0, SpriteMeshType.FullRect);
+                sprite.name = $"{name}_{frames.Count}";
+                frames.Add(sprite);
+            }
+        }
+
+        if (frames.Count != FrameCount)
+        {
+            Debug.LogWarning($"[KnifeRotationSheet] {name}: expected {FrameCount} frames, found {frames.Count}");
+            return null;
+        }
+        return frames.ToArray();
+    }
+
+    private static bool TryParseFloat(string text, out float value)
+    {
+        return float.TryParse(text, System.Globalization.NumberStyles.Float,
+                              System.Globalization.CultureInfo.InvariantCulture, out value);
+    }
+
+    /// <summary>
+    /// Z 軸の回転角（度、Quaternion.Euler(0, 0, rotation) と同じ向き）に一番近いコマ
+    /// </summary>
+    public Sprite FrameFor(float rotation)
+    {
+        int index = Mathf.RoundToInt(Mathf.Repeat(rotation, 360f) / step) % frames.Length;
+        return frames[index];
+    }
+}
@@ -0,0 +1,114 @@
+using UnityEngine;
+using System.Collections.Generic;
+
+/// <summary>
+/// Tools/trim_sprites.py で透明な縁を切り落としたスプライトの元サイズとオフセット
+/// Resources/SpriteTrim.csv から読み込み、元画像の座標で配置を計算するために使う
+/// </summary>
+public static class SpriteTrimData
+{
+    /// <summary>
+    /// トリミング情報（offset は元画像の左下からの位置、Texture2D と同じ座標）
+    /// 数値はすべて元画像のピクセル。テクスチャのピクセルへは scale を掛けて換算する
+    /// </summary>
+    public struct Entry
+    {
+        public int sourceWidth;
+        public int sourceHeight;
+        public int offsetX;
+        public int offsetY;
+        public int width;
+        public int height;
+        public float scale;  // テクスチャのピクセル / 元画像のピクセル（解像度ティアで縮小したテクスチャなら 1 未満）
+
+        public bool IsTrimmed => width != sourceWidth || height != sourceHeight;
+    }
+
+    private static Dictionary<string, Entry> entries = new Dictionary<string, Entry>();
+    private static bool isInitialized = false;
+
+    /// <summary>
+    /// CSVからトリミング情報を読み込む
+    /// </summary>
+    public static void Initialize()
+    {
+        if (isInitialized) return;
+
+        TextAsset csvAsset = Resources.Load<TextAsset>("SpriteTrim");
+        if (csvAsset != null)
+        {
+            ParseCSV(csvAsset.text);
+            Debug.Log($"[SpriteTrimData] Loaded {entries.Count} trimmed sprites");
+        }
+        isInitialized = true;
+    }
+
+    private static void ParseCSV(string csvText)
+    {
+        foreach (string line in csvText.Split('\n'))
+        {
+            string trimmed = line.Trim();
+            if (string.IsNullOrEmpty(trimmed) || trimmed.StartsWith("#")) continue;
+
+            string[] parts = trimmed.Split(',');
+            if (parts.Length < 7 || parts[0] == "sprite") continue; // ヘッダー行スキップ
+
+            if (int.TryParse(parts[1], out int sourceWidth) &&
+                int.TryParse(parts[2], out int sourceHeight) &&
+                int.TryParse(parts[3], out int offsetX) &&
+                int.TryParse(parts[4], out int offsetY) &&
+                int.TryParse(parts[5], out int width) &&
+                int.TryParse(parts[6], out int height))
+            {
+                entries[parts[0].Trim()] = new Entry
+                {
+                    sourceWidth = sourceWidth,
+                    sourceHeight = sourceHeight,
+                    offsetX = offsetX,
+                    offsetY = offsetY,
+                    width = width,
+                    height = height,
+                    scale = 1f,
+                };
+            }
+        }
+    }
+
+    /// <summary>
+    /// Resources パスのテクスチャのトリミング情報を取得
+    /// Tools/export_resolution_tiers.py で縮小したテクスチャなら縮小率を scale に入れる
+    /// トリミングしていない（または記録とサイズが合わない）場合はテクスチャ全体を元画像とみなす
+    /// </summary>
+    public static Entry Get(string resourcePath, Texture2D texture)
+    {
+        Initialize();
+
+        if (entries.TryGetValue(resourcePath, out Entry entry))
+        {
+            if (entry.width == texture.width && entry.height == texture.height)
+            {
+                return entry;
+            }
+
+            // 解像度ティア: 縦横とも同じ率で縮小されていれば（端数の丸めで1ピクセルまでの差は許す）
+            float scale = (float)texture.width / entry.width;
+            if (scale < 1f && Mathf.Abs(entry.height * scale - texture.height) <= 1f)
+            {
+                entry.scale = scale;
+                return entry;
+            }
+            Debug.LogWarning($"[SpriteTrimData] {resourcePath}: texture size {texture.width}x{texture.height} does not match SpriteTrim.csv, ignoring trim data");
+        }
+
+        return new Entry
+        {
+            sourceWidth = texture.width,
+            sourceHeight = texture.height,
+            offsetX = 0,
+            offsetY = 0,
+            width = texture.width,
+            height = texture.height,
+            scale = 1f,
+        };
+    }
+}
@@ -17,6 +17,9 @@ public class SubBall : MonoBehaviour
     private Color ballColor;
     private bool isLaunched = false;
     private GameObject knifeVisual;
+    #if KNIFE_ROTATION_SHEETS
+    private KnifeRotationSheet knifeSheet;  // 回転済みシート（あれば Transform を回さずコマを差し替える）
+    #endif
     private TrailRenderer trail;
 
     /// <summary>
@@ -74,6 +77,9 @@ public class SubBall : MonoBehaviour
             float targetSize = 1.0f;  // 1.25倍に拡大（0.8 → 1.0）
             float scale = targetSize / (knifeSprite.texture.width / knifeSprite.pixelsPerUnit);
             knifeVisual.transform.localScale = Vector3.one * scale;
+            #if KNIFE_ROTATION_SHEETS
+            knifeSheet = KnifeRotationSheet.Load("knife");
+            #endif
         }
         else
         {
@@ -243,6 +249,13 @@ public class SubBall : MonoBehaviour
         {
             float angle = Mathf.Atan2(velocity.y, velocity.x) * Mathf.Rad2Deg;
             // メインボールと同じ回転式を使用
+            #if KNIFE_ROTATION_SHEETS
+            if (knifeSheet != null)
+            {
+                spriteRenderer.sprite = knifeSheet.FrameFor(angle - KNIFE_ROTATION_OFFSET);
+                return;
+            }
+            #endif
             knifeVisual.transform.rotation = Quaternion.Euler(0, 0, angle - KNIFE_ROTATION_OFFSET);
         }
     }
@@ -0,0 +1,382 @@
+#!/usr/bin/env python3
+"""
+SimulationLogger のセッションログ（Logs/simulation_*.json）を集計するスクリプト
+
+ログは {"t","event","data"} のレコードを並べた1つの巨大な JSON 配列なので、
+json.load で読むとセッションの長さに比例してメモリを使う。
+ここではファイルを一定サイズずつ読みながらレコードを1件ずつ取り出し（メモリは読み込み単位で頭打ち）、
+集計値だけを積み上げる。
+
+SimulationLogger.SerializeData は bool を True / False のまま書き出す（JSON として不正）ため、
+読み込み時に true / false に直している。
+
+集計内容:
+  イベント種別ごとの件数
+  ボール位置の2次元ヒストグラム、パドル位置のヒストグラム（STATUS の "x,y" 文字列を数値化）
+  ゲームごとの結果（全ブロック破壊までの時間、クリア率、最終きりみ）
+  経過時間ごとのきりみ獲得ペースと破壊率の曲線（全ゲームの平均）
+
+使い方:
+  python analyze_simulation_log.py ../Logs/simulation_20240101_120000.json
+  python analyze_simulation_log.py ../Logs/*.json -j 8 --json summary.json
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from collections import Counter
+import numpy as np
+import argparse
+import glob
+import json
+import math
+import os
+import re
+import time
+
+DEFAULT_LOG_DIR = "../Logs"
+
+# 1回に読み込むバイト数
+CHUNK_SIZE = 1 << 20
+
+# 位置をヒストグラムに流し込む単位（STATUS の件数）
+POSITION_BUFFER = 4096
+
+# ヒストグラムの範囲（SampleScene のカメラ: orthographic size 10、16:9 の画面全体）
+X_RANGE = (-18.0, 18.0)
+Y_RANGE = (-10.0, 10.0)
+BIN_SIZE = 0.5
+
+# 曲線の時間刻み（秒）
+CURVE_BUCKET = 5.0
+
+# C# の bool.ToString() を JSON のリテラルに直す
+_BOOL_PATTERN = re.compile(r"(?<=:)(True|False)(?=\s*[,}])")
+_WHITESPACE = re.compile(r"[\s,\[\]]*")
+
+
+def iter_records(path, chunk_size=CHUNK_SIZE):
+    """
+    ログのレコードを先頭から1件ずつ返す
+    配列の括弧・区切りのカンマは読み飛ばし、壊れた行と書き込み途中で切れた末尾は無視する
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    pos = 0
+    eof = False
+    with open(path, encoding="utf-8-sig") as f:
+        while True:
+            # バッファは切り詰めずに読み位置だけ進める（レコードごとのコピーを避ける）
+            pos = _WHITESPACE.match(buffer, pos).end()
+            try:
+                record, pos = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                # 1行1レコードなので、行が揃っているのに読めないレコードは飛ばす
+                newline = buffer.find("\n", pos)
+                if newline != -1:
+                    pos = newline + 1
+                    continue
+                if eof:
+                    return
+                chunk = f.read(chunk_size)
+                eof = not chunk
+                buffer = _BOOL_PATTERN.sub(lambda m: m.group(1).lower(), buffer[pos:] + chunk)
+                pos = 0
+                continue
+            yield record
+
+
+def parse_position(text):
+    """STATUS の "x,y" / "x" 文字列を float のタプルにする（"null" は None）"""
+    if not isinstance(text, str) or text == "null":
+        return None
+    try:
+        return tuple(float(v) for v in text.split(","))
+    except ValueError:
+        return None
+
+
+class GameTracker:
+    """1ゲーム分（発射からGAME_CLEAR / GAME_OVERまで）の途中経過"""
+
+    def __init__(self, start_t):
+        self.start_t = start_t
+        self.all_clear_t = None
+        # 曲線用: 時間刻みごとの最後の (きりみ, 破壊率)
+        self.kirimi = {}
+        self.progress = {}
+
+    def status(self, t, data):
+        bucket = int((t - self.start_t) // CURVE_BUCKET)
+        self.kirimi[bucket] = data.get("kirimi", 0)
+        total = data.get("totalBricks", 0)
+        if total:
+            destroyed = data.get("destroyedBricks", 0)
+            self.progress[bucket] = destroyed / total
+            if destroyed >= total and self.all_clear_t is None:
+                self.all_clear_t = t
+
+
+class LogSummary:
+    """
+    ログの集計値（件数・ヒストグラム・ゲームごとの結果・曲線）
+    ファイルごとに作って merge で合算できる
+    """
+
+    def __init__(self):
+        self.files = 0
+        self.records = 0
+        self.events = Counter()
+        x_bins = int(round((X_RANGE[1] - X_RANGE[0]) / BIN_SIZE))
+        y_bins = int(round((Y_RANGE[1] - Y_RANGE[0]) / BIN_SIZE))
+        self.x_edges = np.linspace(*X_RANGE, x_bins + 1)
+        self.y_edges = np.linspace(*Y_RANGE, y_bins + 1)
+        self.ball_hist = np.zeros((x_bins, y_bins), dtype=np.int64)
+        self.paddle_hist = np.zeros(x_bins, dtype=np.int64)
+        self.games = []
+        # 時間刻みごとの合計と件数（平均を出すため）
+        self.kirimi_curve = np.zeros(0)
+        self.progress_curve = np.zeros(0)
+        self.curve_counts = np.zeros(0, dtype=np.int64)
+
+        self._ball_buffer = np.empty((POSITION_BUFFER, 2))
+        self._paddle_buffer = np.empty(POSITION_BUFFER)
+        self._ball_count = 0
+        self._paddle_count = 0
+        self._game = None
+
+    # --- 読み込み ---
+
+    def add_file(self, path):
+        self.files += 1
+        for record in iter_records(path):
+            self.add_record(record)
+        self._flush_positions()
+        self._game = None
+
+    def add_record(self, record):
+        self.records += 1
+        event = record.get("event", "")
+        data = record.get("data") or {}
+        t = float(record.get("t", 0.0))
+        self.events[event] += 1
+
+        if event == "BALL_LAUNCHED" and self._game is None:
+            self._game = GameTracker(t)
+        elif event == "STATUS":
+            self._add_positions(data)
+            if self._game is not None:
+                self._game.status(t, data)
+        elif event in ("GAME_CLEAR", "GAME_OVER") and self._game is not None:
+            self._finish_game(event, t, data)
+
+    def _add_positions(self, data):
+        ball = parse_position(data.get("ballPos"))
+        if ball is not None and len(ball) == 2:
+            self._ball_buffer[self._ball_count] = ball
+            self._ball_count += 1
+        paddle = parse_position(data.get("paddlePos"))
+        if paddle is not None:
+            self._paddle_buffer[self._paddle_count] = paddle[0]
+            self._paddle_count += 1
+        if self._ball_count == POSITION_BUFFER or self._paddle_count == POSITION_BUFFER:
+            self._flush_positions()
+
+    def _flush_positions(self):
+        """バッファにたまった位置をまとめてヒストグラムに足す（範囲外は端のビンに入れる）"""
+        if self._ball_count:
+            ball = self._ball_buffer[:self._ball_count]
+            x = np.clip(ball[:, 0], X_RANGE[0], X_RANGE[1] - 1e-9)
+            y = np.clip(ball[:, 1], Y_RANGE[0], Y_RANGE[1] - 1e-9)
+            hist, _, _ = np.histogram2d(x, y, bins=(self.x_edges, self.y_edges))
+            self.ball_hist += hist.astype(np.int64)
+            self._ball_count = 0
+        if self._paddle_count:
+            x = np.clip(self._paddle_buffer[:self._paddle_count], X_RANGE[0], X_RANGE[1] - 1e-9)
+            self.paddle_hist += np.histogram(x, bins=self.x_edges)[0]
+            self._paddle_count = 0
+
+    def _finish_game(self, event, t, data):
+        game = self._game
+        self.games.append({
+            "result": event,
+            "duration": round(t - game.start_t, 3),
+            "all_clear_time": (round(game.all_clear_t - game.start_t, 3)
+                               if game.all_clear_t is not None else None),
+            "clear_percentage": data.get("clearPercentage"),
+            "final_kirimi": data.get("finalKirimi"),
+            "rank": data.get("rank"),
+        })
+        self._add_curve(game)
+        self._game = None
+
+    def _add_curve(self, game):
+        if not game.kirimi:
+            return
+        length = max(game.kirimi) + 1
+        self._grow_curves(length)
+        # STATUS のなかった刻みは直前の値で埋める
+        kirimi = progress = 0.0
+        for bucket in range(length):
+            kirimi = game.kirimi.get(bucket, kirimi)
+            progress = game.progress.get(bucket, progress)
+            self.kirimi_curve[bucket] += kirimi
+            self.progress_curve[bucket] += progress
+            self.curve_counts[bucket] += 1
+
+    def _grow_curves(self, length):
+        extra = length - self.curve_counts.size
+        if extra > 0:
+            self.kirimi_curve = np.concatenate([self.kirimi_curve, np.zeros(extra)])
+            self.progress_curve = np.concatenate([self.progress_curve, np.zeros(extra)])
+            self.curve_counts = np.concatenate([self.curve_counts, np.zeros(extra, dtype=np.int64)])
+
+    # --- 合算と出力 ---
+
+    def merge(self, other):
+        self.files += other.files
+        self.records += other.records
+        self.events.update(other.events)
+        self.ball_hist += other.ball_hist
+        self.paddle_hist += other.paddle_hist
+        self.games.extend(other.games)
+        self._grow_curves(other.curve_counts.size)
+        n = other.curve_counts.size
+        self.kirimi_curve[:n] += other.kirimi_curve
+        self.progress_curve[:n] += other.progress_curve
+        self.curve_counts[:n] += other.curve_counts
+        return self
+
+    def curves(self):
+        """
+        時間刻みごとの平均（その時刻まで続いたゲームだけで平均する）
+        kirimi_rate はきりみの増加ペース（個/秒）
+        """
+        counts = np.maximum(self.curve_counts, 1)
+        kirimi = self.kirimi_curve / counts
+        rate = np.diff(kirimi, prepend=0.0) / CURVE_BUCKET
+        return [{"t": (i + 1) * CURVE_BUCKET, "games": int(self.curve_counts[i]),
+                 "kirimi": round(float(kirimi[i]), 2), "kirimi_rate": round(float(rate[i]), 3),
+                 "progress": round(float(self.progress_curve[i] / counts[i]), 4)}
+                for i in range(self.curve_counts.size)]
+
+    def to_dict(self):
+        clear_times = [g["all_clear_time"] for g in self.games if g["all_clear_time"] is not None]
+        return {
+            "files": self.files,
+            "records": self.records,
+            "events": dict(self.events.most_common()),
+            "games": self.games,
+            "all_clear_time": _distribution(clear_times),
+            "clear_percentage": _distribution([g["clear_percentage"] for g in self.games
+                                               if g["clear_percentage"] is not None]),
+            "curves": self.curves(),
+            "histogram": {
+                "x_edges": self.x_edges.tolist(),
+                "y_edges": self.y_edges.tolist(),
+                "ball": self.ball_hist.tolist(),
+                "paddle": self.paddle_hist.tolist(),
+            },
+        }
+
+
+def _distribution(values):
+    if not values:
+        return None
+    values = np.asarray(values, dtype=np.float64)
+    return {"count": int(values.size), "mean": round(float(values.mean()), 2),
+            "p10": round(float(np.percentile(values, 10)), 2),
+            "p50": round(float(np.percentile(values, 50)), 2),
+            "p90": round(float(np.percentile(values, 90)), 2)}
+
+
+def summarize_file(path):
+    """プロセスプール用: 1ファイルを集計する"""
+    summary = LogSummary()
+    summary.add_file(path)
+    return summary
+
+
+def summarize_files(paths, workers=None):
+    """複数ファイルを並列に集計して合算する"""
+    workers = min(workers or os.cpu_count() or 1, max(1, len(paths)))
+    total = LogSummary()
+    if workers == 1:
+        for path in paths:
+            total.add_file(path)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for summary in executor.map(summarize_file, paths):
+                total.merge(summary)
+    return total
+
+
+def print_report(summary):
+    print(f"{summary.files}ファイル {summary.records}レコード")
+    print("イベント:")
+    for event, count in summary.events.most_common():
+        print(f"  {event:16s} {count}")
+
+    results = Counter(g["result"] for g in summary.games)
+    print(f"ゲーム: {len(summary.games)}  "
+          + "  ".join(f"{name} {count}" for name, count in results.items()))
+    data = summary.to_dict()
+    for label, key, unit in (("全ブロック破壊まで", "all_clear_time", "秒"),
+                             ("クリア率", "clear_percentage", "%")):
+        dist = data[key]
+        if dist:
+            print(f"  {label}: 平均 {dist['mean']}{unit}  p10 {dist['p10']}  "
+                  f"p50 {dist['p50']}  p90 {dist['p90']}  ({dist['count']}ゲーム)")
+
+    if summary.paddle_hist.any():
+        peak = int(np.argmax(summary.paddle_hist))
+        print(f"  パドル位置の最頻ビン: x={summary.x_edges[peak]:.1f}〜{summary.x_edges[peak + 1]:.1f}")
+    if summary.ball_hist.any():
+        ix, iy = np.unravel_index(np.argmax(summary.ball_hist), summary.ball_hist.shape)
+        print(f"  ボール位置の最頻ビン: x={summary.x_edges[ix]:.1f} y={summary.y_edges[iy]:.1f}")
+
+    curves = summary.curves()
+    if curves:
+        print("経過時間  きりみ  ペース(個/秒)  破壊率")
+        step = max(1, math.ceil(len(curves) / 20))
+        for point in curves[::step]:
+            print(f"  {point['t']:6.0f}秒 {point['kirimi']:7.1f} {point['kirimi_rate']:10.2f} "
+                  f"{point['progress'] * 100:8.1f}%")
+
+
+def collect_logs(sources):
+    """ファイル・ディレクトリ・globパターンからログの一覧を作る"""
+    paths = []
+    for source in sources:
+        if os.path.isdir(source):
+            paths.extend(sorted(glob.glob(os.path.join(source, "simulation_*.json"))))
+        else:
+            paths.extend(sorted(glob.glob(source)))
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SimulationLogger のログを集計")
+    parser.add_argument("logs", nargs="*", default=[DEFAULT_LOG_DIR],
+                        help="ログ（ファイル・ディレクトリ・globパターン）")
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+                        help="ワーカープロセス数（既定: CPUコア数）")
+    parser.add_argument("--json", help="集計結果をJSONで保存するパス")
+    args = parser.parse_args()
+
+    paths = collect_logs(args.logs)
+    if not paths:
+        print("ログが見つかりません")
+        return
+
+    start = time.perf_counter()
+    summary = summarize_files(paths, args.jobs)
+    print_report(summary)
+    print(f"({time.perf_counter() - start:.2f}秒)")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(summary.to_dict(), f, ensure_ascii=False)
+        print(f"保存しました: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
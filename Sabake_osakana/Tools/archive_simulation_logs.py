@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+"""
+SimulationLogger のログを列指向のアーカイブにまとめるスクリプト
+
+セッションごとの JSON ログを毎回パースし直さなくて済むように、
+全レコードをフィールドごとの固定幅バイナリ（<フィールド>.bin）に追記し、
+セッションの一覧（sessions.json）と合わせて保存する。
+列ファイルは numpy.memmap でそのまま開けるので、集計時に JSON を読む必要はない。
+
+アーカイブの構成（既定: ../Logs/archive/）:
+  schema.json     列の dtype、イベント名 ↔ ID の対応、総レコード数
+  sessions.json   セッション一覧（内容ハッシュ、元ファイル、ステージ、コミット、レコード範囲、ゲームごとの結果）
+  t.bin event.bin frame.bin kirimi.bin lives.bin destroyed.bin total.bin
+  ball_x.bin ball_y.bin paddle_x.bin   （STATUS 以外の行・値がない行は NaN / -1）
+
+同じ内容のログ（SHA-256 が同じ）は取り込み済みとしてスキップする。
+SimulationLogger はアプリの起動ごとに1ファイルなので、リトライすると1セッションに複数のゲームが入る。
+analyze_simulation_log.py と同じく BALL_LAUNCHED から GAME_CLEAR / GAME_OVER までを1ゲームとし、
+セッションの games にゲームごとの行範囲と結果を記録する（query の集計はゲーム単位）。
+ステージとコミットはログに含まれないので、取り込み時に指定する（コミットの既定は現在の HEAD）。
+
+使い方:
+  python archive_simulation_logs.py ingest ../Logs/*.json --stage 1
+  python archive_simulation_logs.py list
+  python archive_simulation_logs.py query --stage 1 --field clearPercentage --by commit
+  python archive_simulation_logs.py query --stage 1 --commit abc1234 --commit def5678
+
+Python から:
+  archive = Archive()
+  cols = archive.columns()                 # {フィールド名: np.memmap}
+  rows = archive.session_slice(session)    # そのセッションの行範囲
+  for game in session["games"]:
+      rows = archive.session_slice(game)   # ゲームの行範囲（start / rows はセッションと同じ形）
+"""
+
+from analyze_simulation_log import DEFAULT_LOG_DIR, iter_records, parse_position, collect_logs
+from build_cache import file_digest
+import numpy as np
+import argparse
+import json
+import os
+import subprocess
+
+DEFAULT_ARCHIVE_DIR = os.path.join(DEFAULT_LOG_DIR, "archive")
+
+# 列の定義（フィールド名, dtype, 値がないときの値）
+COLUMNS = (
+    ("t", "<f4", np.nan),
+    ("event", "<u2", 0),
+    ("frame", "<i4", -1),
+    ("kirimi", "<i4", -1),
+    ("lives", "<i2", -1),
+    ("destroyed", "<i2", -1),
+    ("total", "<i2", -1),
+    ("ball_x", "<f4", np.nan),
+    ("ball_y", "<f4", np.nan),
+    ("paddle_x", "<f4", np.nan),
+)
+
+FILL_VALUES = {name: fill for name, _, fill in COLUMNS}
+
+# ゲームの結果として残す GAME_CLEAR / GAME_OVER のデータ
+SUMMARY_FIELDS = ("clearPercentage", "finalKirimi", "finalLives", "destroyedBricks",
+                  "totalBricks", "remainingTime", "rank")
+
+SCHEMA_VERSION = 2
+
+# 1回に列ファイルへ書き出す行数
+WRITE_BATCH = 65536
+
+
+def current_commit():
+    """現在の git HEAD（短縮形）。取得できなければ None"""
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip() or None
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Archive:
+    """列指向アーカイブの読み書き"""
+
+    def __init__(self, archive_dir=DEFAULT_ARCHIVE_DIR):
+        self.archive_dir = archive_dir
+        self.schema_path = os.path.join(archive_dir, "schema.json")
+        self.sessions_path = os.path.join(archive_dir, "sessions.json")
+        self.schema = {"version": SCHEMA_VERSION, "rows": 0, "events": [""],
+                       "columns": {name: dtype for name, dtype, _ in COLUMNS}}
+        self.sessions = []
+        if os.path.exists(self.schema_path):
+            with open(self.schema_path, encoding="utf-8") as f:
+                schema = json.load(f)
+            if schema.get("version") == SCHEMA_VERSION:
+                self.schema = schema
+                with open(self.sessions_path, encoding="utf-8") as f:
+                    self.sessions = json.load(f)
+        self._hashes = {s["sha256"] for s in self.sessions}
+        self._event_ids = {name: i for i, name in enumerate(self.schema["events"])}
+
+    def column_path(self, name):
+        return os.path.join(self.archive_dir, f"{name}.bin")
+
+    # --- 取り込み ---
+
+    def ingest(self, path, stage_id=None, commit=None, label=None):
+        """
+        ログ1つを取り込む。取り込み済み（内容ハッシュが同じ）なら None を返す
+        """
+        digest = file_digest(path)
+        if digest in self._hashes:
+            return None
+
+        os.makedirs(self.archive_dir, exist_ok=True)
+        self._truncate_to_index()
+
+        start = self.schema["rows"]
+        buffers = {name: [] for name, _, _ in COLUMNS}
+        games = []
+        game_start = None   # 今のゲームの BALL_LAUNCHED の行（セッション内の番号）
+        next_start = 0      # 前のゲームが終わった次の行（BALL_LAUNCHED がないまま終わったゲームの始まり）
+        started_at = None
+        rows = 0
+
+        files = {name: open(self.column_path(name), "ab") for name, _, _ in COLUMNS}
+        try:
+            for record in iter_records(path):
+                if not isinstance(record, dict) or "event" not in record:
+                    continue
+                event = record["event"]
+                data = record.get("data") or {}
+                if event == "SESSION_START":
+                    started_at = data.get("timestamp")
+                elif event == "BALL_LAUNCHED" and game_start is None:
+                    game_start = rows
+                elif event in ("GAME_CLEAR", "GAME_OVER"):
+                    first = next_start if game_start is None else game_start
+                    games.append({"start": start + first, "rows": rows + 1 - first, "result": event,
+                                  **{k: data[k] for k in SUMMARY_FIELDS if k in data}})
+                    game_start = None
+                    next_start = rows + 1
+
+                for name, value in self._row(record, event, data):
+                    buffers[name].append(FILL_VALUES[name] if value is None else value)
+                rows += 1
+                if len(buffers["t"]) >= WRITE_BATCH:
+                    self._write(files, buffers)
+            self._write(files, buffers)
+        finally:
+            for f in files.values():
+                f.close()
+
+        if rows == 0:
+            self._truncate_to_index()
+            raise ValueError(f"SimulationLogger のレコードがありません: {path}")
+
+        session = {
+            "id": len(self.sessions),
+            "sha256": digest,
+            "source": os.path.basename(path),
+            "started_at": started_at,
+            "stage_id": stage_id,
+            "commit": commit,
+            "label": label,
+            "start": start,
+            "rows": rows,
+            "games": games,
+        }
+        self.sessions.append(session)
+        self._hashes.add(digest)
+        self.schema["rows"] = start + rows
+        self.save()
+        return session
+
+    def _row(self, record, event, data):
+        """レコードを (フィールド名, 値) の列にする"""
+        ball = parse_position(data.get("ballPos"))
+        paddle = parse_position(data.get("paddlePos"))
+        ball_ok = ball is not None and len(ball) == 2
+        kirimi = data.get("kirimi", data.get("totalKirimi", data.get("finalKirimi", -1)))
+        return (
+            ("t", record.get("t", np.nan)),
+            ("event", self._event_id(event)),
+            ("frame", data.get("frame", -1)),
+            ("kirimi", kirimi),
+            ("lives", data.get("lives", data.get("finalLives", -1))),
+            ("destroyed", data.get("destroyedBricks", -1)),
+            ("total", data.get("totalBricks", -1)),
+            ("ball_x", ball[0] if ball_ok else np.nan),
+            ("ball_y", ball[1] if ball_ok else np.nan),
+            ("paddle_x", paddle[0] if paddle else np.nan),
+        )
+
+    def _event_id(self, event):
+        event_id = self._event_ids.get(event)
+        if event_id is None:
+            event_id = len(self.schema["events"])
+            self.schema["events"].append(event)
+            self._event_ids[event] = event_id
+        return event_id
+
+    def _write(self, files, buffers):
+        for name, dtype, _ in COLUMNS:
+            if buffers[name]:
+                files[name].write(np.asarray(buffers[name], dtype=dtype).tobytes())
+                buffers[name].clear()
+
+    def _truncate_to_index(self):
+        """前回の取り込みが途中で止まっていたら、一覧に載っていない末尾の行を切り捨てる"""
+        for name, dtype, _ in COLUMNS:
+            path = self.column_path(name)
+            size = self.schema["rows"] * np.dtype(dtype).itemsize
+            if os.path.exists(path) and os.path.getsize(path) != size:
+                with open(path, "r+b") as f:
+                    f.truncate(size)
+
+    def save(self):
+        """一覧とスキーマを書き出す（列ファイルの後に書くので、一覧にある行は必ず揃っている）"""
+        for path, data in ((self.sessions_path, self.sessions), (self.schema_path, self.schema)):
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, indent=1)
+            os.replace(tmp_path, path)
+
+    # --- 読み出し ---
+
+    def columns(self, names=None):
+        """列を読み取り専用の np.memmap で返す"""
+        rows = self.schema["rows"]
+        result = {}
+        for name, dtype in self.schema["columns"].items():
+            if names is not None and name not in names:
+                continue
+            if rows == 0:
+                result[name] = np.zeros(0, dtype=dtype)
+            else:
+                result[name] = np.memmap(self.column_path(name), dtype=dtype, mode="r", shape=(rows,))
+        return result
+
+    def event_id(self, event):
+        return self._event_ids.get(event)
+
+    @staticmethod
+    def session_slice(session):
+        """セッション（またはセッションの games の1ゲーム）の行範囲"""
+        return slice(session["start"], session["start"] + session["rows"])
+
+    def select(self, stage_id=None, commits=None, label=None):
+        """条件に合うセッション"""
+        return [s for s in self.sessions
+                if (stage_id is None or s["stage_id"] == stage_id)
+                and (not commits or s["commit"] in commits)
+                and (label is None or s["label"] == label)]
+
+
+def distribution(values):
+    values = np.asarray([v for v in values if v is not None], dtype=np.float64)
+    if values.size == 0:
+        return None
+    return {"count": int(values.size), "mean": round(float(values.mean()), 2),
+            "p10": round(float(np.percentile(values, 10)), 2),
+            "p50": round(float(np.percentile(values, 50)), 2),
+            "p90": round(float(np.percentile(values, 90)), 2)}
+
+
+def command_ingest(archive, args):
+    commit = args.commit or current_commit()
+    added = skipped = 0
+    for path in collect_logs(args.logs):
+        try:
+            session = archive.ingest(path, args.stage, commit, args.label)
+        except ValueError as e:
+            print(f"Warning: {e}")
+            continue
+        if session is None:
+            skipped += 1
+            print(f"取り込み済み（スキップ）: {path}")
+        else:
+            added += 1
+            results = "、".join(game["result"] for game in session["games"]) or "結果なし"
+            print(f"取り込み: {path} （{session['rows']}行、{len(session['games'])}ゲーム: {results}）")
+    print(f"{added}件を追加、{skipped}件はスキップ（合計 {len(archive.sessions)}セッション、"
+          f"{archive.schema['rows']}行）")
+
+
+def command_list(archive, args):
+    for s in archive.sessions:
+        print(f"  #{s['id']:4d} stage={s['stage_id']} commit={s['commit']} label={s['label']} "
+              f"{s['source']} rows={s['rows']} games={len(s['games'])}")
+        for game in s["games"]:
+            print(f"          rows {game['start']}+{game['rows']} {game['result']} "
+                  f"clear={game.get('clearPercentage')}")
+    games = sum(len(s["games"]) for s in archive.sessions)
+    print(f"{len(archive.sessions)}セッション、{games}ゲーム、{archive.schema['rows']}行")
+
+
+def command_query(archive, args):
+    """
+    ゲームの結果（sessions.json の games の値）か列（memmap）の分布をゲーム単位で出す
+    列を指定したときは、ゲームの行範囲の --event のレコードだけを対象にする
+    """
+    sessions = archive.select(args.stage, args.commit, args.label)
+    key = args.by or ("commit" if args.commit and len(args.commit) > 1 else None)
+    groups = {}
+    for s in sessions:
+        groups.setdefault(s[key] if key else "all", []).append(s)
+
+    columns = None
+    if args.field in archive.schema["columns"]:
+        columns = archive.columns([args.field, "event"])
+        event_id = archive.event_id(args.event)
+
+    for group, members in groups.items():
+        games = [game for s in members for game in s["games"]]
+        if columns is None:
+            values = [game.get(args.field) for game in games]
+        else:
+            values = []
+            for game in games:
+                rows = Archive.session_slice(game)
+                column = columns[args.field][rows]
+                mask = columns["event"][rows] == event_id
+                values.extend(column[mask & ~np.isnan(column.astype(np.float64))].tolist())
+        dist = distribution(values)
+        label = f"{key}={group}" if key else group
+        if dist is None:
+            print(f"  {label}: データなし")
+        else:
+            print(f"  {label}: {args.field} 平均 {dist['mean']}  p10 {dist['p10']}  p50 {dist['p50']}  "
+                  f"p90 {dist['p90']}  ({dist['count']}件、{len(games)}ゲーム、{len(members)}セッション)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="シミュレーションログの列指向アーカイブ")
+    parser.add_argument("--archive", default=DEFAULT_ARCHIVE_DIR, help="アーカイブのディレクトリ")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    ingest = sub.add_parser("ingest", help="ログを取り込む")
+    ingest.add_argument("logs", nargs="*", default=[DEFAULT_LOG_DIR],
+                        help="ログ（ファイル・ディレクトリ・globパターン）")
+    ingest.add_argument("--stage", type=int, help="ステージID")
+    ingest.add_argument("--commit", help="ゲームのコミット（既定: 現在の HEAD）")
+    ingest.add_argument("--label", help="任意のラベル（調整内容など）")
+
+    sub.add_parser("list", help="取り込んだセッションの一覧")
+
+    query = sub.add_parser("query", help="セッションをまたいだゲームごとの分布")
+    query.add_argument("--field", default="clearPercentage",
+                       help="ゲームの結果（clearPercentage など）または列名（kirimi など）")
+    query.add_argument("--event", default="STATUS", help="列を集計するときの対象イベント")
+    query.add_argument("--stage", type=int, help="ステージIDで絞り込む")
+    query.add_argument("--commit", action="append", help="コミットで絞り込む（複数指定で比較）")
+    query.add_argument("--label", help="ラベルで絞り込む")
+    query.add_argument("--by", choices=("commit", "stage_id", "label"), help="グループ分けのキー")
+    args = parser.parse_args()
+
+    archive = Archive(args.archive)
+    {"ingest": command_ingest, "list": command_list, "query": command_query}[args.command](archive, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+ステージごとのブロック配置パターンを事前計算（焼き込み）するスクリプト
+
+BrickManager.GeneratePatternFromImage / SampleAverageAlpha と同じ位置
+（セル内 3x3 点、Texture2D の左下原点 → 行の上下反転込み）でアルファを
+サンプリングし、平均が 0.3 を超えるセルを 1 とする。
+C# 側の float（単精度）の演算順序と Mathf.RoundToInt（偶数丸め）を再現するため、
+グリッド全体を配列演算でまとめて計算しても結果は一致する。
+
+出力: Assets/Resources/BrickPatterns/stage_<stage_id>.txt
+  # stage_id=1 fish_image=Sprites/sakana_normal grid=17x13 texture=1155x1155
+  00000111110000000   ← fishPattern[row, col]（row 0 が画面の一番上）
+  ...
+
+BrickManager は起動時にこのファイルがあればテクスチャをサンプリングせずに使う
+（モバイルでテクスチャを Read/Write 有効にしなくてよくなる）
+
+使い方:
+  python bake_brick_patterns.py            # StageData.csv の全ステージを焼き込み
+  python bake_brick_patterns.py --print    # パターンを表示するだけ
+"""
+
+from PIL import Image
+from build_cache import TOOLS_DIR, BuildCache, write_if_changed
+from build_trace import traced
+from trim_sprites import TRIM_DATA_PATH, load_trim_data, resource_key, untrim_alpha
+import numpy as np
+import argparse
+import csv
+import os
+
+# 生成キーに含めるコード（このスクリプトと、出力に関わる共通モジュール）
+GENERATOR_CODE = [__file__, os.path.join(TOOLS_DIR, "trim_sprites.py")]
+
+RESOURCES_DIR = "../Assets/Resources"
+STAGE_DATA_PATH = f"{RESOURCES_DIR}/StageData.csv"
+OUTPUT_DIR = f"{RESOURCES_DIR}/BrickPatterns"
+
+# BrickManager.SampleAverageAlpha と同じ値（float）
+SAMPLE_OFFSETS = np.array([0.2, 0.5, 0.8], dtype=np.float32)  # 0.2f から 0.3f 刻みで 0.8f まで
+ALPHA_THRESHOLD = np.float32(0.3)
+
+
+def load_stage_data(path=STAGE_DATA_PATH):
+    """
+    StageData.csv を StageDataManager.ParseCSV と同じ規則で読み込む
+    （先頭行はヘッダー、列不足や数値でない行は飛ばす）
+    """
+    stages = []
+    with open(path, encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+
+    for values in rows[1:]:
+        if len(values) < 8:
+            continue
+        values = [v.strip() for v in values]
+        try:
+            stages.append({
+                "stage_id": int(values[0]),
+                "stage_name": values[1],
+                "fish_image": values[2],
+                "grid_cols": int(values[3]),
+                "grid_rows": int(values[4]),
+                "brick_width": float(values[5]),
+                "time_limit": int(values[6]),
+                "bonus_multiplier": float(values[7]),
+            })
+        except ValueError:
+            continue
+    return stages
+
+
+def resource_image_path(resource_path, resources_dir=RESOURCES_DIR):
+    """Resources 相対パス（拡張子なし）から画像ファイルのパスを探す"""
+    for ext in (".png", ".PNG", ".jpg", ".jpeg"):
+        path = os.path.join(resources_dir, resource_path + ext)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+@traced("decode")
+def load_alpha(path):
+    """
+    画像のアルファを Texture2D.GetPixel と同じ並び（左下原点、0.0〜1.0 の float）で返す
+    返り値の [y, x] が GetPixel(x, y).a に対応する
+    trim_sprites.py で縁を切り落とした画像は SpriteTrim.csv の元サイズに戻す
+    （BrickManager も元サイズを基準にグリッドを分割する）
+    """
+    image = Image.open(path).convert("RGBA")
+    alpha = np.asarray(image)[::-1, :, 3]
+    alpha = untrim_alpha(alpha, load_trim_data().get(resource_key(path)))
+    return alpha.astype(np.float32) / np.float32(255)
+
+
+def sample_average_alpha(alpha, grid_cols, grid_rows):
+    """
+    全セルの SampleAverageAlpha を一度に計算して (grid_rows, grid_cols) の配列で返す
+    """
+    height, width = alpha.shape
+    pixel_width = np.float32(width) / np.float32(grid_cols)
+    pixel_height = np.float32(height) / np.float32(grid_rows)
+
+    cols = np.arange(grid_cols, dtype=np.float32)
+    # 行は上下反転（row 0 がテクスチャの一番上）
+    flipped_rows = np.arange(grid_rows - 1, -1, -1, dtype=np.float32)
+
+    total = np.zeros((grid_rows, grid_cols), dtype=np.float32)
+    for dx in SAMPLE_OFFSETS:
+        # Mathf.RoundToInt は偶数丸め（np.rint と同じ）
+        px = np.rint((cols + dx) * pixel_width).astype(np.int64)
+        px = np.clip(px, 0, width - 1)
+        for dy in SAMPLE_OFFSETS:
+            py = np.rint((flipped_rows + dy) * pixel_height).astype(np.int64)
+            py = np.clip(py, 0, height - 1)
+            # C# と同じ順序で単精度のまま足し込む
+            total += alpha[py[:, None], px[None, :]]
+
+    return total / np.float32(SAMPLE_OFFSETS.size ** 2)
+
+
+@traced("brick_sample")
+def bake_pattern(alpha, grid_cols, grid_rows):
+    """ブロック配置パターン（1=ブロックあり）を返す"""
+    return (sample_average_alpha(alpha, grid_cols, grid_rows) > ALPHA_THRESHOLD).astype(np.uint8)
+
+
+def format_pattern(stage, pattern, texture_size):
+    """焼き込みファイルの内容"""
+    header = (f"# stage_id={stage['stage_id']} fish_image={stage['fish_image']} "
+              f"grid={stage['grid_cols']}x{stage['grid_rows']} "
+              f"texture={texture_size[0]}x{texture_size[1]}")
+    rows = ["".join(str(v) for v in row) for row in pattern]
+    return "\n".join([header] + rows) + "\n"
+
+
+def bake_stages(stages, output_dir=OUTPUT_DIR, cache=None, print_only=False):
+    """全ステージのパターンを焼き込み、出力パスのリストを返す"""
+    outputs = []
+    for stage in stages:
+        image_path = resource_image_path(stage["fish_image"])
+        if image_path is None:
+            print(f"Warning: stage {stage['stage_id']}: {stage['fish_image']} が見つかりません")
+            continue
+
+        output_path = os.path.join(output_dir, f"stage_{stage['stage_id']}.txt")
+        params = {k: stage[k] for k in ("stage_id", "fish_image", "grid_cols", "grid_rows")}
+        key = None
+        inputs = [image_path] + ([TRIM_DATA_PATH] if os.path.exists(TRIM_DATA_PATH) else [])
+        if cache is not None and not print_only:
+            key = cache.compute_key("bake_brick_patterns", params=params,
+                                    inputs=inputs, code=GENERATOR_CODE)
+            if cache.is_up_to_date(output_path, key):
+                print(f"変更なし（スキップ）: {output_path}")
+                continue
+
+        alpha = load_alpha(image_path)
+        pattern = bake_pattern(alpha, stage["grid_cols"], stage["grid_rows"])
+        text = format_pattern(stage, pattern, (alpha.shape[1], alpha.shape[0]))
+
+        if print_only:
+            print(text)
+            continue
+
+        write_if_changed(output_path, text.encode("utf-8"))
+        if cache is not None:
+            cache.record(output_path, key, "bake_brick_patterns", params=params, inputs=inputs)
+        print(f"焼き込み完了: {output_path} （ブロック {int(pattern.sum())}個）")
+        outputs.append(output_path)
+    return outputs
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="ステージのブロック配置パターンを焼き込み")
+    parser.add_argument("--stage-data", default=STAGE_DATA_PATH, help="StageData.csv のパス")
+    parser.add_argument("--output-dir", default=OUTPUT_DIR, help="出力先")
+    parser.add_argument("--print", dest="print_only", action="store_true",
+                        help="ファイルに書かずにパターンを表示する")
+    parser.add_argument("--force", action="store_true",
+                        help="ビルドキャッシュを無視して再生成")
+    args = parser.parse_args(argv)
+
+    cache = BuildCache(force=args.force)
+    bake_stages(load_stage_data(args.stage_data), args.output_dir, cache, args.print_only)
+    cache.save()
+
+
+if __name__ == "__main__":
+    main()
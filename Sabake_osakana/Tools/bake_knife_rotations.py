@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+包丁ボールの回転済みスプライトシートを作るスクリプト
+knife.png と Knives/knife_*.png をそれぞれ N 方向に回転させて1枚のシートに並べ、
+角度 → コマの対応表（CSV）と一緒に書き出す
+
+  Sprites/KnifeRotations/knife_32.png          ← 32方向のシート（コマは左上から行ごとに並ぶ）
+  Sprites/KnifeRotations/knife_32_frames.csv   ← frame, rotation（度）, コマの矩形（左下原点）, PPU
+
+コマ i はスプライトを反時計回りに i * 360 / N 度回したもの（Unity の Quaternion.Euler(0, 0, 角度) と同じ向き）。
+回転の中心はスプライトのピボットで、コマの中心に来る。PPU は元のスプライトと同じなので見た目の大きさも変わらない。
+スクリプティングシンボル KNIFE_ROTATION_SHEETS を定義してビルドすると、BallController / SubBall は
+毎フレーム Transform を回す代わりに KnifeRotationSheet でコマを差し替える。
+
+回転は全角度をまとめて numpy で計算する（逆写像 + バイリニア補間、乗算済みアルファで縁が黒ずまない）。
+ゲームが読み込む包丁（GAME_KNIVES）× ゲームで使う方向数（--frames）のシートだけを Resources に、
+それ以外（色違いの包丁・比較用の方向数 --angles）は Exports/KnifeRotations/<N>/ に書き出し、
+方向数ごとのファイルサイズとテクスチャメモリを表にする。
+
+使い方:
+  python bake_knife_rotations.py                       # 16 / 32 / 64 方向を比較し、32方向を Resources に
+  python bake_knife_rotations.py --angles 8 16 32 64 128 -j 8
+  python bake_knife_rotations.py --frames 64 --force
+  python bake_knife_rotations.py --game-only           # ゲームが読み込むシートだけ（build.py / --watch 用）
+"""
+
+from PIL import Image
+from concurrent.futures import ProcessPoolExecutor
+from build_cache import PNG_CODE, TOOLS_DIR, BuildCache, save_png, write_if_changed
+from build_trace import span
+from export_resolution_tiers import META_PPU
+from trim_sprites import ALIGNMENT_PIVOTS, META_SPRITE_MODE, read_meta, sprite_pivot, sprite_rects
+import numpy as np
+import argparse
+import glob
+import math
+import os
+import re
+import time
+
+# 生成キーに含めるコード（このスクリプトと、出力に関わる共通モジュール）
+GENERATOR_CODE = [__file__, *PNG_CODE,
+                  os.path.join(TOOLS_DIR, "trim_sprites.py"), os.path.join(TOOLS_DIR, "export_resolution_tiers.py")]
+
+SPRITES_DIR = "../Assets/Resources/Sprites"
+DEFAULT_SOURCES = [f"{SPRITES_DIR}/knife.png", f"{SPRITES_DIR}/Knives/knife_*.png"]
+OUTPUT_DIR = f"{SPRITES_DIR}/KnifeRotations"
+COMPARE_DIR = "../Exports/KnifeRotations"
+
+# ゲームが KnifeRotationSheet.Load で読み込む包丁（これ以外のシートは Resources に入れない）
+GAME_KNIVES = ["knife"]
+
+# ゲームで使う方向数（KnifeRotationSheet.FrameCount と合わせる）と、比較する方向数の既定値
+DEFAULT_FRAMES = 32
+DEFAULT_ANGLES = [16, 32, 64]
+
+# コマの周りに空ける透明なピクセル数（バイリニア補間で隣のコマがにじまないように）
+FRAME_PADDING = 1
+
+FRAME_COLUMNS = ["frame", "rotation", "x", "y", "width", "height", "pixels_per_unit"]
+
+# Multiple モードのサブスプライトのピボット指定
+META_SUB_PIVOT = re.compile(r"^      alignment: (\d+)\n      pivot: \{x: ([-\d.e]+), y: ([-\d.e]+)\}$", re.M)
+
+
+# ============================================
+# 元スプライト
+# ============================================
+def load_sprite(path):
+    """
+    Resources.Load<Sprite> で読まれるスプライト（Multiple なら先頭のサブスプライト）を切り出す
+    返り値: (RGBA 画像, ピボット（切り出した画像の左下からのピクセル）, PPU)
+    """
+    image = Image.open(path).convert("RGBA")
+    meta = read_meta(path)
+    ppu = float(META_PPU.search(meta).group(2)) if meta and META_PPU.search(meta) else 100.0
+
+    rects = sprite_rects(meta)
+    if rects:
+        x, y, width, height = (int(v) for v in rects[0])
+        match = META_SUB_PIVOT.search(meta)
+        alignment = int(match.group(1)) if match else 0
+        pivot = ALIGNMENT_PIVOTS.get(alignment) or (float(match.group(2)), float(match.group(3)))
+        # 矩形は左下原点なので、PIL の座標（左上原点）に直して切り出す
+        image = image.crop((x, image.height - y - height, x + width, image.height - y))
+    else:
+        pivot = sprite_pivot(meta) if META_SPRITE_MODE.search(meta or "") else None
+        pivot = pivot or (0.5, 0.5)
+    return image, (pivot[0] * image.width, pivot[1] * image.height), ppu
+
+
+def frame_size(image, pivot):
+    """どの角度に回しても不透明部分が収まるコマの一辺（偶数、ピボットが中心に来る）"""
+    alpha = np.asarray(image)[..., 3]
+    rows, cols = np.nonzero(alpha)
+    if len(rows) == 0:
+        return 2 * FRAME_PADDING + 2
+    # ピクセルの四隅のうちピボットから遠い方までの距離
+    dx = np.maximum(np.abs(cols - pivot[0]), np.abs(cols + 1 - pivot[0]))
+    dy = np.maximum(np.abs(image.height - rows - pivot[1]), np.abs(image.height - rows - 1 - pivot[1]))
+    radius = float(np.sqrt(dx * dx + dy * dy).max())
+    return 2 * (math.ceil(radius) + FRAME_PADDING)
+
+
+# ============================================
+# 回転
+# ============================================
+def rotate_frames(image, pivot, rotations, size):
+    """
+    画像をピボット中心に各角度（度、反時計回り）回したコマを (角度数, size, size, 4) の uint8 で返す
+    全角度・全ピクセルの逆写像をまとめて計算し、乗算済みアルファでバイリニア補間する
+    """
+    pixels = np.asarray(image, dtype=np.float32) / 255.0
+    premultiplied = pixels.copy()
+    premultiplied[..., :3] *= pixels[..., 3:]
+    # 外側を透明な1ピクセルで囲み、範囲外の参照はそこに寄せる
+    source = np.pad(premultiplied, ((1, 1), (1, 1), (0, 0)))
+    height, width = image.height, image.width
+
+    theta = np.radians(np.asarray(rotations, dtype=np.float32))[:, None, None]
+    cos, sin = np.cos(theta), np.sin(theta)
+    centers = np.arange(size, dtype=np.float32) + 0.5 - size / 2
+    dx = centers[None, None, :]   # 右向き
+    dy = -centers[None, :, None]  # 上向き
+
+    # 出力のピクセル中心を逆回転して元画像上の位置へ（ピクセル中心が整数になる座標）
+    src_x = cos * dx + sin * dy + pivot[0] - 0.5 + 1
+    src_y = (height - pivot[1]) - (-sin * dx + cos * dy) - 0.5 + 1
+    src_x = np.clip(src_x, 0, width + 1)
+    src_y = np.clip(src_y, 0, height + 1)
+
+    x0 = np.minimum(np.floor(src_x).astype(np.int32), width)
+    y0 = np.minimum(np.floor(src_y).astype(np.int32), height)
+    fx = (src_x - x0)[..., None]
+    fy = (src_y - y0)[..., None]
+    top = source[y0, x0] * (1 - fx) + source[y0, x0 + 1] * fx
+    bottom = source[y0 + 1, x0] * (1 - fx) + source[y0 + 1, x0 + 1] * fx
+    frames = top * (1 - fy) + bottom * fy
+
+    alpha = frames[..., 3:]
+    rgb = np.divide(frames[..., :3], alpha, out=np.zeros_like(frames[..., :3]), where=alpha > 0)
+    result = np.concatenate([np.clip(rgb, 0, 1), alpha], axis=-1)
+    return np.round(result * 255).astype(np.uint8)
+
+
+def sheet_layout(count):
+    """コマを並べる (列数, 行数)。なるべく正方形に近づける"""
+    columns = math.ceil(math.sqrt(count))
+    return columns, math.ceil(count / columns)
+
+
+def build_sheet(frames):
+    """(コマ数, size, size, 4) のコマを左上から行ごとに並べた1枚の画像にする"""
+    count, size = frames.shape[:2]
+    columns, rows = sheet_layout(count)
+    grid = np.zeros((rows * columns, size, size, 4), dtype=np.uint8)
+    grid[:count] = frames
+    grid = grid.reshape(rows, columns, size, size, 4).transpose(0, 2, 1, 3, 4)
+    return Image.fromarray(grid.reshape(rows * size, columns * size, 4), "RGBA")
+
+
+def frame_table(count, size, ppu):
+    """角度 → コマの対応表（CSV の本文）。矩形は Sprite.Create に渡す左下原点の座標"""
+    columns, rows = sheet_layout(count)
+    lines = [",".join(FRAME_COLUMNS)]
+    for frame in range(count):
+        row, column = divmod(frame, columns)
+        lines.append(f"{frame},{frame * 360 / count:g},{column * size},{(rows - 1 - row) * size},"
+                     f"{size},{size},{ppu:g}")
+    return "\n".join(lines) + "\n"
+
+
+# ============================================
+# 書き出し
+# ============================================
+def sheet_paths(source_path, count, output_dir):
+    stem = os.path.splitext(os.path.basename(source_path))[0]
+    base = os.path.join(output_dir, f"{stem}_{count}")
+    return base + ".png", base + "_frames.csv"
+
+
+def sheet_dir(source_path, count, frames):
+    """ゲームで読み込むシートは Resources に、それ以外は比較用に Exports に書き出す"""
+    stem = os.path.splitext(os.path.basename(source_path))[0]
+    if count == frames and stem in GAME_KNIVES:
+        return OUTPUT_DIR
+    return os.path.join(COMPARE_DIR, str(count))
+
+
+def bake_sheet(job):
+    """プロセスプール用: 1つの（包丁 × 方向数）のシートと対応表を書き出す"""
+    source_path, count, output_dir = job
+    png_path, csv_path = sheet_paths(source_path, count, output_dir)
+    with span("bake_sheet", path=png_path, frames=count):
+        with span("decode", path=source_path):
+            image, pivot, ppu = load_sprite(source_path)
+        size = frame_size(image, pivot)
+        with span("rotate_frames", frames=count, size=size):
+            frames = rotate_frames(image, pivot, [i * 360 / count for i in range(count)], size)
+        with span("build_sheet"):
+            sheet = build_sheet(frames)
+        save_png(sheet, png_path)
+        write_if_changed(csv_path, frame_table(count, size, ppu).encode("utf-8"))
+    return png_path, csv_path
+
+
+def bake_rotations(sources, counts, frames=DEFAULT_FRAMES, workers=None, cache=None):
+    """
+    全ての（包丁 × 方向数）のシートを作り、(方向数ごとの集計, 作り直した数) を返す
+    GAME_KNIVES の frames 方向のシートは Resources に、それ以外は比較用に Exports に書き出す
+    """
+    counts = sorted(set(counts) | {frames})
+    jobs = []
+    keys = {}
+    for count in counts:
+        for source_path in sources:
+            job = (source_path, count, sheet_dir(source_path, count, frames))
+            inputs = [source_path] + ([source_path + ".meta"] if os.path.exists(source_path + ".meta") else [])
+            if cache is not None:
+                key = cache.compute_key("bake_knife_rotations", params={"angles": count},
+                                        inputs=inputs, code=GENERATOR_CODE)
+                if all(cache.is_up_to_date(p, key) for p in sheet_paths(*job)):
+                    continue
+                keys[job] = (key, inputs)
+            jobs.append(job)
+
+    workers = min(workers or os.cpu_count() or 1, max(1, len(jobs)))
+    if workers == 1:
+        results = [bake_sheet(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(bake_sheet, jobs))
+
+    if cache is not None:
+        for job, outputs in zip(jobs, results):
+            key, inputs = keys[job]
+            for output_path in outputs:
+                cache.record(output_path, key, "bake_knife_rotations",
+                             params={"angles": job[1]}, inputs=inputs)
+
+    # スキップしたシートも含めて、書き出し済みのファイルから集計する
+    summary = {}
+    for count in counts:
+        stats = summary[count] = {"sheets": 0, "file_bytes": 0, "texture_bytes": 0, "frame_sizes": set()}
+        for source_path in sources:
+            png_path, _ = sheet_paths(source_path, count, sheet_dir(source_path, count, frames))
+            with Image.open(png_path) as sheet:
+                stats["texture_bytes"] += sheet.width * sheet.height * 4
+                stats["frame_sizes"].add(sheet.width // sheet_layout(count)[0])
+            stats["sheets"] += 1
+            stats["file_bytes"] += os.path.getsize(png_path)
+    return summary, len(jobs)
+
+
+def collect_sources(patterns):
+    """ファイル・globパターンから画像の一覧を作る"""
+    paths = []
+    for pattern in patterns:
+        paths.extend(sorted(glob.glob(pattern)))
+    return list(dict.fromkeys(paths))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="包丁ボールの回転済みスプライトシートを作る")
+    parser.add_argument("sources", nargs="*", default=DEFAULT_SOURCES,
+                        help="包丁の画像（ファイル・globパターン）")
+    parser.add_argument("--angles", type=int, nargs="+", default=DEFAULT_ANGLES,
+                        help="比較する方向数")
+    parser.add_argument("--frames", type=int, default=DEFAULT_FRAMES,
+                        help="ゲームで使う方向数（Resources に書き出す）")
+    parser.add_argument("--game-only", action="store_true",
+                        help="ゲームが読み込むシート（GAME_KNIVES の --frames 方向）だけを作る。比較はしない")
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+                        help="ワーカープロセス数（既定: CPUコア数）")
+    parser.add_argument("--force", action="store_true",
+                        help="ビルドキャッシュを無視して再生成")
+    args = parser.parse_args(argv)
+
+    sources = collect_sources(args.sources)
+    angles = args.angles
+    if args.game_only:
+        sources = [path for path in sources if os.path.splitext(os.path.basename(path))[0] in GAME_KNIVES]
+        angles = [args.frames]
+    if not sources:
+        print("Error: 包丁の画像が見つかりません")
+        return
+
+    start = time.perf_counter()
+    cache = BuildCache(force=args.force)
+    summary, baked = bake_rotations(sources, angles, args.frames, args.jobs, cache)
+    cache.save()
+    elapsed = time.perf_counter() - start
+
+    # 実行時に回す場合は元のテクスチャだけで済む
+    runtime_bytes = 0
+    for path in sources:
+        with Image.open(path) as image:
+            runtime_bytes += image.width * image.height * 4
+
+    print(f"{len(sources)}種類の包丁 × {len(summary)}通りの方向数（{baked}枚を生成） {elapsed:.2f}秒")
+    print(f"{'方向数':>6}{'刻み':>8}{'コマ（px）':>12}{'PNG':>10}{'RGBA32':>11}{'実行時回転比':>10}")
+    for count, s in summary.items():
+        mark = "  ← ゲームで使用" if count == args.frames else ""
+        sizes = "/".join(str(size) for size in sorted(s["frame_sizes"]))
+        print(f"{count:>8}{360 / count:>9.2f}°{sizes:>14}{s['file_bytes'] / 1024:>10.0f}KB"
+              f"{s['texture_bytes'] / 1024:>9.0f}KB{s['texture_bytes'] / runtime_bytes:>12.1f}倍{mark}")
+    print(f"実行時回転（元テクスチャのみ）: {runtime_bytes / 1024:.0f}KB")
+    print(f"ゲーム用: {OUTPUT_DIR}（{', '.join(GAME_KNIVES)}）  比較用: {COMPARE_DIR}")
+
+
+if __name__ == "__main__":
+    main()
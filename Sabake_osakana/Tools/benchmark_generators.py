@@ -0,0 +1,390 @@
+#!/usr/bin/env python3
+"""
+アセット生成スクリプトのベンチマーク（速度・メモリ・出力サイズの劣化を検出する）
+各生成関数を決まった合成入力で実行し、実行時間・ピークメモリ（RSS）・出力バイト数を
+履歴（Tools/.benchmarks/history.json）に追記する。同じマシンの過去の結果（直近 --window 回の中央値）より
+しきい値を超えて悪くなったケースがあれば、一覧を表示して終了コード 1 で終わる
+
+ケース（size は一辺のピクセル数。既定は 72: 包丁のスプライト、1155: 魚の画像、4096: 4K の元画像）:
+  colorize         generate_rainbow_knives.colorize_image   合成スプライトを1色に染める
+  kirimi           generate_kirimi.render_kirimi            切り身を描画（2倍で描いて縮小）
+  9slice           generate_rounded_corners.generate_9slice_corners  角丸パネル（一辺 size）を切り出して保存
+  spec_thumbnails  sabake_spec_generator.build_thumbnails   合成スプライト SPEC_SPRITES 枚のサムネイル
+  spec_workbook    sabake_spec_generator.build_workbook     リポジトリの今の内容から仕様書を作る（size なし）
+
+ケースは1つずつ新しいプロセス（spawn）で実行するので、ピークメモリはほかのケースの影響を受けない。
+合成入力を作った後に /proc/self/clear_refs でピーク（VmHWM）を戻し、計測中のピークから
+入力を作り終えた時点の RSS を引いた増分（run_rss）を劣化の判定に使う（入力を作るメモリは含まない）。
+/proc がない環境では ru_maxrss で代わりに測る（入力を作るときのピークより小さい増え方は見えない）。
+時間は --repeat 回のうち最短、出力バイト数は save_png と同じエンコード（png_encoder の fast）の結果。
+出力バイト数のエンコードは時間・メモリの計測の後に行う（9slice は保存までが生成処理なので計測に含む）。
+ネットワークも GPU も使わないので、ふつうの Linux マシンでそのまま動く
+
+使い方:
+  python benchmark_generators.py                          # 全ケース
+  python benchmark_generators.py colorize kirimi --sizes 72 1155
+  python benchmark_generators.py --threshold 10 --memory-threshold 5
+  python benchmark_generators.py --no-record              # 履歴に追記しない（比較だけ）
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import datetime
+import json
+import multiprocessing
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+TOOLS_DIR = os.path.dirname(os.path.abspath(__file__))
+DOCS_DIR = os.path.join(os.path.dirname(TOOLS_DIR), "docs")
+HISTORY_PATH = os.path.join(TOOLS_DIR, ".benchmarks", "history.json")
+HISTORY_VERSION = 2
+
+DEFAULT_SIZES = [72, 1155, 4096]
+DEFAULT_REPEAT = 3
+DEFAULT_WINDOW = 5
+
+# 劣化とみなす増え方（%）
+DEFAULT_THRESHOLD = 20          # 実行時間
+DEFAULT_MEMORY_THRESHOLD = 10   # ピークメモリの増分
+DEFAULT_BYTES_THRESHOLD = 1     # 出力バイト数
+
+# 小さいケースの揺れを劣化と判定しないための下限（これ以下の増え方は無視）
+MIN_TIME_DELTA = 0.005              # 秒
+MIN_MEMORY_DELTA = 4 * 1024 * 1024  # バイト
+
+SPEC_SPRITES = 16
+KNIFE_COLOR = (255, 80, 80)
+
+
+# ============================================
+# 合成入力
+# ============================================
+def synthetic_sprite(size):
+    """
+    包丁のスプライトに似せた RGBA 画像（乱数は使わないので毎回同じ）
+    斜めの帯状に明度が変わる楕円で、縁だけ半透明、外側は透明
+    """
+    import numpy as np
+    from PIL import Image
+
+    y, x = np.mgrid[0:size, 0:size].astype(np.float32) / max(size - 1, 1)
+    radius = np.hypot((x - 0.5) / 0.45, (y - 0.5) / 0.3)
+    alpha = np.clip((1.0 - radius) * size * 0.3, 0.0, 1.0)
+    shade = 0.5 + 0.5 * np.sin((x + y) * 12.0)
+    pixels = np.empty((size, size, 4), dtype=np.uint8)
+    pixels[..., 0] = 96 + shade * 150
+    pixels[..., 1] = 96 + shade * 120
+    pixels[..., 2] = 112 + x * 100
+    pixels[..., 3] = alpha * 255
+    return Image.fromarray(pixels, "RGBA")
+
+
+def image_bytes(image):
+    """save_png と同じエンコードでの PNG のバイト数"""
+    from png_encoder import encode_png
+    return len(encode_png(image, effort="fast"))
+
+
+def directory_bytes(directory):
+    return sum(os.path.getsize(os.path.join(root, name))
+               for root, _, files in os.walk(directory) for name in files)
+
+
+# ============================================
+# ケース
+# setup(size, work_dir) が入力を作り、run(入力) が計測する処理、output(結果) が出力バイト数
+# ============================================
+def setup_colorize(size, work_dir):
+    from generate_rainbow_knives import colorize_image
+    image = synthetic_sprite(size)
+    return lambda: colorize_image(image, KNIFE_COLOR)
+
+
+def setup_kirimi(size, work_dir):
+    from generate_kirimi import render_kirimi
+    return lambda: render_kirimi(size)
+
+
+def setup_9slice(size, work_dir):
+    import contextlib
+    import io
+    from generate_rounded_corners import generate_9slice_corners
+
+    def run():
+        # 毎回空のディレクトリに保存する（save_png は同じ画素のファイルがあると書かない）
+        output_dir = tempfile.mkdtemp(dir=work_dir)
+        with contextlib.redirect_stdout(io.StringIO()):
+            generate_9slice_corners(corner_size=size // 3, radius=size // 8,
+                                    border_width=max(1, size // 32), output_dir=output_dir)
+        return output_dir
+    return run
+
+
+def setup_spec_thumbnails(size, work_dir):
+    import contextlib
+    import io
+    import sabake_spec_generator as spec
+
+    image = synthetic_sprite(size)
+    paths = []
+    for i in range(SPEC_SPRITES):
+        path = os.path.join(work_dir, f"sprite_{i:02d}.png")
+        # 内容ハッシュでキャッシュされるので、1枚ずつ画素を変える
+        image.putpixel((i, 0), (i, i, i, 255))
+        image.save(path, compress_level=1)
+        paths.append(path)
+
+    def run():
+        # 毎回空のキャッシュで全部縮小する（1プロセスで測る）
+        spec.THUMBNAIL_CACHE_DIR = tempfile.mkdtemp(dir=work_dir)
+        with contextlib.redirect_stdout(io.StringIO()):
+            spec.build_thumbnails(paths, workers=1)
+        return spec.THUMBNAIL_CACHE_DIR
+    return run
+
+
+def setup_spec_workbook(size, work_dir):
+    import contextlib
+    import io
+    import sabake_spec_generator as spec
+
+    def run():
+        spec.THUMBNAIL_CACHE_DIR = tempfile.mkdtemp(dir=work_dir)
+        buffer = io.BytesIO()
+        with contextlib.redirect_stdout(io.StringIO()):
+            spec.build_workbook(spec.sheet_registry(workers=1)).save(buffer)
+        return buffer.getvalue()
+    return run
+
+
+CASES = {
+    "colorize": {"setup": setup_colorize, "output": image_bytes, "sized": True},
+    "kirimi": {"setup": setup_kirimi, "output": image_bytes, "sized": True},
+    "9slice": {"setup": setup_9slice, "output": directory_bytes, "sized": True},
+    "spec_thumbnails": {"setup": setup_spec_thumbnails, "output": directory_bytes, "sized": True},
+    "spec_workbook": {"setup": setup_spec_workbook, "output": len, "sized": False},
+}
+
+
+def case_id(name, size):
+    return f"{name}@{size}" if size else name
+
+
+def reset_peak_rss():
+    """このプロセスのピーク RSS（VmHWM）を今の RSS に戻す。できなければ False"""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        return False
+    return True
+
+
+def proc_status_bytes(field):
+    """/proc/self/status の VmRSS・VmHWM など（kB 単位の値をバイトで返す）"""
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(field + ":"):
+                return int(line.split()[1]) * 1024
+    raise KeyError(field)
+
+
+def max_rss():
+    import resource
+    # Linux の ru_maxrss は KB
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def run_case(job):
+    """
+    プロセスプール用（ケースごとに新しいプロセス）: 1ケースを repeat 回実行して計測する
+    返り値: {"wall": 最短の秒数, "wall_median": 中央値, "peak_rss": 計測中のピーク（バイト）,
+             "setup_rss": 入力を作り終えた時点の RSS, "run_rss": peak_rss - setup_rss, "output_bytes": バイト}
+    """
+    name, size, repeat = job
+    for directory in (TOOLS_DIR, DOCS_DIR):
+        if directory not in sys.path:
+            sys.path.insert(0, directory)
+    os.chdir(TOOLS_DIR)
+
+    case = CASES[name]
+    with tempfile.TemporaryDirectory() as work_dir:
+        run = case["setup"](size, work_dir)
+        reset = reset_peak_rss()
+        # ピークを戻せなければ、入力を作るときのピークを引く
+        setup_rss = proc_status_bytes("VmRSS") if reset else max_rss()
+
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = run()
+            times.append(time.perf_counter() - start)
+        peak_rss = proc_status_bytes("VmHWM") if reset else max_rss()
+
+        output_bytes = case["output"](result)
+
+    return {"wall": min(times), "wall_median": statistics.median(times),
+            "peak_rss": peak_rss, "setup_rss": setup_rss, "run_rss": max(0, peak_rss - setup_rss),
+            "output_bytes": output_bytes}
+
+
+def run_isolated(job):
+    """ケースを新しいプロセスで実行する（前のケースのメモリを引き継がないように spawn）"""
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+        return executor.submit(run_case, job).result()
+
+
+# ============================================
+# 履歴と劣化の判定
+# ============================================
+def machine_id():
+    """同じマシンの結果どうしだけを比べるための識別子"""
+    return f"{platform.node()}/{platform.machine()}/{os.cpu_count()}cpu/py{platform.python_version()}"
+
+
+def git_revision():
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=TOOLS_DIR,
+                                capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+def load_history(path):
+    if not os.path.exists(path):
+        return {"version": HISTORY_VERSION, "runs": []}
+    with open(path, encoding="utf-8") as f:
+        history = json.load(f)
+    if history.get("version") != HISTORY_VERSION:
+        return {"version": HISTORY_VERSION, "runs": []}
+    return history
+
+
+def save_history(history, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(history, f, ensure_ascii=False, indent=1)
+    os.replace(tmp_path, path)
+
+
+def baseline(history, machine, case, window):
+    """
+    同じマシンの直近 window 回（劣化と判定された回は除く）の中央値
+    返り値: {"wall": ..., "run_rss": ..., "output_bytes": ...}（履歴がなければ None）
+    """
+    results = [run["results"][case] for run in history["runs"]
+               if run["machine"] == machine and case in run["results"]
+               and not run["results"][case].get("regressed")][-window:]
+    if not results:
+        return None
+    return {metric: statistics.median(r[metric] for r in results)
+            for metric in ("wall", "run_rss", "output_bytes")}
+
+
+def regressions(result, base, thresholds):
+    """しきい値を超えて増えた指標の一覧 [(指標, 基準値, 今回の値, 増加率%), ...]"""
+    floors = {"wall": MIN_TIME_DELTA, "run_rss": MIN_MEMORY_DELTA, "output_bytes": 0}
+    found = []
+    for metric, threshold in thresholds.items():
+        before, after = base[metric], result[metric]
+        if after - before <= floors[metric] or before <= 0:
+            continue
+        increase = (after / before - 1) * 100
+        if increase > threshold:
+            found.append((metric, before, after, increase))
+    return found
+
+
+def format_metric(metric, value):
+    if metric == "wall":
+        return f"{value * 1000:.1f}ms"
+    if metric == "run_rss":
+        return f"{value / 1024 / 1024:.1f}MB"
+    return f"{value:,.0f}B"
+
+
+def change(result, base, metric):
+    if base is None or not base[metric]:
+        return "     ─"
+    return f"{(result[metric] / base[metric] - 1) * 100:+5.0f}%"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="アセット生成スクリプトのベンチマーク")
+    parser.add_argument("cases", nargs="*", help=f"実行するケース（既定: すべて。{', '.join(CASES)}）")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help="合成入力の一辺のピクセル数")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="1ケースの実行回数（最短を使う）")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="実行時間が何%%増えたら劣化とするか")
+    parser.add_argument("--memory-threshold", type=float, default=DEFAULT_MEMORY_THRESHOLD,
+                        help="計測中のピークメモリの増分（入力を除く）が何%%増えたら劣化とするか")
+    parser.add_argument("--bytes-threshold", type=float, default=DEFAULT_BYTES_THRESHOLD,
+                        help="出力バイト数が何%%増えたら劣化とするか")
+    parser.add_argument("--window", type=int, default=DEFAULT_WINDOW,
+                        help="比較に使う過去の実行回数（中央値）")
+    parser.add_argument("--history", default=HISTORY_PATH, help="履歴ファイル")
+    parser.add_argument("--no-record", action="store_true", help="履歴に追記しない")
+    args = parser.parse_args(argv)
+
+    unknown = [name for name in args.cases if name not in CASES]
+    if unknown:
+        raise SystemExit(f"不明なケース: {', '.join(unknown)}（{', '.join(CASES)}）")
+
+    jobs = []
+    for name in args.cases or CASES:
+        sizes = args.sizes if CASES[name]["sized"] else [None]
+        jobs.extend((name, size, args.repeat) for size in sizes)
+
+    history = load_history(args.history)
+    machine = machine_id()
+    thresholds = {"wall": args.threshold, "run_rss": args.memory_threshold,
+                  "output_bytes": args.bytes_threshold}
+
+    print(f"{'case':<22} {'time':>10} {'':>6} {'run RSS':>10} {'':>6} {'output':>12} {'':>6}")
+    results = {}
+    failed = []
+    for job in jobs:
+        case = case_id(job[0], job[1])
+        result = run_isolated(job)
+        base = baseline(history, machine, case, args.window)
+        found = regressions(result, base, thresholds) if base else []
+        if found:
+            result["regressed"] = True
+            failed.extend((case,) + item for item in found)
+        results[case] = result
+        print(f"{case:<22} {format_metric('wall', result['wall']):>10} {change(result, base, 'wall')} "
+              f"{format_metric('run_rss', result['run_rss']):>10} {change(result, base, 'run_rss')} "
+              f"{format_metric('output_bytes', result['output_bytes']):>12} "
+              f"{change(result, base, 'output_bytes')}{'  ← 劣化' if found else ''}")
+
+    if not args.no_record:
+        history["runs"].append({
+            "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+            "revision": git_revision(),
+            "machine": machine,
+            "repeat": args.repeat,
+            "results": results,
+        })
+        save_history(history, args.history)
+        print(f"履歴に追記しました: {os.path.relpath(args.history)}")
+
+    if failed:
+        print(f"\n劣化 {len(failed)}件（直近 {args.window} 回の中央値との比較）:")
+        for case, metric, before, after, increase in failed:
+            print(f"  {case} {metric}: {format_metric(metric, before)} -> {format_metric(metric, after)}"
+                  f"（+{increase:.0f}%、しきい値 {thresholds[metric]:g}%）")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,485 @@
+#!/usr/bin/env python3
+"""
+アセット生成スクリプトをまとめて実行するビルドの入口
+各生成スクリプトを「入力・出力・依存するタスク」つきのタスクとして登録し、
+依存関係のないタスクは -j のプロセス数まで同時に実行する
+
+  kirimi           generate_kirimi.py           切り身画像
+  fish_sprites     import_fish_sprites.py       ForlocalAsset/sakana の魚の画像を取り込んでトリミング（kirimi の後）
+  rainbow_knives   generate_rainbow_knives.py   色違いの包丁
+  rounded_corners  generate_rounded_corners.py  角丸パネル
+  knife_rotations  bake_knife_rotations.py      ゲームが読み込む包丁の回転済みシート（--game-only）
+  brick_patterns   bake_brick_patterns.py       ブロック配置パターン（fish_sprites の後）
+  fonts            subset_fonts.py              フォントのサブセット
+  spec             docs/sabake_spec_generator.py  仕様書（ほかの全タスクの後。--force 以外は --incremental）
+
+名前を指定したときだけ実行するタスク（既定の全タスクにも、ほかのタスクの依存にも入らない）:
+  knife_rotation_compare  bake_knife_rotations.py  色違いの包丁・16/64 方向のシートを Exports に作って比較表を出す
+
+PIL・numpy・openpyxl などはタスクを実行するプロセスの中で初めて import する。
+入力・出力・スクリプトが前回の実行から変わっていないタスクは、モジュールを読み込まずにスキップする
+（Tools/.build_cache/tasks.json。各スクリプトの出力単位のキャッシュとは別）ので、
+--help や何も変わっていないときの実行はすぐ終わる。
+
+使い方:
+  python build.py                      # 全タスク（変わったものだけ）
+  python build.py -j 8                 # 8プロセスで並列実行
+  python build.py knife_rotations      # 指定したタスクと、その依存タスクだけ
+  python build.py knife_rotation_compare   # 名前を指定したときだけ実行するタスク
+  python build.py --list               # タスクの一覧と状態
+  python build.py --force              # キャッシュを無視して全部作り直す
+  python build.py --force --trace trace.json   # 処理段階ごとの時間を記録（build_trace.py）
+  python build.py --watch              # 入力を監視し、変わったファイルに依存するタスクだけ作り直し続ける
+
+--watch は各タスクの入力とスクリプトを DEFAULT_POLL_INTERVAL 秒ごとに stat し（内容は読まない）、
+続けて保存されている間は DEFAULT_DEBOUNCE 秒静かになるまで待ってから、変わったファイルを入力にするタスクと
+その後に実行するタスクだけを、生成スクリプトを読み込み済みの常駐ワーカーで実行する。
+"""
+
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from build_cache import CACHE_DIR, BuildCache
+import build_trace
+import argparse
+import contextlib
+import csv
+import glob
+import importlib
+import io
+import os
+import signal
+import sys
+import time
+import traceback
+
+TOOLS_DIR = os.path.dirname(os.path.abspath(__file__))
+DOCS_DIR = os.path.join(os.path.dirname(TOOLS_DIR), "docs")
+TASKS_MANIFEST_PATH = os.path.join(CACHE_DIR, "tasks.json")
+
+RESOURCES_DIR = "../Assets/Resources"
+SPRITES_DIR = f"{RESOURCES_DIR}/Sprites"
+# ローカル専用の素材フォルダ（sabake_spec_generator.py と同じ環境変数）
+ASSET_BASE = os.environ.get("SABAKE_ASSET_BASE", "../ForlocalAsset")
+
+# --watch の監視間隔と、続けて保存されたときにまとめて待つ時間（秒）
+DEFAULT_POLL_INTERVAL = 0.1
+DEFAULT_DEBOUNCE = 0.25
+
+# どのタスクも使う共通モジュール（変わったら全タスクを作り直す）
+COMMON_CODE = ["build_cache", "png_encoder"]
+
+
+def stage_fish_images():
+    """StageData.csv の fish_image（ブロック配置を焼き込む魚の画像）のパス"""
+    path = os.path.join(TOOLS_DIR, RESOURCES_DIR, "StageData.csv")
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+    return sorted({f"{RESOURCES_DIR}/{values[2].strip()}.png" for values in rows[1:] if len(values) >= 8})
+
+
+def local_fish_sprites():
+    """
+    import_fish_sprites.py の出力（ForlocalAsset/sakana の画像と同じ名前の Resources/Sprites の画像）
+    ローカル素材がない環境では、取り込み済みのステージの魚があれば最新とみなす
+    """
+    sources = glob.glob(os.path.join(TOOLS_DIR, ASSET_BASE, "sakana", "*.png"))
+    return sorted(f"{SPRITES_DIR}/{os.path.basename(path)}" for path in sources) or stage_fish_images()
+
+
+class Task:
+    """
+    生成スクリプト1つ分のタスク
+
+    Args:
+        name: タスク名（コマンドラインで指定する名前）
+        module: main(argv) を持つモジュール名
+        inputs: 入力ファイル（Tools/ からの相対パス、glob 可）
+        outputs: 出力ファイル（同上）。1つもなければ未生成として実行する
+        deps: 先に実行するタスク名
+        code: module 以外に生成結果に関わるモジュール名
+        argv: main に渡す引数
+        force_argv: --force のときに argv の代わりに渡す引数（既定は argv + ["--force"]）
+        jobs: スクリプト自身が -j を受け付けるなら True
+        path: module があるディレクトリ（既定は Tools/）
+        optional: True なら名前を指定したときだけ実行する（既定の全タスクに含めない）
+    """
+
+    def __init__(self, name, module, inputs=(), outputs=(), deps=(), code=(), argv=(), force_argv=None,
+                 jobs=False, path=TOOLS_DIR, optional=False):
+        self.name = name
+        self.module = module
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.deps = list(deps)
+        self.code = [os.path.join(path, m + ".py") for m in [module] + list(code)] + \
+                    [os.path.join(TOOLS_DIR, m + ".py") for m in COMMON_CODE]
+        self.argv = list(argv)
+        self.force_argv = self.argv + ["--force"] if force_argv is None else list(force_argv)
+        self.jobs = jobs
+        self.path = path
+        self.optional = optional
+
+
+TASKS = [
+    Task("kirimi", "generate_kirimi",
+         inputs=[f"{RESOURCES_DIR}/SpriteTrim.csv"],
+         outputs=[f"{SPRITES_DIR}/kirimi.png", f"{SPRITES_DIR}/kirimi.png.meta"],
+         code=["trim_sprites"]),
+    # SpriteTrim.csv を書き換えるので kirimi と同時には実行しない
+    Task("fish_sprites", "import_fish_sprites",
+         inputs=[f"{ASSET_BASE}/sakana/*.png"],
+         outputs=local_fish_sprites(),
+         deps=["kirimi"], code=["trim_sprites", "pack_sprite_atlas"]),
+    Task("rainbow_knives", "generate_rainbow_knives",
+         inputs=[f"{SPRITES_DIR}/knife.png"],
+         outputs=[f"{SPRITES_DIR}/Knives/knife_*.png"]),
+    Task("rounded_corners", "generate_rounded_corners",
+         outputs=[f"{SPRITES_DIR}/UI/rounded_*.png"]),
+    # ゲームが読み込むシートだけ（--watch で包丁を直したときにすぐ反映されるように）
+    Task("knife_rotations", "bake_knife_rotations",
+         inputs=[f"{SPRITES_DIR}/knife.png*"],
+         outputs=[f"{SPRITES_DIR}/KnifeRotations/*_*.png", f"{SPRITES_DIR}/KnifeRotations/*_frames.csv"],
+         code=["trim_sprites", "export_resolution_tiers"], argv=["--game-only"], jobs=True),
+    # 比較用のシート（色違いの包丁・ほかの方向数）と比較表。knife_rotations の後なら knife_32 はキャッシュで飛ばす
+    Task("knife_rotation_compare", "bake_knife_rotations",
+         inputs=[f"{SPRITES_DIR}/knife.png*", f"{SPRITES_DIR}/Knives/knife_*.png*"],
+         outputs=["../Exports/KnifeRotations/*/*_*.png", "../Exports/KnifeRotations/*/*_frames.csv"],
+         deps=["rainbow_knives", "knife_rotations"], code=["trim_sprites", "export_resolution_tiers"],
+         jobs=True, optional=True),
+    # 入力はステージの魚の画像だけ（包丁など Sprites のほかの画像が変わっても作り直さない）
+    Task("brick_patterns", "bake_brick_patterns",
+         inputs=[f"{RESOURCES_DIR}/StageData.csv", f"{RESOURCES_DIR}/SpriteTrim.csv", *stage_fish_images()],
+         outputs=[f"{RESOURCES_DIR}/BrickPatterns/stage_*.txt"],
+         deps=["kirimi", "fish_sprites"], code=["trim_sprites"]),
+    Task("fonts", "subset_fonts",
+         inputs=[f"{RESOURCES_DIR}/TextData.csv", f"{RESOURCES_DIR}/StageData.csv",
+                 "../Assets/Scripts/**/*.cs", "../Assets/Fonts/*.tt[fc]"],
+         outputs=["../Assets/Fonts/Subset/*.ttf", "../Assets/Fonts/Subset/characters.txt"]),
+    Task("spec", "sabake_spec_generator",
+         inputs=[f"{RESOURCES_DIR}/**/*", "../Assets/Scripts/**/*.cs", "../Assets/Scenes/**/*",
+                 "../Assets/Prefabs/**/*", "../docs/specification_update_*.txt", f"{ASSET_BASE}/sakana/*.png"],
+         outputs=["../docs/specification.xlsx"],
+         deps=["kirimi", "fish_sprites", "rainbow_knives", "rounded_corners", "knife_rotations", "brick_patterns",
+               "fonts"],
+         code=["unity_asset_index"], argv=["--incremental"], force_argv=[], jobs=True, path=DOCS_DIR),
+]
+
+
+# ============================================
+# 依存関係
+# ============================================
+def resolve(patterns):
+    """glob パターンを実在するファイルの一覧にする（名前順・重複なし）"""
+    paths = []
+    for pattern in patterns:
+        paths.extend(p for p in sorted(glob.glob(pattern, recursive=True)) if os.path.isfile(p))
+    return list(dict.fromkeys(paths))
+
+
+def select_tasks(tasks, names):
+    """指定したタスク（なければ optional でない全タスク）と、その依存タスクを登録順で返す"""
+    by_name = {task.name: task for task in tasks}
+    unknown = [name for name in names if name not in by_name]
+    if unknown:
+        raise SystemExit(f"不明なタスク: {', '.join(unknown)}（--list で一覧）")
+
+    selected = set()
+    stack = list(names or [task.name for task in tasks if not task.optional])
+    while stack:
+        name = stack.pop()
+        if name not in selected:
+            selected.add(name)
+            stack.extend(by_name[name].deps)
+    return [task for task in tasks if task.name in selected]
+
+
+def task_key(cache, task):
+    """入力・スクリプト・引数から作るタスクのキー（-j と --force は結果を変えないので含めない）"""
+    return cache.compute_key("build:" + task.name, params={"argv": task.argv},
+                             inputs=resolve(task.inputs), code=task.code)
+
+
+def is_up_to_date(cache, task, key):
+    outputs = resolve(task.outputs)
+    return bool(outputs) and all(cache.is_up_to_date(path, key) for path in outputs)
+
+
+# ============================================
+# 実行
+# ============================================
+def run_task(job):
+    """
+    プロセスプール用: タスクのモジュールをここで import して main(argv) を呼ぶ
+    返り値: (タスク名, 成功したか, 標準出力, 秒数)
+    """
+    name, module, path, argv = job
+    os.chdir(TOOLS_DIR)
+    for directory in (TOOLS_DIR, path):
+        if directory not in sys.path:
+            sys.path.insert(0, directory)
+
+    output = io.StringIO()
+    start = time.perf_counter()
+    ok = True
+    with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output), \
+            build_trace.span(f"task {name}", category="task", argv=argv):
+        try:
+            importlib.import_module(module).main(argv)
+        except SystemExit as e:
+            ok = e.code in (None, 0)
+        except Exception:
+            traceback.print_exc()
+            ok = False
+    return name, ok, output.getvalue(), time.perf_counter() - start
+
+
+def task_argv(task, force, inner_jobs):
+    argv = list(task.force_argv if force else task.argv)
+    if task.jobs:
+        argv += ["-j", str(inner_jobs)]
+    return argv
+
+
+def build(tasks, workers=None, force=False, dry_run=False, executor=None):
+    """
+    依存関係の順にタスクを実行し、{タスク名: 状態} を返す
+    状態: "built" / "up to date" / "failed" / "skipped"（依存タスクが失敗）/ "would build"（dry_run）
+    executor を渡すと、そのワーカーでタスクを実行する（--watch の常駐ワーカー。終了は呼び出し側）
+    """
+    workers = workers or os.cpu_count() or 1
+    cache = BuildCache(TASKS_MANIFEST_PATH, force=force)
+    names = {task.name for task in tasks}
+    waiting = {task.name: task for task in tasks}
+    status = {}
+    running = {}
+    # タスクの中の並列数: 同時に走るタスク数でコアを分け合う
+    inner_jobs = max(1, workers // max(1, min(workers, len(tasks))))
+
+    def finish(name, state, output="", elapsed=None):
+        status[name] = state
+        timing = f" {elapsed:.1f}秒" if elapsed is not None else ""
+        print(f"[{name}] {state}{timing}", flush=True)
+        for line in output.rstrip("\n").splitlines():
+            print(f"  {line}")
+
+    owns_executor = executor is None
+    if owns_executor and workers > 1 and not dry_run:
+        executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        while waiting or running:
+            for name, task in list(waiting.items()):
+                deps = [d for d in task.deps if d in names]
+                if any(status.get(d) in ("failed", "skipped") for d in deps):
+                    del waiting[name]
+                    finish(name, "skipped")
+                    continue
+                if not all(status.get(d) in ("built", "up to date", "would build") for d in deps):
+                    continue
+
+                del waiting[name]
+                argv = task_argv(task, force, inner_jobs)
+                if is_up_to_date(cache, task, task_key(cache, task)):
+                    finish(name, "up to date")
+                elif dry_run:
+                    finish(name, "would build")
+                elif executor is None:
+                    _, ok, output, elapsed = run_task((name, task.module, task.path, argv))
+                    record(cache, task, ok)
+                    finish(name, "built" if ok else "failed", output, elapsed)
+                else:
+                    running[executor.submit(run_task, (name, task.module, task.path, argv))] = task
+
+            if not running:
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                task = running.pop(future)
+                _, ok, output, elapsed = future.result()
+                record(cache, task, ok)
+                finish(task.name, "built" if ok else "failed", output, elapsed)
+    finally:
+        if owns_executor and executor is not None:
+            executor.shutdown()
+        cache.save()
+    return status
+
+
+def record(cache, task, ok):
+    """成功したタスクの出力を、実行後の入力から作ったキーで記録する（失敗したら次回も実行する）"""
+    if not ok:
+        return
+    key = task_key(cache, task)
+    for path in resolve(task.outputs):
+        cache.record(path, key, "build:" + task.name, params={"argv": task.argv})
+
+
+# ============================================
+# 監視モード（--watch）
+# ============================================
+def watched_files(tasks):
+    """{タスク名: 監視するファイル（入力とスクリプト）の集合}"""
+    return {task.name: set(resolve(task.inputs)) | {path for path in task.code if os.path.exists(path)}
+            for task in tasks}
+
+
+def stat_files(paths):
+    """{パス: (サイズ, 更新時刻)}（消えたファイルは含めない）"""
+    state = {}
+    for path in paths:
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            continue
+        state[path] = (st.st_size, st.st_mtime_ns)
+    return state
+
+
+def scan(tasks, known=()):
+    """監視対象を glob し直して stat する（known も stat するので、消えたファイルも変更として見つかる）"""
+    files = watched_files(tasks)
+    return files, stat_files(set(known).union(*files.values()))
+
+
+def changed_files(before, after):
+    return {path for path in before.keys() | after.keys() if before.get(path) != after.get(path)}
+
+
+def affected_tasks(tasks, files, changed):
+    """変わったファイルを入力にするタスクと、その後に実行するタスク（登録順 = 依存順なので1回なめればよい）"""
+    affected = set()
+    for task in tasks:
+        if files[task.name] & changed or any(dep in affected for dep in task.deps):
+            affected.add(task.name)
+    return [task for task in tasks if task.name in affected]
+
+
+def wait_until_quiet(tasks, state, interval, debounce):
+    """
+    state から変化があるまで待ち、続けて保存されている間（debounce 秒以内に次の変化がある間）はまとめて待つ
+    返り値: (監視対象, 落ち着いた時点の stat, 最初に変化を見つけた時刻)
+    """
+    while True:
+        time.sleep(interval)
+        files, current = scan(tasks, state)
+        if current != state:
+            break
+    detected = time.perf_counter()
+    quiet_since = detected
+    while time.perf_counter() - quiet_since < debounce:
+        time.sleep(interval)
+        files, latest = scan(tasks, state)
+        if latest != current:
+            current = latest
+            quiet_since = time.perf_counter()
+    return files, current, detected
+
+
+def import_modules(modules):
+    """プロセスプール用: 常駐ワーカーに生成スクリプト（と PIL・numpy・openpyxl）を先に読み込んでおく"""
+    os.chdir(TOOLS_DIR)
+    for module, path in modules:
+        for directory in (TOOLS_DIR, path):
+            if directory not in sys.path:
+                sys.path.insert(0, directory)
+        importlib.import_module(module)
+
+
+def start_workers(tasks, workers):
+    """
+    監視モードの常駐ワーカー（変更のたびのプロセス起動と import を省く）
+    Ctrl+C は親プロセスだけが受けて、ワーカーを止める
+    """
+    executor = ProcessPoolExecutor(max_workers=workers, initializer=signal.signal,
+                                   initargs=(signal.SIGINT, signal.SIG_IGN))
+    modules = [(task.module, task.path) for task in tasks]
+    for _ in range(workers):
+        executor.submit(import_modules, modules)
+    return executor
+
+
+def watch(tasks, workers=None, force=False, interval=DEFAULT_POLL_INTERVAL, debounce=DEFAULT_DEBOUNCE):
+    """
+    タスクの入力とスクリプトを stat で監視し、変わったファイルに依存するタスクだけを常駐ワーカーで作り直す
+    （Ctrl+C で終了）
+    スクリプト（.py）が変わったときは、読み込み済みの古いモジュールを使わないようワーカーを作り直す
+    """
+    workers = workers or os.cpu_count() or 1
+    executor = start_workers(tasks, workers)
+    try:
+        build(tasks, workers, force, executor=executor)
+        _, state = scan(tasks)
+        print(f"監視中: {len(state)}ファイル（Ctrl+C で終了）", flush=True)
+        while True:
+            files, current, detected = wait_until_quiet(tasks, state, interval, debounce)
+            changed = changed_files(state, current)
+            print(f"\n変更: {', '.join(sorted(os.path.relpath(path) for path in changed))}", flush=True)
+            affected = affected_tasks(tasks, files, changed)
+            if not affected:
+                print("  この変更で作り直すタスクはありません")
+                state = current
+                continue
+
+            if any(path.endswith(".py") for path in changed):
+                executor.shutdown()
+                executor = start_workers(tasks, workers)
+            status = build(affected, workers, executor=executor)
+
+            # 自分で書き出した出力だけ今の stat にする（ビルド中にほかのファイルが保存されていれば次の周回で拾う）
+            produced = {path for task in affected if status.get(task.name) == "built"
+                        for path in resolve(task.outputs)}
+            _, after = scan(tasks, current)
+            state = {path: stat for path, stat in current.items() if path not in produced}
+            state.update((path, after[path]) for path in produced if path in after)
+            print(f"反映まで {time.perf_counter() - detected:.2f}秒（変更を検出してから）", flush=True)
+    except KeyboardInterrupt:
+        print("\n監視を終了しました")
+    finally:
+        executor.shutdown(cancel_futures=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="アセット生成スクリプトをまとめて実行する")
+    parser.add_argument("tasks", nargs="*", help="実行するタスク（既定: 全部。依存タスクも実行する）")
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+                        help="同時に実行するプロセス数（既定: CPUコア数）")
+    parser.add_argument("--list", action="store_true", help="タスクの一覧と状態を表示する")
+    parser.add_argument("--dry-run", action="store_true", help="実行せずに、作り直すタスクを表示する")
+    parser.add_argument("--force", action="store_true", help="キャッシュを無視してすべて作り直す")
+    parser.add_argument("--trace", metavar="PATH",
+                        help="処理段階ごとの時間を Chrome のトレース形式で書き出す（集計は拡張子を .txt にしたファイル）")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="--trace に tracemalloc のピークメモリも記録する（遅くなる）")
+    parser.add_argument("--watch", action="store_true",
+                        help="ビルドした後も入力を監視し、変わったファイルに依存するタスクだけ作り直し続ける")
+    parser.add_argument("--interval", type=float, default=DEFAULT_POLL_INTERVAL, help="--watch の監視間隔（秒）")
+    parser.add_argument("--debounce", type=float, default=DEFAULT_DEBOUNCE,
+                        help="--watch で続けて保存されたとき、何秒静かになってから作り直すか")
+    args = parser.parse_args()
+
+    if args.trace:
+        build_trace.enable(args.trace, memory=args.trace_memory)
+    os.chdir(TOOLS_DIR)
+    tasks = select_tasks(TASKS, args.tasks)
+    if args.list:
+        for task in tasks:
+            deps = f"  <- {', '.join(task.deps)}" if task.deps else ""
+            print(f"{task.name:<16} {os.path.relpath(task.code[0])}{deps}")
+        args.dry_run = True
+    if args.watch and not args.dry_run:
+        watch(tasks, args.jobs, args.force, args.interval, args.debounce)
+        return
+
+    start = time.perf_counter()
+    status = build(tasks, args.jobs, args.force, args.dry_run)
+    counts = {}
+    for state in status.values():
+        counts[state] = counts.get(state, 0) + 1
+    summary = "、".join(f"{state} {count}" for state, count in counts.items())
+    print(f"{len(status)}タスク（{summary}） {time.perf_counter() - start:.2f}秒")
+    if "failed" in counts or "skipped" in counts:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Tools/ の生成スクリプト共通のビルドキャッシュ
+
+入力（元画像のバイト列）・生成パラメータ・生成スクリプト自身のコードから
+ハッシュキーを作り、キーが変わっていない出力は生成も書き込みもしない。
+ファイルのタイムスタンプが変わらないので、Unityの再インポートも起きない。
+
+マニフェスト（Tools/.build_cache/manifest.json）には、各出力ファイルが
+どのスクリプト・パラメータ・入力から生成されたかを記録する。
+build.py は生成スクリプトを並列に動かすので、保存はロックを取ってマニフェストを読み直し、
+そのプロセスで記録した出力だけを上書きする（他のプロセスが同時に記録した出力を消さない）。
+
+使い方（生成スクリプト側）:
+  cache = BuildCache(force=args.force)
+  key = cache.compute_key("generate_kirimi", params={"size": 1155}, code=[__file__, *PNG_CODE])
+  if not cache.is_up_to_date(output_path, key):
+      img = ...
+      save_png(img, output_path)
+      cache.record(output_path, key, "generate_kirimi", params={"size": 1155})
+  cache.save()
+
+  python build_cache.py          # マニフェストの内容を一覧表示
+"""
+
+from build_trace import span
+import contextlib
+import hashlib
+import json
+import os
+
+try:
+    import fcntl
+except ImportError:   # Windows
+    fcntl = None
+    import msvcrt
+
+TOOLS_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(TOOLS_DIR)
+CACHE_DIR = os.path.join(TOOLS_DIR, ".build_cache")
+MANIFEST_PATH = os.path.join(CACHE_DIR, "manifest.json")
+
+# save_png の書き出しに関わるコード（save_png を使う生成スクリプトは生成キーの code に含める。
+# エンコード方法が変わったら作り直すように）
+PNG_CODE = [os.path.join(TOOLS_DIR, "build_cache.py"), os.path.join(TOOLS_DIR, "png_encoder.py")]
+
+# マニフェスト形式のバージョン（形式を変えたら上げる）
+MANIFEST_VERSION = 1
+
+# 同一プロセス内でのファイルハッシュのメモ（パス → (size, mtime_ns, digest)）
+_digest_memo = {}
+
+
+def file_digest(path):
+    """ファイル内容のSHA-256（stat が同じなら再計算しない）"""
+    st = os.stat(path)
+    memo = _digest_memo.get(path)
+    if memo and memo[:2] == (st.st_size, st.st_mtime_ns):
+        return memo[2]
+
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    digest = h.hexdigest()
+    _digest_memo[path] = (st.st_size, st.st_mtime_ns, digest)
+    return digest
+
+
+def project_relpath(path):
+    """マニフェストに記録するためのプロジェクトルート相対パス"""
+    return os.path.relpath(os.path.abspath(path), PROJECT_ROOT).replace(os.sep, "/")
+
+
+def write_if_changed(path, data):
+    """内容が変わるときだけ書き込む（書き込んだらTrue）"""
+    if os.path.exists(path) and os.path.getsize(path) == len(data):
+        with open(path, "rb") as f:
+            if f.read() == data:
+                return False
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data)
+    return True
+
+
+def save_png(image, path, max_error=0):
+    """
+    PIL画像をPNGにエンコードし、内容が変わるときだけ書き込む
+    形式・フィルタ・zlib 設定は png_encoder で一番小さくなるものを選ぶ（既定は可逆）
+    既存のファイルと画素が同じなら書き込まない（optimize_pngs.py で再圧縮したファイルを
+    キャッシュのない環境で作り直しても、大きい方のエンコードに戻さないように）
+    png_encoder（numpy）はここで初めて読み込む（キャッシュの確認だけなら import しない）
+    """
+    with span("png_compare", path=path):
+        if same_pixels(image, path):
+            return False
+    from png_encoder import encode_png
+    with span("png_encode", path=path, size=list(image.size)):
+        data = encode_png(image, max_error, effort="fast")
+    return write_if_changed(path, data)
+
+
+def same_pixels(image, path):
+    """path の PNG が image と同じサイズ・同じ RGBA 画素ならTrue"""
+    if not os.path.exists(path):
+        return False
+    from PIL import Image
+    try:
+        with Image.open(path) as existing:
+            if existing.size != image.size:
+                return False
+            return existing.convert("RGBA").tobytes() == image.convert("RGBA").tobytes()
+    except OSError:
+        return False
+
+
+@contextlib.contextmanager
+def file_lock(path):
+    """path のロックファイルで排他ロックを取る（別プロセスが持っていれば解放を待つ）"""
+    with open(path, "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:   # LK_LOCK は10秒で諦めるので取れるまで繰り返す
+                    pass
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def load_manifest(path):
+    """マニフェストの出力の記録（なければ・壊れていれば・形式が古ければ空）"""
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}   # 壊れたマニフェストは捨てて作り直す
+    if data.get("version") != MANIFEST_VERSION:
+        return {}
+    return data.get("outputs", {})
+
+
+class BuildCache:
+    """出力ファイルごとの生成キーを記録するキャッシュ"""
+
+    def __init__(self, manifest_path=MANIFEST_PATH, force=False):
+        self.manifest_path = manifest_path
+        self.force = force
+        self.entries = load_manifest(manifest_path)
+        self.changed = set()   # このプロセスで記録・更新した出力（save で書き戻す）
+
+    def compute_key(self, generator, params=None, inputs=(), code=()):
+        """
+        生成キーを計算
+
+        Args:
+            generator: 生成スクリプト名
+            params: 生成パラメータ（JSON化できる値）
+            inputs: 入力ファイルのパス（内容のハッシュをキーに含める）
+            code: 生成コードのファイル（__file__ と、出力に関わる共通モジュール。save_png を使うなら PNG_CODE も）
+        """
+        h = hashlib.sha256()
+        h.update(json.dumps([MANIFEST_VERSION, generator, params],
+                            sort_keys=True, ensure_ascii=False, default=list).encode("utf-8"))
+        for path in list(code) + [None] + list(inputs):
+            h.update(b"\0" if path is None else file_digest(path).encode("ascii"))
+        return h.hexdigest()
+
+    def is_up_to_date(self, output_path, key):
+        """出力が同じキーで生成済みかつ手で書き換えられていなければTrue"""
+        if self.force:
+            return False
+
+        entry = self.entries.get(project_relpath(output_path))
+        if not entry or entry["key"] != key or not os.path.exists(output_path):
+            return False
+
+        st = os.stat(output_path)
+        if [st.st_size, st.st_mtime_ns] == entry["stat"]:
+            return True
+
+        # stat が違っても内容が同じならOK（git checkout 直後など）
+        if file_digest(output_path) != entry["output_hash"]:
+            return False
+        entry["stat"] = [st.st_size, st.st_mtime_ns]
+        self.changed.add(project_relpath(output_path))
+        return True
+
+    def record(self, output_path, key, generator, params=None, inputs=()):
+        """出力の生成元をマニフェストに記録"""
+        st = os.stat(output_path)
+        self.entries[project_relpath(output_path)] = {
+            "key": key,
+            "generator": generator,
+            "params": params,
+            "inputs": {project_relpath(path): file_digest(path) for path in inputs},
+            "output_hash": file_digest(output_path),
+            "stat": [st.st_size, st.st_mtime_ns],
+        }
+        self.changed.add(project_relpath(output_path))
+
+    def refresh(self, output_path):
+        """
+        後処理（optimize_pngs.py の再圧縮など）で出力を書き換えたとき、
+        生成キーはそのままで内容のハッシュだけ更新する（生成スクリプトが作り直さないように）
+        記録がない出力なら何もせず False
+        """
+        entry = self.entries.get(project_relpath(output_path))
+        if entry is None:
+            return False
+        st = os.stat(output_path)
+        entry["output_hash"] = file_digest(output_path)
+        entry["stat"] = [st.st_size, st.st_mtime_ns]
+        self.changed.add(project_relpath(output_path))
+        return True
+
+    def save(self):
+        """
+        変更があればマニフェストを書き出す
+        他のプロセスが先に保存していてもその記録は残し、このプロセスで記録した出力だけを上書きする
+        """
+        if not self.changed:
+            return
+        os.makedirs(os.path.dirname(self.manifest_path), exist_ok=True)
+        with file_lock(self.manifest_path + ".lock"):
+            entries = load_manifest(self.manifest_path)
+            entries.update((path, self.entries[path]) for path in self.changed)
+            tmp_path = f"{self.manifest_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"version": MANIFEST_VERSION, "outputs": entries},
+                          f, ensure_ascii=False, indent=2, sort_keys=True, default=list)
+            os.replace(tmp_path, self.manifest_path)
+        self.entries = entries
+        self.changed.clear()
+
+
+def main():
+    cache = BuildCache()
+    if not cache.entries:
+        print(f"マニフェストは空です: {cache.manifest_path}")
+        return
+
+    for path, entry in sorted(cache.entries.items()):
+        print(f"{path}  <- {entry['generator']}  {json.dumps(entry['params'], ensure_ascii=False)}")
+
+
+if __name__ == "__main__":
+    main()
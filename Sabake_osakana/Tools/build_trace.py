@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+生成スクリプトの処理段階（デコード・画素処理・LANCZOS 縮小・PNG エンコード・openpyxl の保存など）ごとの計測
+span で囲んだ区間の時間（と、指定すれば tracemalloc のピークメモリ）を記録し、
+Chrome のトレース形式の JSON（chrome://tracing や Perfetto で開ける）と、区間名ごとの集計テキストを書き出す
+
+有効にする:
+  python build.py --trace trace.json [--trace-memory]
+  SABAKE_TRACE=trace.json python generate_kirimi.py        # 各スクリプト単体でも環境変数で有効になる
+  SABAKE_TRACE=trace.json SABAKE_TRACE_MEMORY=1 python ../docs/sabake_spec_generator.py
+
+無効のとき span は何もしない共有のコンテキストマネージャを返すだけなので、計測コードは残したままでよい。
+ワーカープロセス（ProcessPoolExecutor）の記録は、最も外側の span を抜けるたびに <出力先>.<pid>.part に追記し、
+有効にしたプロセスが終了するときに1つの JSON にまとめる（集計は <出力先の拡張子を除いた名前>.txt）。
+ピークメモリは tracemalloc で追える Python 側の確保（numpy の配列を含む。PIL 内部のバッファは含まない）。
+
+使い方（計測する側）:
+  from build_trace import span, traced
+  with span("png_encode", path=output_path):
+      data = encode_png(image)
+
+  @traced("render_panels")     # 関数全体を1区間にする
+  def render_panels(panels): ...
+
+  python build_trace.py trace.json    # 書き出したトレースの集計を表示
+"""
+
+import argparse
+import atexit
+import contextlib
+import functools
+import glob
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+TRACE_ENV = "SABAKE_TRACE"
+MEMORY_ENV = "SABAKE_TRACE_MEMORY"
+ROOT_ENV = "SABAKE_TRACE_ROOT"   # 有効にしたプロセスの pid（このプロセスがまとめて書き出す）
+
+_NULL_SPAN = contextlib.nullcontext()
+
+_path = None
+_memory = False
+_root = False
+_pid = None
+_events = []
+_stack = []   # 開いている span ごとの [内側の span のピークメモリ]
+
+
+def enabled():
+    return _path is not None
+
+
+def enable(path, memory=False):
+    """
+    計測を有効にする（環境変数も設定するので、この後に作るワーカープロセスでも有効になる）
+    最初に有効にしたプロセスが、終了時にトレースをまとめて書き出す
+    """
+    global _path, _memory, _root, _pid
+    _path = os.path.abspath(path)
+    _memory = memory
+    _pid = os.getpid()
+    os.environ[TRACE_ENV] = _path
+    os.environ[MEMORY_ENV] = "1" if memory else ""
+    if not _events:
+        if os.environ.setdefault(ROOT_ENV, str(_pid)) == str(_pid):
+            _root = True
+            os.makedirs(os.path.dirname(_path), exist_ok=True)
+            for part in glob.glob(glob.escape(_path) + ".*.part"):
+                os.remove(part)   # 前回中断したときの残り
+            atexit.register(finish)
+            _events.append(process_name_event(os.path.basename(sys.argv[0]) or "python"))
+        else:
+            _events.append(process_name_event(f"worker {_pid}"))
+    if memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+
+def process_name_event(name):
+    return {"name": "process_name", "ph": "M", "pid": os.getpid(), "tid": 0, "args": {"name": name}}
+
+
+def span(name, category="build", **args):
+    """
+    区間を計測するコンテキストマネージャ（無効のときは何もしない）
+    args はトレースの引数として記録する（パス・サイズなど）
+    """
+    if _path is None:
+        return _NULL_SPAN
+    return _span(name, category, args)
+
+
+def traced(name, category="build"):
+    """関数の呼び出し全体を1区間として計測するデコレータ"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _path is None:
+                return func(*args, **kwargs)
+            with _span(name, category, {}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+@contextlib.contextmanager
+def _span(name, category, args):
+    if _pid != os.getpid():
+        _forked()
+    if _memory:
+        start_memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+    _stack.append([0])
+    start = time.perf_counter_ns()
+    try:
+        yield
+    finally:
+        end = time.perf_counter_ns()
+        inner_peak = _stack.pop()[0]
+        event = {"name": name, "cat": category, "ph": "X", "ts": start // 1000,
+                 "dur": (end - start) // 1000, "pid": _pid, "tid": threading.get_ident(), "args": args}
+        if _memory:
+            # reset_peak は内側の span でも呼ぶので、内側のピークと合わせて外側のピークにする
+            peak = max(tracemalloc.get_traced_memory()[1], inner_peak)
+            event["args"] = dict(args, peak_bytes=peak - start_memory)
+            if _stack:
+                _stack[-1][0] = max(_stack[-1][0], peak)
+        _events.append(event)
+        if not _stack and not _root:
+            flush()
+
+
+def _forked():
+    """fork したワーカーでは、親から引き継いだ記録を捨ててワーカーとして記録し直す"""
+    global _pid, _root
+    _pid = os.getpid()
+    _root = False
+    _events.clear()
+    _stack.clear()
+    _events.append(process_name_event(f"worker {_pid}"))
+
+
+def part_path(pid):
+    return f"{_path}.{pid}.part"
+
+
+def flush():
+    """ワーカーの記録を <出力先>.<pid>.part に追記する（1行1イベント）"""
+    if not _events:
+        return
+    with open(part_path(_pid), "a", encoding="utf-8") as f:
+        for event in _events:
+            f.write(json.dumps(event, ensure_ascii=False) + "\n")
+    _events.clear()
+
+
+def summary_path(path):
+    return os.path.splitext(path)[0] + ".txt"
+
+
+def finish():
+    """有効にしたプロセスの終了時: ワーカーの記録とまとめて JSON と集計テキストを書き出す"""
+    if not _root or _pid != os.getpid():
+        return
+    events = list(_events)
+    for part in sorted(glob.glob(glob.escape(_path) + ".*.part")):
+        with open(part, encoding="utf-8") as f:
+            events.extend(json.loads(line) for line in f if line.strip())
+        os.remove(part)
+
+    with open(_path, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f, ensure_ascii=False)
+    text = format_summary(events)
+    with open(summary_path(_path), "w", encoding="utf-8") as f:
+        f.write(text)
+    print(f"トレース: {_path}（集計 {summary_path(_path)}）", file=sys.stderr)
+    print(text, end="", file=sys.stderr)
+
+
+def format_summary(events):
+    """区間名ごとの回数・合計・平均・最大（と最大のピークメモリ）を合計時間の長い順に並べた表"""
+    spans = [e for e in events if e.get("ph") == "X"]
+    totals = {}
+    for event in spans:
+        entry = totals.setdefault(event["name"], {"count": 0, "total": 0, "max": 0, "peak": None})
+        entry["count"] += 1
+        entry["total"] += event["dur"]
+        entry["max"] = max(entry["max"], event["dur"])
+        peak = event["args"].get("peak_bytes")
+        if peak is not None:
+            entry["peak"] = max(entry["peak"] or 0, peak)
+
+    lines = [f"{'span':<32} {'count':>6} {'total':>11} {'mean':>10} {'max':>10} {'peak mem':>10}"]
+    for name, entry in sorted(totals.items(), key=lambda item: -item[1]["total"]):
+        peak = f"{entry['peak'] / 1024 / 1024:.1f}MB" if entry["peak"] is not None else "─"
+        lines.append(f"{name:<32} {entry['count']:>6} {entry['total'] / 1000:>9.1f}ms "
+                     f"{entry['total'] / entry['count'] / 1000:>8.2f}ms {entry['max'] / 1000:>8.1f}ms {peak:>10}")
+    if spans:
+        wall = max(e["ts"] + e["dur"] for e in spans) - min(e["ts"] for e in spans)
+        processes = len({e["pid"] for e in spans})
+        lines.append(f"{len(spans)}区間 {processes}プロセス 全体 {wall / 1000:.1f}ms")
+    return "\n".join(lines) + "\n"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="トレース（Chrome 形式の JSON）の集計を表示する")
+    parser.add_argument("trace", help="build.py --trace などで書き出した JSON")
+    args = parser.parse_args()
+    with open(args.trace, encoding="utf-8") as f:
+        print(format_summary(json.load(f)["traceEvents"]), end="")
+
+
+if os.environ.get(TRACE_ENV):
+    enable(os.environ[TRACE_ENV], memory=bool(os.environ.get(MEMORY_ENV)))
+
+
+if __name__ == "__main__":
+    main()
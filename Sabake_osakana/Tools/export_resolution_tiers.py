@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+プラットフォーム（PC / タブレット / スマホ）ごとの解像度違いのテクスチャを書き出すスクリプト
+生成スクリプトはどれも1サイズしか出力しないが、落ちてくる切り身などは画面上では元画像よりずっと小さい
+
+アセットごとに1回だけ解像度ピラミッド（1/1, 1/2, 1/4, ...）を作り、
+各段は1つ上の段を乗算済みアルファのまま LANCZOS で半分にして作る（縁が黒ずまない）。
+ティアごとに使う段を選んで、.meta ごと書き出す:
+
+  <output-dir>/<tier>/Assets/Resources/Sprites/kirimi.png
+  <output-dir>/<tier>/Assets/Resources/Sprites/kirimi.png.meta   ← PPU・9-slice の枠・サブスプライト矩形を縮小率に合わせる
+  <output-dir>/budget.json                                        ← ティアごとの画素数・バイト数
+
+bake_knife_rotations.py のシートのように対応表（<name>_frames.csv）が隣にあるテクスチャは、
+対応表のコマの矩形と PPU も同じ率で縮小して書き出す。
+
+PPU も同じ率で下げるので、ワールド上の大きさは変わらない
+（トリミング済みのスプライトは SpriteTrimData が縮小率を求めて補正する）。
+モバイル向けビルドの前に <tier>/Assets を プロジェクトの Assets に上書きコピーして使う。
+
+使い方:
+  python export_resolution_tiers.py                                  # Resources 以下の PNG 全部
+  python export_resolution_tiers.py ../Assets/Resources/Sprites/kirimi.png -j 4
+  python export_resolution_tiers.py --budget smartphone=2 --budget tablet=6   # 予算（MB）超過で終了コード1
+"""
+
+from PIL import Image
+from concurrent.futures import ProcessPoolExecutor
+from build_cache import PNG_CODE, TOOLS_DIR, BuildCache, save_png, write_if_changed
+from trim_sprites import META_RECT, format_number
+import argparse
+import glob
+import json
+import math
+import os
+import re
+import shutil
+import sys
+
+# 生成キーに含めるコード（このスクリプトと、出力に関わる共通モジュール）
+GENERATOR_CODE = [__file__, *PNG_CODE, os.path.join(TOOLS_DIR, "trim_sprites.py")]
+
+PROJECT_ROOT = ".."
+RESOURCES_DIR = "../Assets/Resources"
+DEFAULT_SOURCES = [f"{RESOURCES_DIR}/**/*.png"]
+OUTPUT_DIR = "../Exports/Tiers"
+
+# ティアと使うピラミッドの段（0 = 元のサイズ、1 = 1/2、2 = 1/4）
+TIERS = [
+    {"name": "pc", "level": 0},
+    {"name": "tablet", "level": 1},
+    {"name": "smartphone", "level": 2},
+]
+
+# これより小さくは縮小しない（短辺のピクセル数。72px のアイコンは 36px で止まる）
+MIN_SIDE = 32
+
+META_PPU = re.compile(r"^(  spritePixelsToUnits: )([-\d.e]+)$", re.M)
+META_BORDER = re.compile(r"^(  spriteBorder: )\{x: ([-\d.e]+), y: ([-\d.e]+), z: ([-\d.e]+), w: ([-\d.e]+)\}$",
+                         re.M)
+
+
+def collect_sources(sources):
+    """ファイル・ディレクトリ・globパターンからPNGの一覧を作る"""
+    paths = []
+    for source in sources:
+        if os.path.isdir(source):
+            source = os.path.join(source, "**", "*.png")
+        paths.extend(sorted(glob.glob(source, recursive=True)))
+    return list(dict.fromkeys(paths))
+
+
+def half_size(size):
+    return (max(1, (size[0] + 1) // 2), max(1, (size[1] + 1) // 2))
+
+
+def build_pyramid(image, levels):
+    """
+    段 0〜levels の画像のリストを返す（段 0 は元画像）
+    各段は1つ上の段から作る。短辺が MIN_SIDE を下回る段は作らない
+    """
+    pyramid = [image]
+    current = image.convert("RGBA").convert("RGBa")  # 乗算済みアルファ
+    for _ in range(levels):
+        size = half_size(current.size)
+        if min(size) < MIN_SIDE:
+            break
+        current = current.resize(size, Image.LANCZOS)
+        pyramid.append(current.convert("RGBA"))
+    return pyramid
+
+
+def scale_meta(meta, source_size, size):
+    """
+    縮小率に合わせた .meta（PPU・9-slice の枠・サブスプライト矩形）
+    サブスプライト矩形は内容が欠けないように外側へ丸め、テクスチャ内に収める
+    """
+    scale_x = size[0] / source_size[0]
+    scale_y = size[1] / source_size[1]
+    meta = META_PPU.sub(lambda m: m.group(1) + format_number(round(float(m.group(2)) * scale_x, 4)), meta)
+    meta = META_BORDER.sub(
+        lambda m: (f"{m.group(1)}{{x: {format_number(round(float(m.group(2)) * scale_x))}, "
+                   f"y: {format_number(round(float(m.group(3)) * scale_y))}, "
+                   f"z: {format_number(round(float(m.group(4)) * scale_x))}, "
+                   f"w: {format_number(round(float(m.group(5)) * scale_y))}}}"), meta)
+
+    def rect(m):
+        x, y, w, h = (float(m.group(i)) for i in (2, 4, 6, 8))
+        x0 = max(0, math.floor(x * scale_x))
+        y0 = max(0, math.floor(y * scale_y))
+        x1 = min(size[0], max(x0 + 1, math.ceil((x + w) * scale_x)))
+        y1 = min(size[1], max(y0 + 1, math.ceil((y + h) * scale_y)))
+        return (m.group(1) + format_number(x0) + m.group(3) + format_number(y0)
+                + m.group(5) + format_number(x1 - x0) + m.group(7) + format_number(y1 - y0))
+
+    return META_RECT.sub(rect, meta)
+
+
+def frames_csv_path(path):
+    """テクスチャと対になるコマの対応表（bake_knife_rotations.py の <name>_frames.csv）"""
+    return os.path.splitext(path)[0] + "_frames.csv"
+
+
+def scale_frames(text, source_size, size):
+    """
+    縮小率に合わせたコマの対応表（矩形 x, y, width, height と pixels_per_unit）
+    コマは等間隔に並んでいるので、丸めずに小数のまま縮小する（Sprite.Create は小数の矩形を受け付ける）
+    """
+    scale_x = size[0] / source_size[0]
+    scale_y = size[1] / source_size[1]
+    lines = text.splitlines()
+    header = lines[0].split(",")
+    scales = {"x": scale_x, "width": scale_x, "pixels_per_unit": scale_x, "y": scale_y, "height": scale_y}
+    columns = [(header.index(name), scale) for name, scale in scales.items() if name in header]
+    scaled = [lines[0]]
+    for line in lines[1:]:
+        values = line.split(",")
+        if len(values) == len(header):
+            for index, scale in columns:
+                values[index] = format_number(round(float(values[index]) * scale, 4))
+        scaled.append(",".join(values))
+    return "\n".join(scaled) + "\n"
+
+
+def tier_output_path(output_dir, tier, path):
+    rel = os.path.relpath(os.path.abspath(path), os.path.abspath(PROJECT_ROOT))
+    return os.path.join(output_dir, tier, rel)
+
+
+def export_asset(job):
+    """
+    プロセスプール用: 1アセット分のピラミッドを作って全ティアに書き出す
+    返り値: [(tier, 出力パス, 幅, 高さ, 段), ...]
+    """
+    path, output_dir, tiers = job
+    image = Image.open(path)
+    meta_path = path + ".meta"
+    meta = None
+    if os.path.exists(meta_path):
+        with open(meta_path, encoding="utf-8") as f:
+            meta = f.read()
+    frames = None
+    if os.path.exists(frames_csv_path(path)):
+        with open(frames_csv_path(path), encoding="utf-8") as f:
+            frames = f.read()
+
+    pyramid = build_pyramid(image, max(t["level"] for t in tiers))
+    results = []
+    for tier in tiers:
+        level = min(tier["level"], len(pyramid) - 1)
+        output_path = tier_output_path(output_dir, tier["name"], path)
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        if level == 0:
+            # 元のサイズはそのままコピー（再エンコードしない）
+            with open(path, "rb") as f:
+                write_if_changed(output_path, f.read())
+            if meta is not None:
+                write_if_changed(output_path + ".meta", meta.encode("utf-8"))
+            if frames is not None:
+                write_if_changed(frames_csv_path(output_path), frames.encode("utf-8"))
+        else:
+            scaled = pyramid[level]
+            save_png(scaled, output_path)
+            if meta is not None:
+                write_if_changed(output_path + ".meta",
+                                 scale_meta(meta, image.size, scaled.size).encode("utf-8"))
+            if frames is not None:
+                write_if_changed(frames_csv_path(output_path),
+                                 scale_frames(frames, image.size, scaled.size).encode("utf-8"))
+        width, height = pyramid[level].size
+        results.append((tier["name"], output_path, width, height, level))
+    return results
+
+
+def export_tiers(paths, output_dir=OUTPUT_DIR, tiers=TIERS, workers=None, cache=None):
+    """
+    全アセットを書き出し、ティアごとの一覧 {tier: [{path, width, height, bytes}, ...]} を返す
+    cache を渡すと、元画像・.meta・対応表・このスクリプトが変わっていないアセットは作り直さない
+    """
+    jobs = []
+    keys = {}
+    for path in paths:
+        inputs = [path] + [p for p in (path + ".meta", frames_csv_path(path)) if os.path.exists(p)]
+        outputs = [tier_output_path(output_dir, t["name"], path) for t in tiers]
+        if os.path.exists(frames_csv_path(path)):
+            outputs += [frames_csv_path(o) for o in outputs]
+        if cache is not None:
+            key = cache.compute_key("export_resolution_tiers", params={"tiers": tiers, "min_side": MIN_SIDE},
+                                    inputs=inputs, code=GENERATOR_CODE)
+            if all(cache.is_up_to_date(o, key) for o in outputs):
+                continue
+            keys[path] = (key, inputs)
+        jobs.append((path, output_dir, tiers))
+
+    workers = min(workers or os.cpu_count() or 1, max(1, len(jobs)))
+    if workers == 1:
+        results = [export_asset(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(export_asset, jobs))
+
+    if cache is not None:
+        for (path, _, _), outputs in zip(jobs, results):
+            key, inputs = keys[path]
+            for tier, output_path, width, height, level in outputs:
+                for recorded in [output_path] + ([frames_csv_path(output_path)] if frames_csv_path(path) in inputs else []):
+                    cache.record(recorded, key, "export_resolution_tiers",
+                                 params={"tier": tier, "level": level}, inputs=inputs)
+
+    # スキップしたアセットも含めて、書き出し済みのファイルから集計する
+    report = {t["name"]: [] for t in tiers}
+    for path in paths:
+        for tier in tiers:
+            output_path = tier_output_path(output_dir, tier["name"], path)
+            with Image.open(output_path) as image:
+                width, height = image.size
+            report[tier["name"]].append({
+                "path": os.path.relpath(output_path, os.path.join(output_dir, tier["name"])).replace(os.sep, "/"),
+                "width": width, "height": height, "bytes": os.path.getsize(output_path),
+            })
+    return report, len(jobs)
+
+
+def summarize_budget(report):
+    """ティアごとの合計（画素数・PNGのバイト数・RGBA32 でのテクスチャメモリ）"""
+    summary = {}
+    for tier, assets in report.items():
+        pixels = sum(a["width"] * a["height"] for a in assets)
+        summary[tier] = {"assets": len(assets), "pixels": pixels,
+                         "file_bytes": sum(a["bytes"] for a in assets), "texture_bytes": pixels * 4}
+    return summary
+
+
+def parse_budgets(values):
+    """--budget smartphone=2 → {"smartphone": 2 * 1024 * 1024}"""
+    budgets = {}
+    for value in values or []:
+        tier, _, megabytes = value.partition("=")
+        budgets[tier] = float(megabytes) * 1024 * 1024
+    return budgets
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PC / タブレット / スマホ向けの解像度違いのテクスチャを書き出す")
+    parser.add_argument("images", nargs="*", default=DEFAULT_SOURCES,
+                        help="元画像（ファイル・ディレクトリ・globパターン）")
+    parser.add_argument("--output-dir", default=OUTPUT_DIR, help="出力先")
+    parser.add_argument("--budget", action="append", metavar="TIER=MB",
+                        help="ティアごとのテクスチャメモリ（RGBA32）の上限。超えたら終了コード1")
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+                        help="ワーカープロセス数（既定: CPUコア数）")
+    parser.add_argument("--clean", action="store_true", help="書き出す前に出力先を空にする")
+    parser.add_argument("--force", action="store_true",
+                        help="ビルドキャッシュを無視して再生成")
+    args = parser.parse_args()
+
+    if args.clean and os.path.isdir(args.output_dir):
+        shutil.rmtree(args.output_dir)
+    paths = collect_sources(args.images)
+    cache = BuildCache(force=args.force or args.clean)
+    report, exported = export_tiers(paths, args.output_dir, TIERS, args.jobs, cache)
+    cache.save()
+
+    summary = summarize_budget(report)
+    budgets = parse_budgets(args.budget)
+    budget_path = os.path.join(args.output_dir, "budget.json")
+    write_if_changed(budget_path, json.dumps(
+        {"summary": summary, "budgets": budgets, "assets": report},
+        ensure_ascii=False, indent=2).encode("utf-8"))
+
+    print(f"{len(paths)}アセット（{exported}件を書き出し、{len(paths) - exported}件は変更なし） -> {args.output_dir}")
+    print(f"{'ティア':<12}{'画素数':>12}{'PNG':>12}{'RGBA32':>12}")
+    over_budget = False
+    for tier in TIERS:
+        s = summary[tier["name"]]
+        line = (f"{tier['name']:<12}{s['pixels']:>12,}{s['file_bytes'] / 1024:>10.0f}KB"
+                f"{s['texture_bytes'] / 1024:>10.0f}KB")
+        budget = budgets.get(tier["name"])
+        if budget is not None:
+            ok = s["texture_bytes"] <= budget
+            over_budget |= not ok
+            line += f"  予算 {budget / 1024:.0f}KB {'OK' if ok else '超過'}"
+        print(line)
+    print(f"内訳: {budget_path}")
+    if over_budget:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
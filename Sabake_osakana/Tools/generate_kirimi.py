@@ -2,128 +2,246 @@
 """
 魚の切り身画像を生成するスクリプト
 サイズ: 1155x1155 (sakana_normal.pngと同じ)
-"""
-
-from PIL import Image, ImageDraw
-import math
-
-def generate_kirimi(output_path, size=1155):
-    """サーモン風の切り身画像を生成"""
 
-    # 透明な背景
-    img = Image.new('RGBA', (size, size), (0, 0, 0, 0))
-    draw = ImageDraw.Draw(img)
+使い方:
+  python generate_kirimi.py                      # kirimi.png を生成
+  python generate_kirimi.py --supersample 4      # 4倍で描画して縮小（既定は2倍）
+  python generate_kirimi.py --trim               # 透明な縁を切り落とす（trim_sprites.py）
 
-    # 切り身の色
-    salmon_color = (255, 140, 105, 255)  # サーモンピンク
-    fat_color = (255, 245, 238, 255)     # 白い脂
-    skin_color = (180, 180, 180, 255)    # 皮（グレー）
+SpriteTrim.csv に kirimi の記録があれば --trim なしでも同じようにトリミングする
+（正方形のまま書き出すと、記録・.meta のスプライト矩形と合わなくなるため）
 
-    # 中心と大きさ
-    cx, cy = size // 2, size // 2
-    scale = size / 1155  # スケール係数
-
-    # 切り身の形状（楕円を基本に）
-    # メインの身
-    body_width = int(800 * scale)
-    body_height = int(500 * scale)
+  # バリエーション一括生成（乱数シード固定、プロセスプールで並列）
+  python generate_kirimi.py --variants 24 --seed 1 --output-dir out -j 8
+"""
 
-    # 切り身の輪郭を描く（少し斜めの楕円形）
-    points = []
+from PIL import Image, ImageDraw
+from concurrent.futures import ProcessPoolExecutor
+from build_cache import PNG_CODE, TOOLS_DIR, BuildCache, save_png
+from build_trace import span
+from trim_sprites import load_trim_data, resource_key, trim_sprites
+import argparse
+import math
+import os
+import random
+
+# 生成キーに含めるコード（このスクリプトと、出力に関わる共通モジュール）
+GENERATOR_CODE = [__file__, *PNG_CODE,
+                  os.path.join(TOOLS_DIR, "trim_sprites.py"), os.path.join(TOOLS_DIR, "pack_sprite_atlas.py")]
+
+# 切り身の色
+SALMON_COLOR = (255, 140, 105, 255)  # サーモンピンク
+FAT_COLOR = (255, 245, 238, 255)     # 白い脂
+SKIN_COLOR = (180, 180, 180, 255)    # 皮（グレー）
+
+# 形状パラメータの既定値（kirimi.png と同じ）
+DEFAULT_FAT_STRIPES = 7
+DEFAULT_WAVE_PHASE = 0.0
+DEFAULT_SKIN_WIDTH = 40
+
+# 脂の筋を並べる範囲（身の高さに対する比率）
+FAT_STRIPE_TOP = 0.35
+FAT_STRIPE_SPAN = 0.72
+
+# バリエーション一括生成の乱数範囲
+VARIANT_FAT_STRIPES = (5, 8)
+VARIANT_SKIN_WIDTH = (25, 55)
+
+
+def kirimi_shapes(size, supersample=2, fat_stripes=DEFAULT_FAT_STRIPES,
+                  wave_phase=DEFAULT_WAVE_PHASE, skin_width=DEFAULT_SKIN_WIDTH):
+    """
+    切り身の形状を描画解像度（size * supersample）の座標で返す
+    形状の定義はここだけにまとめ、倍率はすべて supersample から決める
+
+    Returns:
+        [(種類, 点列, 色, 線幅), ...]  種類は "polygon" または "line"
+    """
+    scale = size / 1155       # スケール係数
+    s = scale * supersample   # 描画解像度での1単位
+    half = supersample / 2
+
+    # 中心と大きさ（半径は出力サイズでの幅・高さの半分）
+    cx = cy = size * half
+    body_width = int(800 * scale) * half
+    body_height = int(500 * scale) * half
+
+    shapes = []
+
+    # 切り身の輪郭（楕円 + 少し変形：上部を少し平らに、下部を丸く）
+    outline = []
     for i in range(360):
         angle = math.radians(i)
-        # 楕円 + 少し変形
-        x = cx + body_width * 0.5 * math.cos(angle)
-        y = cy + body_height * 0.5 * math.sin(angle)
-        # 上部を少し平らに、下部を丸く
+        x = cx + body_width * math.cos(angle)
+        y = cy + body_height * math.sin(angle)
         if math.sin(angle) < 0:
-            y += 30 * scale * math.sin(angle)
-        points.append((x, y))
+            y += 30 * s * math.sin(angle)
+        outline.append((x, y))
+    shapes.append(("polygon", outline, SALMON_COLOR, 0))
+
+    # 白い脂の筋（波打つ線）
+    step = max(1, round(4 * supersample))
+    frequency = 0.06 / supersample
+    center = (fat_stripes - 1) / 2
+    spacing = body_height * (FAT_STRIPE_SPAN / max(1, fat_stripes - 1))
+    for i in range(fat_stripes):
+        stripe_y = cy - body_height * FAT_STRIPE_TOP + i * spacing
+        stripe_width = body_width * (0.8 - abs(i - center) * 0.08)
+        stripe_x1 = cx - stripe_width * 0.45
+        stripe_x2 = cx + stripe_width * 0.45
 
-    # メインの身を描画
-    draw.polygon(points, fill=salmon_color)
-
-    # 白い脂の筋を描く
-    for i in range(6):
-        stripe_y = cy - body_height * 0.3 + i * (body_height * 0.1)
-        stripe_width = body_width * (0.7 - abs(i - 2.5) * 0.1)
-        stripe_x1 = cx - stripe_width * 0.4
-        stripe_x2 = cx + stripe_width * 0.4
-
-        # 波打つ脂の筋
         wave_points = []
-        for j in range(int(stripe_x1), int(stripe_x2), 5):
-            wave_y = stripe_y + math.sin((j - stripe_x1) * 0.05) * 8 * scale
+        for j in range(int(stripe_x1), int(stripe_x2), step):
+            wave_y = stripe_y + math.sin((j - stripe_x1) * frequency + wave_phase) * 7.5 * s
             wave_points.append((j, wave_y))
 
         if len(wave_points) > 1:
-            draw.line(wave_points, fill=fat_color, width=int(12 * scale))
+            shapes.append(("line", wave_points, FAT_COLOR, int(20 * s)))
 
     # 皮の部分（下端）
     skin_points = []
-    for i in range(180, 360):
-        angle = math.radians(i)
-        x = cx + body_width * 0.5 * math.cos(angle)
-        y = cy + body_height * 0.5 * math.sin(angle) + 20 * scale
-        skin_points.append((x, y))
-
-    if len(skin_points) > 1:
-        draw.line(skin_points, fill=skin_color, width=int(25 * scale))
-
-    # アンチエイリアス処理（4倍で描画して縮小）
-    img_large = Image.new('RGBA', (size * 2, size * 2), (0, 0, 0, 0))
-    draw_large = ImageDraw.Draw(img_large)
-
-    # 大きいサイズで再描画
-    cx2, cy2 = size, size
-    scale2 = scale * 2
-
-    # 切り身の輪郭
-    points2 = []
-    for i in range(360):
-        angle = math.radians(i)
-        x = cx2 + body_width * math.cos(angle)
-        y = cy2 + body_height * math.sin(angle)
-        if math.sin(angle) < 0:
-            y += 60 * scale * math.sin(angle)
-        points2.append((x, y))
-
-    draw_large.polygon(points2, fill=salmon_color)
-
-    # 白い脂の筋（大きいサイズ）
-    for i in range(7):
-        stripe_y = cy2 - body_height * 0.35 + i * (body_height * 0.12)
-        stripe_width = body_width * (0.8 - abs(i - 3) * 0.08)
-        stripe_x1 = cx2 - stripe_width * 0.45
-        stripe_x2 = cx2 + stripe_width * 0.45
-
-        wave_points = []
-        for j in range(int(stripe_x1), int(stripe_x2), 8):
-            wave_y = stripe_y + math.sin((j - stripe_x1) * 0.03) * 15 * scale
-            wave_points.append((j, wave_y))
-
-        if len(wave_points) > 1:
-            draw_large.line(wave_points, fill=fat_color, width=int(20 * scale2))
-
-    # 皮の部分（大きいサイズ）
-    skin_points2 = []
     for i in range(170, 370):
         angle = math.radians(i)
-        x = cx2 + body_width * math.cos(angle)
-        y = cy2 + body_height * math.sin(angle) + 35 * scale2
-        skin_points2.append((x, y))
-
-    if len(skin_points2) > 1:
-        draw_large.line(skin_points2, fill=skin_color, width=int(40 * scale2))
-
-    # 縮小してアンチエイリアス
-    img_final = img_large.resize((size, size), Image.LANCZOS)
-
-    # 保存
-    img_final.save(output_path, 'PNG')
+        x = cx + body_width * math.cos(angle)
+        y = cy + body_height * math.sin(angle) + 35 * s
+        skin_points.append((x, y))
+    shapes.append(("line", skin_points, SKIN_COLOR, int(skin_width * s)))
+
+    return shapes
+
+
+def render_kirimi(size=1155, supersample=2, **shape_params):
+    """
+    切り身を1回だけ描画してアンチエイリアスした画像を返す
+    supersample 倍の解像度で描画し、LANCZOSで size に縮小する
+    """
+    canvas = size * supersample
+    with span("kirimi_draw", size=canvas):
+        img = Image.new('RGBA', (canvas, canvas), (0, 0, 0, 0))
+        draw = ImageDraw.Draw(img)
+
+        for kind, points, color, width in kirimi_shapes(size, supersample, **shape_params):
+            if kind == "polygon":
+                draw.polygon(points, fill=color)
+            else:
+                draw.line(points, fill=color, width=width)
+
+    if supersample == 1:
+        return img
+    with span("resize_lanczos", size=[canvas, size]):
+        return img.resize((size, size), Image.LANCZOS)
+
+
+def generate_kirimi(output_path, size=1155, cache=None, supersample=2, trim=False, **shape_params):
+    """
+    サーモン風の切り身画像を生成
+    cache を渡すと、生成キーが変わっていなければスキップする
+    trim=True なら透明な縁を切り落とし、SpriteTrim.csv に元サイズとオフセットを記録する
+    """
+    params = {"size": size, "supersample": supersample, "trim": trim, **shape_params}
+    if cache is not None:
+        key = cache.compute_key("generate_kirimi", params=params, code=GENERATOR_CODE)
+        if cache.is_up_to_date(output_path, key):
+            print(f"変更なし（スキップ）: {output_path}")
+            return
+
+    img = render_kirimi(size, supersample, **shape_params)
+
+    # 保存（内容が同じなら書き込まない）
+    save_png(img, output_path)
+    if trim:
+        _, warnings = trim_sprites([output_path])
+        for message in warnings.get(output_path, []):
+            print(f"Warning: {message}")
+    if cache is not None:
+        cache.record(output_path, key, "generate_kirimi", params=params)
     print(f"切り身画像を生成しました: {output_path}")
-    print(f"サイズ: {size}x{size}")
+    size_text = f"{size}x{size}"
+    if trim:
+        width, height = Image.open(output_path).size
+        size_text += f"（トリミング後 {width}x{height}）"
+    print(f"サイズ: {size_text}")
+
+
+def variant_params(count, seed):
+    """シードから切り身バリエーションの形状パラメータを決める"""
+    rng = random.Random(seed)
+    return [{
+        "fat_stripes": rng.randint(*VARIANT_FAT_STRIPES),
+        "wave_phase": round(rng.uniform(0, 2 * math.pi), 4),
+        "skin_width": rng.randint(*VARIANT_SKIN_WIDTH),
+    } for _ in range(count)]
+
+
+def _render_variant(job):
+    """プロセスプール用: 1つのバリエーションを描画して保存"""
+    output_path, size, supersample, shape_params = job
+    with span("kirimi_variant", path=output_path):
+        save_png(render_kirimi(size, supersample, **shape_params), output_path)
+    return output_path
+
+
+def generate_variants(output_dir, count, seed=0, size=1155, supersample=2, workers=None, cache=None):
+    """
+    切り身のバリエーションを並列で一括生成（kirimi_000.png, kirimi_001.png, ...）
+    同じシードなら同じバリエーションになる
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    jobs = [(os.path.join(output_dir, f"kirimi_{i:03d}.png"), size, supersample, params)
+            for i, params in enumerate(variant_params(count, seed))]
+
+    keys = {}
+    if cache is not None:
+        for output_path, _, _, shape_params in jobs:
+            keys[output_path] = cache.compute_key(
+                "generate_kirimi", params={"size": size, "supersample": supersample, **shape_params},
+                code=GENERATOR_CODE)
+        jobs = [job for job in jobs if not cache.is_up_to_date(job[0], keys[job[0]])]
+
+    workers = min(workers or os.cpu_count() or 1, max(1, len(jobs)))
+    if workers == 1:
+        outputs = [_render_variant(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            outputs = list(executor.map(_render_variant, jobs))
+
+    if cache is not None:
+        for output_path, _, _, shape_params in jobs:
+            cache.record(output_path, keys[output_path], "generate_kirimi",
+                         params={"size": size, "supersample": supersample, **shape_params})
+    return outputs
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="魚の切り身画像を生成")
+    parser.add_argument("--size", type=int, default=1155, help="出力サイズ（正方形）")
+    parser.add_argument("--supersample", type=int, default=2,
+                        help="アンチエイリアス用の描画倍率（1で縮小なし）")
+    parser.add_argument("--variants", type=int, default=0,
+                        help="バリエーションをN枚一括生成する")
+    parser.add_argument("--seed", type=int, default=0, help="バリエーションの乱数シード")
+    parser.add_argument("--output-dir", default="../Assets/Resources/Sprites/KirimiVariants",
+                        help="バリエーションの出力先")
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+                        help="ワーカープロセス数（既定: CPUコア数）")
+    parser.add_argument("--trim", action="store_true",
+                        help="透明な縁を切り落とす（SpriteTrim.csv に記録済みなら常に切り落とす）")
+    parser.add_argument("--force", action="store_true",
+                        help="ビルドキャッシュを無視して再生成")
+    args = parser.parse_args(argv)
+
+    cache = BuildCache(force=args.force)
+    if args.variants:
+        outputs = generate_variants(args.output_dir, args.variants, args.seed, args.size,
+                                    args.supersample, args.jobs, cache)
+        print(f"切り身バリエーションを生成しました: {len(outputs)}枚 "
+              f"（{args.variants - len(outputs)}枚は変更なし） -> {args.output_dir}")
+    else:
+        output = "../Assets/Resources/Sprites/kirimi.png"
+        trim = args.trim or resource_key(output) in load_trim_data()
+        generate_kirimi(output, size=args.size, cache=cache, supersample=args.supersample, trim=trim)
+    cache.save()
+
 
 if __name__ == "__main__":
-    output = "../Assets/Resources/Sprites/kirimi.png"
-    generate_kirimi(output)
+    main()
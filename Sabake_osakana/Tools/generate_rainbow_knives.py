@@ -2,10 +2,38 @@
 """
 虹色の包丁画像を生成するスクリプト
 元のknife.pngを読み込んで、6色のバリエーションを作成
+
+使い方:
+  python generate_rainbow_knives.py              # 6色の包丁画像を生成
+  python generate_rainbow_knives.py --benchmark  # 旧実装（1ピクセルずつ）との速度比較
+
+  # バッチモード: 任意のスプライト × 任意のパレットをプロセスプールで生成
+  python generate_rainbow_knives.py --sources ../Assets/Resources/Sprites/knife.png \
+      ../Assets/Resources/Sprites/fish1.png --palette hue:24 --output-dir out -j 8
+
+パレット指定（--palette）:
+  rainbow              RAINBOW_COLORS（既定）
+  hue:N                色相環をN分割（hue000, hue015, ...。360分割を超えると hue000.5 のように小数付き）
+  colordata[:category] Resources/ColorData.csv の各エントリ（category_key）
+  <file>.json          {"name": [r, g, b]} / {"name": "#rrggbb"} / [[r, g, b], ...]
+  <file>.csv           name,r,g,b（0-255）またはColorData.csv形式（0.0-1.0）
 """
 
 from PIL import Image
+from concurrent.futures import ProcessPoolExecutor
+from build_cache import PNG_CODE, BuildCache, save_png
+from build_trace import span
+import numpy as np
+import argparse
+import colorsys
+import csv
+import json
+import math
 import os
+import time
+
+# 生成キーに含めるコード（このスクリプトと、出力に関わる共通モジュール）
+GENERATOR_CODE = [__file__, *PNG_CODE]
 
 # 虹色の定義（RGB）
 RAINBOW_COLORS = {
@@ -17,10 +45,96 @@ RAINBOW_COLORS = {
     "pink": (230, 100, 180),
 }
 
+# 少し明るさを調整（暗くなりすぎないように）
+BRIGHTNESS_BOOST = 0.3
+
+# 明度計算の係数（ITU-R BT.601）
+LUMA_WEIGHTS = (0.299, 0.587, 0.114)
+
+# 色相環パレットの彩度・明度（RAINBOW_COLORSの赤 (230, 50, 50) と同じ）
+HUE_SATURATION = 0.78
+HUE_VALUE = 0.9
+
+COLOR_DATA_PATH = "../Assets/Resources/ColorData.csv"
+
+
+def recolor_rgb(rgb, target_color):
+    """
+    RGB配列（..., 3）を指定色で色調統一した配列を返す
+
+    旧実装と同じ float64 の演算順序で計算するため、結果はビット単位で一致する
+    """
+    rgb = rgb.astype(np.float64)
+    target = np.asarray(target_color, dtype=np.float64)
+
+    # 元のピクセルの明度を計算（グレースケール値）
+    luminance = (rgb[..., 0] * LUMA_WEIGHTS[0]
+                 + rgb[..., 1] * LUMA_WEIGHTS[1]
+                 + rgb[..., 2] * LUMA_WEIGHTS[2]) / 255.0
+
+    # ターゲット色に明度を適用（int() と同じく0方向に切り捨て）
+    shaded = np.trunc(target * luminance[..., np.newaxis])
+
+    # 明るさを底上げして255で頭打ち
+    boosted = np.trunc(shaded + target * BRIGHTNESS_BOOST)
+    return np.minimum(boosted, 255).astype(np.uint8)
+
+
+def palette_alpha(image):
+    """パレット画像の各エントリのアルファ値を配列で返す"""
+    entries = len(image.getpalette()) // 3
+    alpha = np.full(entries, 255, dtype=np.uint8)
+
+    transparency = image.info.get("transparency")
+    if isinstance(transparency, bytes):
+        values = np.frombuffer(transparency, dtype=np.uint8)[:entries]
+        alpha[:len(values)] = values
+    elif isinstance(transparency, int) and transparency < entries:
+        alpha[transparency] = 0
+    return alpha
+
+
+def colorize_palette_image(image, target_color):
+    """
+    パレット（インデックスカラー）画像を指定色で色調統一
+    ピクセルには触れずパレットのエントリだけを書き換えるので、
+    処理量は画像サイズではなくパレット数（最大256色）で決まる
+    出力もインデックスカラーのまま（ファイルサイズが小さい）
+    """
+    img = image.copy()
+    palette = np.array(img.getpalette(), dtype=np.uint8).reshape(-1, 3)
+
+    # 透明エントリはそのまま残す
+    opaque = palette_alpha(img) != 0
+    palette[opaque] = recolor_rgb(palette[opaque], target_color)
+
+    img.putpalette(palette.tobytes())
+    return img
+
+
 def colorize_image(image, target_color):
     """
     画像を指定色で色調統一
-    元の明度を維持しつつ、色相を変更
+    元の明度を維持しつつ、色相を変更（アルファ値はそのまま）
+    RGBパレットのインデックスカラー画像はパレットだけを書き換える
+    """
+    if image.mode == "P" and image.palette.mode == "RGB":
+        return colorize_palette_image(image, target_color)
+
+    img = image.convert("RGBA")
+    pixels = np.array(img)
+
+    # 透明ピクセルはそのまま残す
+    opaque = pixels[..., 3] != 0
+    pixels[opaque, :3] = recolor_rgb(pixels[opaque, :3], target_color)
+
+    return Image.fromarray(pixels, "RGBA")
+
+
+def colorize_image_per_pixel(image, target_color):
+    """
+    旧実装（1ピクセルずつ処理）
+    ベンチマークと結果の照合用に残している
     """
     img = image.convert("RGBA")
     pixels = img.load()
@@ -42,16 +156,254 @@ def colorize_image(image, target_color):
             new_b = int(target_color[2] * luminance)
 
             # 少し明るさを調整（暗くなりすぎないように）
-            brightness_boost = 0.3
-            new_r = min(255, int(new_r + target_color[0] * brightness_boost))
-            new_g = min(255, int(new_g + target_color[1] * brightness_boost))
-            new_b = min(255, int(new_b + target_color[2] * brightness_boost))
+            new_r = min(255, int(new_r + target_color[0] * BRIGHTNESS_BOOST))
+            new_g = min(255, int(new_g + target_color[1] * BRIGHTNESS_BOOST))
+            new_b = min(255, int(new_b + target_color[2] * BRIGHTNESS_BOOST))
 
             pixels[x, y] = (new_r, new_g, new_b, a)
 
     return img
 
-def main():
+
+def benchmark(original, sizes=(72, 512, 1155), repeat=3):
+    """旧実装（1ピクセルずつ）と配列演算版・パレット版の速度を比較して表示"""
+    print(f"{'size':>12} {'per-pixel':>12} {'fast':>12} {'speedup':>9}  identical")
+    cases = [(f"{size}x{size}", original.convert("RGBA").resize((size, size), Image.NEAREST))
+             for size in sizes]
+    if original.mode == "P":
+        # パレット画像はパレット書き換えの高速パスを通る
+        cases += [(f"{size}x{size}P", original.resize((size, size), Image.NEAREST))
+                  for size in sizes]
+
+    rgb = RAINBOW_COLORS["red"]
+    for label, src in cases:
+        def best_of(func):
+            best = float("inf")
+            for _ in range(repeat):
+                start = time.perf_counter()
+                result = func(src, rgb)
+                best = min(best, time.perf_counter() - start)
+            return best, result
+
+        slow_time, slow = best_of(colorize_image_per_pixel)
+        fast_time, fast = best_of(colorize_image)
+        identical = np.array_equal(np.array(slow), np.array(fast.convert("RGBA")))
+        print(f"{label:>12} {slow_time * 1000:>10.2f}ms {fast_time * 1000:>10.2f}ms "
+              f"{slow_time / fast_time:>8.1f}x  {identical}")
+
+
+# ============================================
+# パレット読み込み
+# ============================================
+def hue_wheel_palette(steps):
+    """
+    色相環をsteps分割したパレットを返す
+    名前は角度（hue000, hue015, ...）。360分割を超えると整数の角度では重なるので、
+    刻みが区別できる桁まで小数を付ける（hue:720 なら hue000.0, hue000.5, ...）
+    """
+    decimals = math.ceil(math.log10(steps / 360)) if steps > 360 else 0
+    width = 4 + decimals if decimals else 3   # 整数部3桁 + 小数点 + 小数
+    palette = {}
+    for i in range(steps):
+        hue = i / steps
+        r, g, b = colorsys.hsv_to_rgb(hue, HUE_SATURATION, HUE_VALUE)
+        palette[f"hue{hue * 360:0{width}.{decimals}f}"] = (round(r * 255), round(g * 255), round(b * 255))
+    if len(palette) != steps:
+        raise ValueError(f"hue:{steps} の色名が重複しました")
+    return palette
+
+
+def parse_color(value):
+    """[r, g, b] または "#rrggbb" を (r, g, b) に変換"""
+    if isinstance(value, str):
+        value = value.lstrip("#")
+        return tuple(int(value[i:i + 2], 16) for i in (0, 2, 4))
+    return tuple(int(v) for v in value[:3])
+
+
+def load_color_data_palette(path=COLOR_DATA_PATH, category=None):
+    """ColorData.csv（category,key,r,g,b,a 0.0-1.0）をパレットとして読み込む"""
+    palette = {}
+    with open(path, encoding="utf-8") as f:
+        for parts in csv.reader(f):
+            if not parts or parts[0].strip().startswith("#") or len(parts) < 6:
+                continue
+            cat, key = parts[0].strip(), parts[1].strip()
+            if cat == "category":
+                continue  # ヘッダー行スキップ
+            if category and cat != category:
+                continue
+            try:
+                rgb = tuple(round(float(v) * 255) for v in parts[2:5])
+            except ValueError:
+                continue
+            palette[f"{cat}_{key}"] = rgb
+    return palette
+
+
+def load_palette_file(path):
+    """JSON/CSVファイルからパレットを読み込む"""
+    if path.lower().endswith(".json"):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            return {name: parse_color(value) for name, value in data.items()}
+        return {f"color{i:02d}": parse_color(value) for i, value in enumerate(data)}
+
+    with open(path, encoding="utf-8") as f:
+        header = f.readline()
+    if header.strip().startswith("category,key"):
+        return load_color_data_palette(path)
+
+    palette = {}
+    with open(path, encoding="utf-8") as f:
+        for parts in csv.reader(f):
+            if len(parts) < 4 or parts[0].strip().startswith("#"):
+                continue
+            try:
+                palette[parts[0].strip()] = tuple(int(v) for v in parts[1:4])
+            except ValueError:
+                continue  # ヘッダー行など
+    return palette
+
+
+def load_palette(spec):
+    """--palette の指定からパレット（名前 → RGB）を作る"""
+    if spec == "rainbow":
+        return dict(RAINBOW_COLORS)
+    if spec.startswith("hue:"):
+        return hue_wheel_palette(int(spec[4:]))
+    if spec == "colordata" or spec.startswith("colordata:"):
+        return load_color_data_palette(category=spec.partition(":")[2] or None)
+    return load_palette_file(spec)
+
+
+# ============================================
+# バッチ生成（プロセスプール）
+# ============================================
+# ワーカープロセスごとのデコード済み画像キャッシュ（パス → (サイズ, 更新時刻, 画像)）
+_source_cache = {}
+
+
+def load_source(path):
+    """
+    元画像をワーカーごとに1回だけデコードする
+    ワーカーを使い回す build.py --watch でも古い画像を使わないよう、stat が変わったら読み直す
+    """
+    st = os.stat(path)
+    cached = _source_cache.get(path)
+    if cached is not None and cached[:2] == (st.st_size, st.st_mtime_ns):
+        return cached[2]
+    with span("decode", path=path):
+        image = Image.open(path)
+        image.load()
+    _source_cache[path] = (st.st_size, st.st_mtime_ns, image)
+    return image
+
+
+def render_variant(job):
+    """1つの（スプライト × 色）を生成して保存"""
+    source_path, rgb, output_path = job
+    with span("rainbow_variant", path=output_path):
+        source = load_source(source_path)
+        with span("colorize", size=list(source.size)):
+            image = colorize_image(source, rgb)
+        save_png(image, output_path)
+    return output_path
+
+
+def batch_jobs(sources, palette, output_dir):
+    """
+    （スプライト × 色）のジョブ一覧を作る
+    出力名はファイル名だけで決まるので、別フォルダの同じ名前の元画像は受け付けない
+    （並列のワーカーが同じ <stem>_<color>.png を上書きし合うため）
+    """
+    stems = {}
+    for source_path in sources:
+        stem = os.path.splitext(os.path.basename(source_path))[0]
+        stems.setdefault(stem, []).append(source_path)
+    duplicates = {stem: paths for stem, paths in stems.items() if len(paths) > 1}
+    if duplicates:
+        details = "; ".join(f"{stem}: {', '.join(paths)}" for stem, paths in duplicates.items())
+        raise ValueError(f"元画像のファイル名が重複しています（出力が上書きされます）: {details}")
+
+    jobs = []
+    for stem, (source_path,) in stems.items():
+        for color_name, rgb in palette.items():
+            jobs.append((source_path, rgb, os.path.join(output_dir, f"{stem}_{color_name}.png")))
+    return jobs
+
+
+def generate_batch(sources, palette, output_dir, workers=None, cache=None):
+    """
+    全ジョブをプロセスプールに分散して生成し、出力パス一覧を返す
+    cache を渡すと、生成キーが変わっていない出力はスキップする
+    """
+    jobs = batch_jobs(sources, palette, output_dir)
+    os.makedirs(output_dir, exist_ok=True)
+
+    keys = {}
+    if cache is not None:
+        for source_path, rgb, output_path in jobs:
+            keys[output_path] = cache.compute_key("generate_rainbow_knives", params={"rgb": rgb},
+                                                  inputs=[source_path], code=GENERATOR_CODE)
+        jobs = [job for job in jobs if not cache.is_up_to_date(job[2], keys[job[2]])]
+
+    workers = min(workers or os.cpu_count() or 1, max(1, len(jobs)))
+    if workers == 1:
+        outputs = [render_variant(job) for job in jobs]
+    else:
+        # 同じ元画像のジョブがなるべく同じワーカーに行くよう、まとめて渡す
+        chunksize = max(1, len(jobs) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            outputs = list(executor.map(render_variant, jobs, chunksize=chunksize))
+
+    if cache is not None:
+        for source_path, rgb, output_path in jobs:
+            cache.record(output_path, keys[output_path], "generate_rainbow_knives",
+                         params={"rgb": rgb}, inputs=[source_path])
+        cache.save()
+    return outputs
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="虹色の包丁画像を生成")
+    parser.add_argument("--benchmark", action="store_true",
+                        help="旧実装（1ピクセルずつ）との速度比較のみ行う")
+    parser.add_argument("--sources", nargs="+",
+                        help="バッチモード: 色違いを作る元画像（複数可）")
+    parser.add_argument("--palette", default="rainbow",
+                        help="バッチモードのパレット（rainbow / hue:N / colordata[:category] / *.json / *.csv）")
+    parser.add_argument("--output-dir", default="../Assets/Resources/Sprites/Knives",
+                        help="バッチモードの出力先")
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+                        help="ワーカープロセス数（既定: CPUコア数）")
+    parser.add_argument("--force", action="store_true",
+                        help="ビルドキャッシュを無視してすべて再生成")
+    args = parser.parse_args(argv)
+    cache = BuildCache(force=args.force)
+
+    if args.sources:
+        missing = [path for path in args.sources if not os.path.exists(path)]
+        if missing:
+            print(f"Error: {', '.join(missing)} not found!")
+            return
+
+        sources = list(dict.fromkeys(os.path.normpath(path) for path in args.sources))
+        palette = load_palette(args.palette)
+        try:
+            batch_jobs(sources, palette, args.output_dir)
+        except ValueError as error:
+            print(f"Error: {error}")
+            return
+        start = time.perf_counter()
+        outputs = generate_batch(sources, palette, args.output_dir, args.jobs, cache)
+        elapsed = time.perf_counter() - start
+        skipped = len(sources) * len(palette) - len(outputs)
+        print(f"Done! Generated {len(outputs)} images, {skipped} up to date "
+              f"({len(sources)} sprites x {len(palette)} colors) in {elapsed:.2f}s -> {args.output_dir}")
+        return
+
     # 元の包丁画像を読み込み
     input_path = "../Assets/Resources/Sprites/knife.png"
     output_dir = "../Assets/Resources/Sprites/Knives"
@@ -60,21 +412,21 @@ def main():
         print(f"Error: {input_path} not found!")
         return
 
-    # 出力ディレクトリ作成
-    os.makedirs(output_dir, exist_ok=True)
-
     # 元画像を読み込み
     original = Image.open(input_path)
     print(f"Loaded: {input_path} ({original.size[0]}x{original.size[1]})")
 
-    # 各色で生成
-    for color_name, rgb in RAINBOW_COLORS.items():
-        colored = colorize_image(original.copy(), rgb)
-        output_path = os.path.join(output_dir, f"knife_{color_name}.png")
-        colored.save(output_path, "PNG")
+    if args.benchmark:
+        benchmark(original)
+        return
+
+    # 各色で生成（knife_<色名>.png、変更のない色はスキップ）
+    outputs = generate_batch([input_path], RAINBOW_COLORS, output_dir, workers=1, cache=cache)
+    for output_path in outputs:
         print(f"Generated: {output_path}")
 
-    print(f"\nDone! Generated {len(RAINBOW_COLORS)} colored knife images.")
+    print(f"\nDone! Generated {len(outputs)} colored knife images "
+          f"({len(RAINBOW_COLORS) - len(outputs)} up to date).")
 
 if __name__ == "__main__":
     main()
@@ -2,18 +2,184 @@
 """
 角丸四角形の角部分を生成するスクリプト
 Unity UI用の9-sliceスプライトとして使用可能
+
+アンチエイリアスは符号付き距離関数（SDF）から各ピクセルの被覆率を直接計算する。
+拡大描画→縮小が不要なので、パネル一式を解像度ごとに作り直してもミリ秒単位で終わる。
+
+使い方:
+  python generate_rounded_corners.py                # UIパネル3種を生成
+  python generate_rounded_corners.py --tiers 1 2 3  # @2x, @3x の解像度違いも生成
 """
 
-from PIL import Image, ImageDraw
+from PIL import Image
+from build_cache import PNG_CODE, BuildCache, save_png
+from build_trace import traced
+import numpy as np
+import argparse
 import os
 
+# 生成キーに含めるコード（このスクリプトと、出力に関わる共通モジュール）
+GENERATOR_CODE = [__file__, *PNG_CODE]
+
+# GameColorsに合わせた色設定
+PANEL_COLOR = (204, 204, 204, 255)      # 0.8 * 255 = 204 (ライトグレー)
+BORDER_COLOR = (153, 153, 153, 255)     # 0.6 * 255 = 153 (ダークグレー枠線)
+
+# 生成するUIパネル一式
+PANELS = [
+    # メインの9-slice用パネル画像（96x96、角半径24px）
+    {"name": "rounded_panel", "size": 96, "radius": 24,
+     "color": PANEL_COLOR, "border_color": BORDER_COLOR, "border_width": 3},
+    # 小さめのボタン用（64x64、角半径16px）
+    {"name": "rounded_button", "size": 64, "radius": 16,
+     "color": PANEL_COLOR, "border_color": BORDER_COLOR, "border_width": 2},
+    # 枠線なしバージョン
+    {"name": "rounded_panel_no_border", "size": 96, "radius": 24,
+     "color": PANEL_COLOR, "border_color": PANEL_COLOR, "border_width": 0},
+]
+
+
+def rounded_rect_coverage(size, radius, inset):
+    """
+    角丸四角形の右下 1/4 の被覆率（0.0〜1.0）を符号付き距離関数から計算
+    形は上下左右に対称なので、残りは mirror_quadrant で折り返して作る
+
+    Args:
+        size: 画像サイズ（正方形）
+        radius: 角の半径の配列（パネルごと、形状 (n,)）
+        inset: 外周からの内側オフセットの配列（形状 (n,)）
+
+    Returns:
+        形状 (n, (size + 1) // 2, (size + 1) // 2) の被覆率（float32。奇数サイズは中央の行・列を含む）
+    """
+    radius = np.asarray(radius, dtype=np.float32)[:, None, None]
+    inset = np.asarray(inset, dtype=np.float32)[:, None, None]
+
+    # ピクセル中心の座標（画像中心からの距離。右下 1/4 だけ）
+    coords = np.arange(size // 2, size, dtype=np.float32) + np.float32(0.5 - size / 2)
+    px = coords[None, None, :]
+    py = coords[None, :, None]
+
+    # 角丸四角形の符号付き距離（内側が負）
+    corner = np.float32(size / 2) - inset - radius
+    qx = px - corner
+    qy = py - corner
+    distance = np.hypot(np.maximum(qx, 0), np.maximum(qy, 0))
+    distance += np.minimum(np.maximum(qx, qy), 0)
+    distance -= radius
+
+    # 境界から±0.5ピクセルで線形に被覆率を変える
+    np.subtract(np.float32(0.5), distance, out=distance)
+    return np.clip(distance, 0.0, 1.0, out=distance)
+
+
+def mirror_quadrant(quadrant, size):
+    """右下 1/4（形状 (n, h, h, ...)）を上下左右に折り返して一辺 size の画像にする"""
+    flip = size - quadrant.shape[1]   # 奇数サイズは中央の行・列を折り返さない
+    rows = np.concatenate([quadrant[:, ::-1][:, :flip], quadrant], axis=1)
+    return np.concatenate([rows[:, :, ::-1][:, :, :flip], rows], axis=2)
+
+
+@traced("render_panels")
+def render_panels(panels):
+    """
+    角丸パネルをまとめて描画
+    同じサイズのパネルは1回の配列演算でまとめて計算する
+    （float32 で右下 1/4 だけを計算し、8bit にしてから折り返す）
+
+    Args:
+        panels: [{"size", "radius", "color", "border_color", "border_width"}, ...]
+
+    Returns:
+        panels と同じ順のPIL画像（RGBA）のリスト
+    """
+    images = [None] * len(panels)
+    by_size = {}
+    for index, panel in enumerate(panels):
+        by_size.setdefault(panel["size"], []).append(index)
+
+    for size, indices in by_size.items():
+        group = [panels[i] for i in indices]
+        radius = np.array([p["radius"] for p in group], dtype=np.float32)
+        border = np.array([p["border_width"] for p in group], dtype=np.float32)
+
+        # 枠線なしは外側を描かない（内側だけ）
+        outer = rounded_rect_coverage(size, radius, np.zeros(len(group)))
+        outer[border <= 0] = 0.0
+        inner = rounded_rect_coverage(size, np.maximum(0, radius - border), border)
+
+        color = np.array([p["color"] for p in group], dtype=np.float32)[:, None, None, :] / 255
+        border_color = np.array([p["border_color"] for p in group], dtype=np.float32)[:, None, None, :] / 255
+
+        # 枠線色の上に内側の色を重ねる（ストレートアルファのover合成）
+        inner_alpha = inner * color[..., 3]
+        outer_alpha = outer * border_color[..., 3] * (1 - inner_alpha)
+        alpha = inner_alpha + outer_alpha
+        rgba = np.empty(alpha.shape + (4,), dtype=np.float32)
+        rgb = rgba[..., :3]
+        np.multiply(color[..., :3], inner_alpha[..., None], out=rgb)
+        rgb += border_color[..., :3] * outer_alpha[..., None]
+        np.divide(rgb, alpha[..., None], out=rgb, where=alpha[..., None] > 0)
+        rgba[..., 3] = alpha
+
+        rgba *= 255
+        rgba = mirror_quadrant(np.rint(rgba, out=rgba).astype(np.uint8), size)
+        for i, index in enumerate(indices):
+            images[index] = Image.fromarray(rgba[i], "RGBA")
+
+    return images
+
+
+def panel_params(panel):
+    """ビルドキャッシュのキーに使う描画パラメータ"""
+    return {k: panel[k] for k in ("size", "radius", "color", "border_color", "border_width")}
+
+
+def scale_panel(panel, tier):
+    """解像度倍率 tier のパネル定義（名前は name@2x 形式）"""
+    if tier == 1:
+        return dict(panel)
+    return {**panel, "name": f"{panel['name']}@{tier}x", "size": panel["size"] * tier,
+            "radius": panel["radius"] * tier, "border_width": panel["border_width"] * tier}
+
+
+def generate_panels(panels, output_dir, cache=None):
+    """
+    パネル一式を1回の呼び出しで生成し、<name>.png として保存
+    cache を渡すと、生成キーが変わっていないパネルはスキップする
+
+    Returns:
+        生成したファイルパスのリスト
+    """
+    jobs = []
+    for panel in panels:
+        path = os.path.join(output_dir, f"{panel['name']}.png")
+        key = None
+        if cache is not None:
+            key = cache.compute_key("generate_rounded_corner", params=panel_params(panel), code=GENERATOR_CODE)
+            if cache.is_up_to_date(path, key):
+                print(f"変更なし（スキップ）: {path}")
+                continue
+        jobs.append((panel, path, key))
+
+    outputs = []
+    for (panel, path, key), img in zip(jobs, render_panels([job[0] for job in jobs])):
+        save_png(img, path)
+        if cache is not None:
+            cache.record(path, key, "generate_rounded_corner", params=panel_params(panel))
+        print(f"生成完了: {path}")
+        outputs.append(path)
+    return outputs
+
+
 def generate_rounded_corner(
     size: int = 64,
     radius: int = 16,
     color: tuple = (204, 204, 204, 255),  # ライトグレー (0.8, 0.8, 0.8)
     border_color: tuple = (153, 153, 153, 255),  # 枠線色 (0.6, 0.6, 0.6)
     border_width: int = 2,
-    output_path: str = "rounded_panel.png"
+    output_path: str = "rounded_panel.png",
+    cache: BuildCache = None
 ):
     """
     角丸四角形を生成
@@ -25,39 +191,23 @@ def generate_rounded_corner(
         border_color: 枠線色 (R, G, B, A)
         border_width: 枠線の太さ
         output_path: 出力ファイルパス
+        cache: ビルドキャッシュ（生成キーが変わっていなければスキップし、Noneを返す）
     """
-    # アンチエイリアス用に4倍サイズで描画
-    scale = 4
-    large_size = size * scale
-    large_radius = radius * scale
-    large_border = border_width * scale
-
-    # 透明な背景で画像作成
-    img = Image.new('RGBA', (large_size, large_size), (0, 0, 0, 0))
-    draw = ImageDraw.Draw(img)
-
-    # 枠線を含む角丸四角形を描画（外側）
-    if border_width > 0:
-        draw.rounded_rectangle(
-            [0, 0, large_size - 1, large_size - 1],
-            radius=large_radius,
-            fill=border_color
-        )
-
-    # 内側の角丸四角形を描画
-    inner_offset = large_border
-    draw.rounded_rectangle(
-        [inner_offset, inner_offset, large_size - 1 - inner_offset, large_size - 1 - inner_offset],
-        radius=max(0, large_radius - large_border),
-        fill=color
-    )
-
-    # 元のサイズに縮小（アンチエイリアス効果）
-    img = img.resize((size, size), Image.LANCZOS)
-
-    # 保存
-    os.makedirs(os.path.dirname(output_path) if os.path.dirname(output_path) else '.', exist_ok=True)
-    img.save(output_path, 'PNG')
+    if cache is not None:
+        params = {"size": size, "radius": radius, "color": color,
+                  "border_color": border_color, "border_width": border_width}
+        key = cache.compute_key("generate_rounded_corner", params=params, code=GENERATOR_CODE)
+        if cache.is_up_to_date(output_path, key):
+            print(f"変更なし（スキップ）: {output_path}")
+            return None
+
+    img = render_panels([{"size": size, "radius": radius, "color": color,
+                          "border_color": border_color, "border_width": border_width}])[0]
+
+    # 保存（内容が同じなら書き込まない）
+    save_png(img, output_path)
+    if cache is not None:
+        cache.record(output_path, key, "generate_rounded_corner", params=params)
     print(f"生成完了: {output_path}")
     return img
 
@@ -68,39 +218,29 @@ def generate_9slice_corners(
     color: tuple = (204, 204, 204, 255),
     border_color: tuple = (153, 153, 153, 255),
     border_width: int = 2,
-    output_dir: str = "."
+    output_dir: str = ".",
+    cache: BuildCache = None
 ):
     """
     9-slice用の角4つを個別に生成
+    cache を渡すと、生成キーが変わっていなければスキップしてNoneを返す
     """
-    scale = 4
-    large_size = corner_size * scale
-    large_radius = radius * scale
-    large_border = border_width * scale
-
-    # フル画像を作成
-    full_size = large_size * 3  # 9-slice用に3x3
-    img = Image.new('RGBA', (full_size, full_size), (0, 0, 0, 0))
-    draw = ImageDraw.Draw(img)
-
-    # 枠線付き角丸四角形
-    if border_width > 0:
-        draw.rounded_rectangle(
-            [0, 0, full_size - 1, full_size - 1],
-            radius=large_radius,
-            fill=border_color
-        )
-
-    inner_offset = large_border
-    draw.rounded_rectangle(
-        [inner_offset, inner_offset, full_size - 1 - inner_offset, full_size - 1 - inner_offset],
-        radius=max(0, large_radius - large_border),
-        fill=color
-    )
-
-    # 縮小
+    corner_names = ['top_left', 'top_right', 'bottom_left', 'bottom_right']
+    output_paths = [os.path.join(output_dir, f"corner_{name}.png") for name in corner_names]
+    output_paths.append(os.path.join(output_dir, "rounded_panel_9slice.png"))
+
+    if cache is not None:
+        params = {"corner_size": corner_size, "radius": radius, "color": color,
+                  "border_color": border_color, "border_width": border_width}
+        key = cache.compute_key("generate_9slice_corners", params=params, code=GENERATOR_CODE)
+        if all(cache.is_up_to_date(path, key) for path in output_paths):
+            print(f"変更なし（スキップ）: {output_dir}")
+            return None
+
+    # フル画像を作成（9-slice用に3x3）
     final_size = corner_size * 3
-    img = img.resize((final_size, final_size), Image.LANCZOS)
+    img = render_panels([{"size": final_size, "radius": radius, "color": color,
+                          "border_color": border_color, "border_width": border_width}])[0]
 
     os.makedirs(output_dir, exist_ok=True)
 
@@ -115,58 +255,40 @@ def generate_9slice_corners(
     for name, box in corners.items():
         corner = img.crop(box)
         path = os.path.join(output_dir, f"corner_{name}.png")
-        corner.save(path, 'PNG')
+        save_png(corner, path)
         print(f"生成完了: {path}")
 
     # フル画像も保存（9-slice用）
     full_path = os.path.join(output_dir, "rounded_panel_9slice.png")
-    img.save(full_path, 'PNG')
+    save_png(img, full_path)
     print(f"生成完了: {full_path}")
 
+    if cache is not None:
+        for path in output_paths:
+            cache.record(path, key, "generate_9slice_corners", params=params)
+
     return img
 
 
-if __name__ == "__main__":
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="角丸パネル画像を生成")
+    parser.add_argument("--tiers", type=int, nargs="+", default=[1],
+                        help="解像度倍率（2以上は name@2x.png として出力）")
+    parser.add_argument("--force", action="store_true",
+                        help="ビルドキャッシュを無視して再生成")
+    args = parser.parse_args(argv)
+    cache = BuildCache(force=args.force)
+
     # 出力ディレクトリ
     output_dir = os.path.join(os.path.dirname(__file__), "..", "Assets", "Resources", "Sprites", "UI")
 
-    # GameColorsに合わせた色設定
-    panel_color = (204, 204, 204, 255)      # 0.8 * 255 = 204 (ライトグレー)
-    border_color = (153, 153, 153, 255)     # 0.6 * 255 = 153 (ダークグレー枠線)
-
     print("=== 角丸パネル画像を生成 ===")
     print(f"出力先: {output_dir}")
     print()
 
-    # メインの9-slice用パネル画像（96x96、角半径24px）
-    generate_rounded_corner(
-        size=96,
-        radius=24,
-        color=panel_color,
-        border_color=border_color,
-        border_width=3,
-        output_path=os.path.join(output_dir, "rounded_panel.png")
-    )
-
-    # 小さめのボタン用（64x64、角半径16px）
-    generate_rounded_corner(
-        size=64,
-        radius=16,
-        color=panel_color,
-        border_color=border_color,
-        border_width=2,
-        output_path=os.path.join(output_dir, "rounded_button.png")
-    )
-
-    # 枠線なしバージョン
-    generate_rounded_corner(
-        size=96,
-        radius=24,
-        color=panel_color,
-        border_color=panel_color,  # 枠線なし
-        border_width=0,
-        output_path=os.path.join(output_dir, "rounded_panel_no_border.png")
-    )
+    panels = [scale_panel(panel, tier) for tier in args.tiers for panel in PANELS]
+    generate_panels(panels, output_dir, cache)
+    cache.save()
 
     print()
     print("=== 完了 ===")
@@ -174,3 +296,7 @@ if __name__ == "__main__":
     print("1. 生成された画像をインポート")
     print("2. Sprite Editorで Border を設定（例: L=24, R=24, T=24, B=24）")
     print("3. Image の Image Type を 'Sliced' に設定")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+ローカル専用の素材フォルダ（ForlocalAsset/sakana）の魚の画像を Resources/Sprites に取り込むスクリプト
+元画像（1155x1155）を trim_sprites.py でメモリ上のまま透明な縁を切り落とし、同じ名前で1回だけ書き出す
+（SpriteTrim.csv・.meta のピボットも元画像の同じ位置を指すようにそろう。Unity の再インポートも1回で済む）
+
+SpriteTrim.csv に記録がある魚は --trim なしでも切り落とす
+（元のサイズのまま書き出すと、記録・.meta のスプライト矩形と合わなくなるため）
+
+使い方:
+  python import_fish_sprites.py                   # ForlocalAsset/sakana/*.png を全部
+  python import_fish_sprites.py ../ForlocalAsset/sakana/sakana_normal.png --trim
+  SABAKE_ASSET_BASE=/path/to/ForlocalAsset python import_fish_sprites.py
+"""
+
+from PIL import Image
+from build_cache import PNG_CODE, TOOLS_DIR, BuildCache, save_png
+from trim_sprites import load_trim_data, resource_key, trim_sprites
+import argparse
+import glob
+import os
+
+# 生成キーに含めるコード（このスクリプトと、出力に関わる共通モジュール）
+GENERATOR_CODE = [__file__, *PNG_CODE,
+                  os.path.join(TOOLS_DIR, "trim_sprites.py"), os.path.join(TOOLS_DIR, "pack_sprite_atlas.py")]
+
+SPRITES_DIR = "../Assets/Resources/Sprites"
+# ローカル専用の素材フォルダ（sabake_spec_generator.py と同じ環境変数）
+ASSET_BASE = os.environ.get("SABAKE_ASSET_BASE", "../ForlocalAsset")
+DEFAULT_SOURCES = [f"{ASSET_BASE}/sakana/*.png"]
+
+
+def sprite_path(source_path, sprites_dir=SPRITES_DIR):
+    """元画像 → 取り込み先（Resources/Sprites に同じ名前）"""
+    return os.path.join(sprites_dir, os.path.basename(source_path))
+
+
+def import_fish(source_path, cache=None, trim=False):
+    """
+    魚の画像を1枚取り込む（取り込んだら True）
+    cache を渡すと、元画像・このスクリプトが変わっていなければスキップする
+    """
+    output_path = sprite_path(source_path)
+    params = {"trim": trim}
+    if cache is not None:
+        key = cache.compute_key("import_fish_sprites", params=params, inputs=[source_path], code=GENERATOR_CODE)
+        if cache.is_up_to_date(output_path, key):
+            print(f"変更なし（スキップ）: {output_path}")
+            return False
+
+    image = Image.open(source_path)
+    warnings = {}
+    if trim:
+        # 切り落とした画像だけを書き出す（内容が同じなら書き込まない）
+        _, warnings = trim_sprites([output_path], images={output_path: image})
+        for message in warnings.get(output_path, []):
+            print(f"Warning: {message}")
+    if not trim or output_path in warnings:
+        save_png(image, output_path)   # 切り落とせなかったときは元のサイズのまま
+    if cache is not None:
+        cache.record(output_path, key, "import_fish_sprites", params=params, inputs=[source_path])
+
+    width, height = Image.open(output_path).size
+    print(f"取り込みました: {source_path} -> {output_path}（{width}x{height}）")
+    return True
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="ForlocalAsset の魚の画像を Resources/Sprites に取り込む")
+    parser.add_argument("sources", nargs="*", default=DEFAULT_SOURCES,
+                        help="魚の画像（ファイル・globパターン）")
+    parser.add_argument("--trim", action="store_true",
+                        help="透明な縁を切り落とす（SpriteTrim.csv に記録済みなら常に切り落とす）")
+    parser.add_argument("--force", action="store_true",
+                        help="ビルドキャッシュを無視して取り込み直す")
+    args = parser.parse_args(argv)
+
+    sources = list(dict.fromkeys(p for pattern in args.sources for p in sorted(glob.glob(pattern))))
+    if not sources:
+        print(f"取り込む画像がありません: {', '.join(args.sources)}")
+        return
+
+    cache = BuildCache(force=args.force)
+    trim_data = load_trim_data()
+    imported = 0
+    for source_path in sources:
+        trim = args.trim or resource_key(sprite_path(source_path)) in trim_data
+        imported += import_fish(source_path, cache, trim)
+    cache.save()
+    print(f"{len(sources)}枚（{imported}枚を取り込み、{len(sources) - imported}枚は変更なし）")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+生成済みの PNG をまとめて再圧縮するスクリプト
+png_encoder で形式（パレット化・RGB/グレーへの縮退）・フィルタ・zlib 設定を総当たりし、
+今のファイルより小さくなるときだけ書き換える。Unity のインポート・リポジトリの clone・アプリのダウンロードが軽くなる
+
+256色を超える画像は、各ピクセルの各チャンネルの誤差が --max-error（/255、既定 2）以下に
+収まる場合に限り256色への減色も試す（見た目で区別できない範囲。0 なら可逆のみ）。
+ステージの魚画像はブロック配置のアルファ判定に使うので、常に可逆のまま扱う
+
+書き換えたファイルがビルドキャッシュ（build_cache.py）に生成物として記録されていれば、
+そのハッシュも更新するので、生成スクリプトが作り直して元に戻すことはない。
+一度処理したファイルは Tools/.build_cache/png_optimize.json に記録し、変わっていなければ読まない
+
+使い方:
+  python optimize_pngs.py                         # Resources 以下の PNG すべて
+  python optimize_pngs.py --max-error 0 -j 8      # 可逆のみ
+  python optimize_pngs.py --dry-run ../Assets/Resources/Sprites/UI
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from PIL import Image
+from build_cache import CACHE_DIR, BuildCache, write_if_changed
+from bake_brick_patterns import STAGE_DATA_PATH, load_stage_data, resource_image_path
+from png_encoder import encode_png_detail
+import png_encoder
+import argparse
+import glob
+import os
+import time
+
+DEFAULT_SOURCES = ["../Assets/Resources/**/*.png"]
+OPTIMIZE_MANIFEST_PATH = os.path.join(CACHE_DIR, "png_optimize.json")
+
+# 減色で許す各チャンネルの誤差（/255）の既定値
+DEFAULT_MAX_ERROR = 2
+
+
+def collect_pngs(sources):
+    """ファイル・ディレクトリ・globパターンからPNGの一覧を作る"""
+    paths = []
+    for source in sources:
+        if os.path.isdir(source):
+            source = os.path.join(source, "**", "*.png")
+        paths.extend(sorted(glob.glob(source, recursive=True)))
+    return list(dict.fromkeys(paths))
+
+
+def lossless_only_paths(stage_data_path=STAGE_DATA_PATH):
+    """減色してはいけない画像（ステージの魚画像）の絶対パス"""
+    if not os.path.exists(stage_data_path):
+        return set()
+    paths = (resource_image_path(stage["fish_image"]) for stage in load_stage_data(stage_data_path))
+    return {os.path.abspath(p) for p in paths if p}
+
+
+def optimize_file(job):
+    """
+    プロセスプール用: 1ファイルを再圧縮する
+    返り値: (パス, 元のバイト数, 新しいバイト数, 選んだ設定, 書き換えたか)
+    """
+    path, max_error, dry_run = job
+    with open(path, "rb") as f:
+        original = f.read()
+    with Image.open(path) as image:
+        image.load()
+        data, detail = encode_png_detail(image, max_error, effort="full")
+
+    if len(data) >= len(original):
+        return path, len(original), len(original), "変更なし（今のファイルが最小）", False
+    if not dry_run:
+        write_if_changed(path, data)
+    return path, len(original), len(data), detail, not dry_run
+
+
+def optimize_pngs(paths, max_error=0, workers=None, dry_run=False, force=False):
+    """PNG をまとめて再圧縮し、(結果のリスト, スキップした数) を返す"""
+    cache = BuildCache(OPTIMIZE_MANIFEST_PATH, force=force)
+    code = [__file__, png_encoder.__file__]
+    lossless = lossless_only_paths()
+
+    jobs = []
+    keys = {}
+    for path in paths:
+        error = 0 if os.path.abspath(path) in lossless else max_error
+        key = cache.compute_key("optimize_pngs", params={"max_error": error}, code=code)
+        if not dry_run and cache.is_up_to_date(path, key):
+            continue
+        keys[path] = (key, error)
+        jobs.append((path, error, dry_run))
+
+    workers = min(workers or os.cpu_count() or 1, max(1, len(jobs)))
+    if workers == 1:
+        results = [optimize_file(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(optimize_file, jobs))
+
+    if not dry_run:
+        generators = BuildCache()
+        for path, _, _, _, written in results:
+            key, error = keys[path]
+            cache.record(path, key, "optimize_pngs", params={"max_error": error})
+            if written:
+                generators.refresh(path)
+        generators.save()
+        cache.save()
+    return results, len(paths) - len(jobs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="生成済みの PNG を再圧縮する")
+    parser.add_argument("images", nargs="*", default=DEFAULT_SOURCES,
+                        help="PNG（ファイル・ディレクトリ・globパターン）")
+    parser.add_argument("--max-error", type=int, default=DEFAULT_MAX_ERROR,
+                        help="減色で許す各チャンネルの誤差（0 なら可逆のみ）")
+    parser.add_argument("--dry-run", action="store_true", help="書き込まずに削減量だけ表示する")
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+                        help="ワーカープロセス数（既定: CPUコア数）")
+    parser.add_argument("--force", action="store_true", help="処理済みの記録を無視してすべて試す")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    results, skipped = optimize_pngs(collect_pngs(args.images), args.max_error, args.jobs,
+                                     args.dry_run, args.force)
+
+    total_before = total_after = 0
+    for path, before, after, detail, _ in sorted(results, key=lambda r: r[2] - r[1]):
+        total_before += before
+        total_after += after
+        print(f"  {os.path.relpath(path)}: {before:,} -> {after:,} バイト  {detail}")
+
+    saved = total_before - total_after
+    print(f"{len(results)}ファイルを処理（{skipped}件は処理済みでスキップ）: "
+          f"{total_before:,} -> {total_after:,} バイト（{saved:,} バイト削減"
+          f"{f'、{saved / total_before * 100:.0f}%' if total_before else ''}）"
+          f" {time.perf_counter() - start:.1f}秒")
+    if args.dry_run:
+        print("--dry-run のため書き込んでいません")
+
+
+if __name__ == "__main__":
+    main()
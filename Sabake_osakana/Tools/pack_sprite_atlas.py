@@ -0,0 +1,411 @@
+#!/usr/bin/env python3
+"""
+生成スプライトを2のべき乗サイズのアトラスにまとめるスクリプト
+個別PNGのままだとテクスチャ切り替えでドローコールのバッチが切れるため、
+MaxRects法（Best Short Side Fit）で詰め込んでUV/ピボット情報を書き出す
+
+使い方:
+  python pack_sprite_atlas.py                         # 既定のスプライト一式をまとめる
+  python pack_sprite_atlas.py ../Assets/Resources/Sprites/Knives --padding 2 --extrude 1 --trim
+  python pack_sprite_atlas.py sprites/*.png --rotate --max-size 1024 --name fish_atlas
+
+出力（--output-dir）:
+  <name>_0.png, <name>_1.png, ...  アトラス画像（入りきらなければ複数枚）
+  <name>.json                      アトラス・スプライトごとの矩形/UV/ピボット
+  <name>.csv                       同じ内容のCSV（Unity側の読み込み用）
+"""
+
+from PIL import Image
+from build_cache import PNG_CODE, BuildCache, save_png, write_if_changed, project_relpath
+import numpy as np
+import argparse
+import csv
+import glob
+import io
+import json
+import os
+import time
+
+# 生成キーに含めるコード（このスクリプトと、出力に関わる共通モジュール）
+GENERATOR_CODE = [__file__, *PNG_CODE]
+
+SPRITES_DIR = "../Assets/Resources/Sprites"
+
+# 既定でまとめるスプライト（生成スクリプトの出力 + 魚・包丁のスプライト）
+DEFAULT_SOURCES = [
+    f"{SPRITES_DIR}/Knives/*.png",
+    f"{SPRITES_DIR}/UI/rounded_*.png",
+    f"{SPRITES_DIR}/fish[123].png",
+    f"{SPRITES_DIR}/knife.png",
+    f"{SPRITES_DIR}/kirimi.png",
+]
+
+DEFAULT_MAX_SIZE = 2048
+
+CSV_COLUMNS = ["name", "atlas", "x", "y", "width", "height", "rotated",
+               "u0", "v0", "u1", "v1", "pivot_x", "pivot_y",
+               "source_width", "source_height", "offset_x", "offset_y"]
+
+
+# ============================================
+# 透明部分のトリミング
+# ============================================
+def alpha_bbox(alpha, threshold=0):
+    """
+    アルファ配列の不透明部分を囲む矩形 (left, top, right, bottom) を返す
+    全面透明なら None
+    """
+    mask = alpha > threshold
+    cols = np.flatnonzero(mask.any(axis=0))
+    if cols.size == 0:
+        return None
+    rows = np.flatnonzero(mask.any(axis=1))
+    return int(cols[0]), int(rows[0]), int(cols[-1]) + 1, int(rows[-1]) + 1
+
+
+class Sprite:
+    """アトラスに詰めるスプライト1枚分の情報"""
+
+    def __init__(self, name, path, trim):
+        self.name = name
+        self.path = path
+        image = Image.open(path).convert("RGBA")
+        self.source_size = image.size
+
+        # 透明な縁を切り落とす（全面透明なら1x1を残す）
+        bbox = (0, 0) + image.size
+        if trim:
+            bbox = alpha_bbox(np.asarray(image)[..., 3]) or (0, 0, 1, 1)
+        self.bbox = bbox
+        self.image = image.crop(bbox) if bbox != (0, 0) + image.size else image
+
+        self.x = self.y = 0
+        self.atlas = -1
+        self.rotated = False
+
+    @property
+    def size(self):
+        return self.image.size
+
+
+# ============================================
+# MaxRects パッキング
+# ============================================
+class MaxRectsBin:
+    """
+    MaxRects法によるビンパッキング（Best Short Side Fit）
+    空き領域を重なりを許した最大矩形の集合で管理する
+    """
+
+    def __init__(self, width, height, allow_rotation=False):
+        self.width = width
+        self.height = height
+        self.allow_rotation = allow_rotation
+        self.free_rects = [(0, 0, width, height)]
+        self.used_area = 0
+
+    def insert(self, width, height):
+        """矩形を配置して (x, y, rotated) を返す（入らなければ None）"""
+        best = None
+        best_score = (float("inf"), float("inf"))
+        for fx, fy, fw, fh in self.free_rects:
+            for w, h, rotated in ((width, height, False), (height, width, True)):
+                if rotated and (not self.allow_rotation or width == height):
+                    continue
+                if w <= fw and h <= fh:
+                    leftover_x, leftover_y = fw - w, fh - h
+                    score = (min(leftover_x, leftover_y), max(leftover_x, leftover_y))
+                    if score < best_score:
+                        best_score = score
+                        best = (fx, fy, w, h, rotated)
+
+        if best is None:
+            return None
+        x, y, w, h, rotated = best
+        self._place(x, y, w, h)
+        return x, y, rotated
+
+    def _place(self, x, y, w, h):
+        """配置した矩形と重なる空き領域を分割し、包含される空き領域を取り除く"""
+        new_free = []
+        for fx, fy, fw, fh in self.free_rects:
+            if x >= fx + fw or x + w <= fx or y >= fy + fh or y + h <= fy:
+                new_free.append((fx, fy, fw, fh))
+                continue
+            if x > fx:
+                new_free.append((fx, fy, x - fx, fh))
+            if x + w < fx + fw:
+                new_free.append((x + w, fy, fx + fw - x - w, fh))
+            if y > fy:
+                new_free.append((fx, fy, fw, y - fy))
+            if y + h < fy + fh:
+                new_free.append((fx, y + h, fw, fy + fh - y - h))
+
+        # 他の空き領域に完全に含まれるものを除く（面積の大きい順に判定）
+        new_free.sort(key=lambda r: r[2] * r[3], reverse=True)
+        pruned = []
+        for rect in new_free:
+            rx, ry, rw, rh = rect
+            if not any(rx >= px and ry >= py and rx + rw <= px + pw and ry + rh <= py + ph
+                       for px, py, pw, ph in pruned):
+                pruned.append(rect)
+        self.free_rects = pruned
+        self.used_area += w * h
+
+
+def next_pow2(value):
+    """value 以上の最小の2のべき乗"""
+    return 1 << max(0, int(value - 1).bit_length())
+
+
+def pack_into_bin(sprites, width, height, gap, allow_rotation):
+    """sprites を1枚のビンに詰める（入らなかったスプライトのリストを返す）"""
+    packer = MaxRectsBin(width, height, allow_rotation)
+    placements = []
+    leftover = []
+    for sprite in sprites:
+        w, h = sprite.size
+        placed = packer.insert(w + gap, h + gap)
+        if placed is None:
+            leftover.append(sprite)
+        else:
+            placements.append((sprite, placed))
+    return placements, leftover
+
+
+def candidate_sizes(sprites, gap, max_size, allow_rotation):
+    """
+    アトラスのサイズの候補（2のべき乗の (width, height)、縦横が違うものも含む）を面積の小さい順に返す
+    面積がスプライトの合計に満たないものと、一番幅・高さのあるスプライトが入らないものは除く
+    同じ面積なら正方形に近いもの → 横長のものを先に試す
+    """
+    area = sum((s.size[0] + gap) * (s.size[1] + gap) for s in sprites)
+    if allow_rotation:
+        min_width = min_height = next_pow2(max(min(s.size) for s in sprites) + gap)
+    else:
+        min_width = next_pow2(max(s.size[0] for s in sprites) + gap)
+        min_height = next_pow2(max(s.size[1] for s in sprites) + gap)
+    sides = [1 << i for i in range(max_size.bit_length()) if 1 << i <= max_size]
+    sizes = [(w, h) for w in sides for h in sides
+             if w >= min_width and h >= min_height and w * h >= area]
+    return sorted(sizes, key=lambda size: (size[0] * size[1], max(size), -size[0]))
+
+
+def pack_sprites(sprites, max_size=DEFAULT_MAX_SIZE, padding=2, extrude=0, allow_rotation=False):
+    """
+    スプライトを2のべき乗サイズのアトラスに詰める
+    候補のサイズ（candidate_sizes）を面積の小さい順に試して全部入る最初のサイズを使い、
+    max_size x max_size でも入らなければ入った分で1枚にして、残りを次のアトラスに詰める
+
+    Returns:
+        アトラスのサイズ [(width, height), ...]
+        （各 Sprite の atlas/x/y/rotated を設定する）
+    """
+    gap = padding + extrude * 2
+    # 長辺の長い順 → 面積の大きい順に並べると詰め込み効率が良い
+    remaining = sorted(sprites, key=lambda s: (max(s.size), s.size[0] * s.size[1]), reverse=True)
+    for sprite in remaining:
+        if max(sprite.size) + gap > max_size:
+            raise ValueError(f"{sprite.name} ({sprite.size[0]}x{sprite.size[1]}) は "
+                             f"最大アトラスサイズ {max_size} に入りません")
+
+    atlases = []
+    while remaining:
+        for width, height in candidate_sizes(remaining, gap, max_size, allow_rotation):
+            placements, leftover = pack_into_bin(remaining, width, height, gap, allow_rotation)
+            if not leftover:
+                break
+        else:
+            width = height = max_size
+            placements, leftover = pack_into_bin(remaining, width, height, gap, allow_rotation)
+
+        index = len(atlases)
+        for sprite, (x, y, rotated) in placements:
+            sprite.atlas = index
+            sprite.x, sprite.y = x + extrude, y + extrude
+            sprite.rotated = rotated
+        atlases.append((width, height))
+        remaining = leftover
+
+    return atlases
+
+
+# ============================================
+# アトラス画像とメタデータの出力
+# ============================================
+def extrude_edges(canvas, x, y, w, h, extrude):
+    """スプライトの外周ピクセルを extrude ピクセル分外側に複製（にじみ防止）"""
+    if extrude <= 0:
+        return
+    region = canvas[y:y + h, x:x + w]
+    padded = np.pad(region, ((extrude, extrude), (extrude, extrude), (0, 0)), mode="edge")
+    canvas[y - extrude:y + h + extrude, x - extrude:x + w + extrude] = padded
+
+
+def render_atlases(sprites, atlases, extrude=0):
+    """配置済みのスプライトからアトラス画像（PIL）を作る"""
+    canvases = [np.zeros((h, w, 4), dtype=np.uint8) for w, h in atlases]
+    for sprite in sprites:
+        pixels = np.asarray(sprite.image)
+        if sprite.rotated:
+            pixels = np.rot90(pixels, -1)  # 時計回りに90度
+        h, w = pixels.shape[:2]
+        canvas = canvases[sprite.atlas]
+        canvas[sprite.y:sprite.y + h, sprite.x:sprite.x + w] = pixels
+        extrude_edges(canvas, sprite.x, sprite.y, w, h, extrude)
+    return [Image.fromarray(canvas, "RGBA") for canvas in canvases]
+
+
+def sprite_metadata(sprite, atlases, atlas_files):
+    """
+    Unity側で使うスプライトのメタデータ
+    UV・offset は Unity と同じ左下原点、x/y はアトラス画像上の左上原点
+    pivot は元画像の中心を指すので、トリミングしても表示位置は変わらない
+    """
+    atlas_w, atlas_h = atlases[sprite.atlas]
+    w, h = sprite.size
+    if sprite.rotated:
+        w, h = h, w
+    src_w, src_h = sprite.source_size
+    left, top, right, bottom = sprite.bbox
+    trimmed_w, trimmed_h = right - left, bottom - top
+
+    return {
+        "name": sprite.name,
+        "atlas": atlas_files[sprite.atlas],
+        "x": sprite.x,
+        "y": sprite.y,
+        "width": w,
+        "height": h,
+        "rotated": sprite.rotated,
+        "u0": round(sprite.x / atlas_w, 6),
+        "v0": round((atlas_h - sprite.y - h) / atlas_h, 6),
+        "u1": round((sprite.x + w) / atlas_w, 6),
+        "v1": round((atlas_h - sprite.y) / atlas_h, 6),
+        "pivot_x": round((src_w / 2 - left) / trimmed_w, 6),
+        "pivot_y": round((bottom - src_h / 2) / trimmed_h, 6),
+        "source_width": src_w,
+        "source_height": src_h,
+        "offset_x": left,
+        "offset_y": src_h - bottom,
+    }
+
+
+def collect_sources(patterns):
+    """ファイル・ディレクトリ・globパターンからPNGの一覧を作る"""
+    paths = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            matches = glob.glob(os.path.join(pattern, "**", "*.png"), recursive=True)
+        else:
+            matches = glob.glob(pattern)
+        paths.extend(sorted(matches))
+    return list(dict.fromkeys(os.path.normpath(p) for p in paths))
+
+
+def sprite_names(paths):
+    """スプライト名（ファイル名、重複時は親ディレクトリ名を付ける）"""
+    stems = [os.path.splitext(os.path.basename(p))[0] for p in paths]
+    names = []
+    for path, stem in zip(paths, stems):
+        if stems.count(stem) > 1:
+            stem = f"{os.path.basename(os.path.dirname(path))}_{stem}"
+        names.append(stem)
+    return names
+
+
+def build_atlas(paths, output_dir, name="sprites", max_size=DEFAULT_MAX_SIZE, padding=2,
+                extrude=0, allow_rotation=False, trim=False, cache=None):
+    """
+    アトラス画像とメタデータ（JSON/CSV）を生成
+
+    Returns:
+        メタデータ（dict）。キャッシュが有効でスキップした場合は既存のメタデータ
+    """
+    json_path = os.path.join(output_dir, f"{name}.json")
+    csv_path = os.path.join(output_dir, f"{name}.csv")
+    params = {"max_size": max_size, "padding": padding, "extrude": extrude,
+              "rotate": allow_rotation, "trim": trim, "sources": [project_relpath(p) for p in paths]}
+    key = None
+    if cache is not None:
+        key = cache.compute_key("pack_sprite_atlas", params=params, inputs=paths, code=GENERATOR_CODE)
+        if cache.is_up_to_date(json_path, key):
+            with open(json_path, encoding="utf-8") as f:
+                metadata = json.load(f)
+            atlas_paths = [os.path.join(output_dir, a["file"]) for a in metadata["atlases"]]
+            if all(cache.is_up_to_date(p, key) for p in atlas_paths + [csv_path]):
+                print(f"変更なし（スキップ）: {json_path}")
+                return metadata
+
+    sprites = [Sprite(sprite_name, path, trim) for sprite_name, path in zip(sprite_names(paths), paths)]
+    atlases = pack_sprites(sprites, max_size, padding, extrude, allow_rotation)
+    images = render_atlases(sprites, atlases, extrude)
+
+    atlas_files = [f"{name}_{i}.png" for i in range(len(atlases))]
+    atlas_info = []
+    for i, ((w, h), file_name) in enumerate(zip(atlases, atlas_files)):
+        used = sum(s.size[0] * s.size[1] for s in sprites if s.atlas == i)
+        atlas_info.append({"file": file_name, "width": w, "height": h,
+                           "sprites": sum(1 for s in sprites if s.atlas == i),
+                           "efficiency": round(used / (w * h), 4)})
+
+    metadata = {
+        "atlases": atlas_info,
+        "padding": padding,
+        "extrude": extrude,
+        "sprites": [sprite_metadata(s, atlases, atlas_files) for s in sprites],
+    }
+
+    outputs = [os.path.join(output_dir, f) for f in atlas_files]
+    for image, path in zip(images, outputs):
+        save_png(image, path)
+
+    write_if_changed(json_path, json.dumps(metadata, ensure_ascii=False, indent=2).encode("utf-8"))
+    csv_buffer = io.StringIO()
+    writer = csv.DictWriter(csv_buffer, fieldnames=CSV_COLUMNS, lineterminator="\n")
+    writer.writeheader()
+    writer.writerows(metadata["sprites"])
+    write_if_changed(csv_path, csv_buffer.getvalue().encode("utf-8"))
+
+    if cache is not None:
+        for path in outputs + [json_path, csv_path]:
+            cache.record(path, key, "pack_sprite_atlas", params=params, inputs=paths)
+    return metadata
+
+
+def main():
+    parser = argparse.ArgumentParser(description="スプライトをアトラスにまとめる")
+    parser.add_argument("sources", nargs="*", default=DEFAULT_SOURCES,
+                        help="PNGファイル・ディレクトリ・globパターン")
+    parser.add_argument("--output-dir", default="../Assets/Resources/Atlases", help="出力先")
+    parser.add_argument("--name", default="sprites", help="出力ファイル名のベース")
+    parser.add_argument("--max-size", type=int, default=DEFAULT_MAX_SIZE,
+                        help="アトラスの最大サイズ（2のべき乗）")
+    parser.add_argument("--padding", type=int, default=2, help="スプライト間の余白（px）")
+    parser.add_argument("--extrude", type=int, default=0, help="外周ピクセルの複製幅（px）")
+    parser.add_argument("--rotate", action="store_true", help="90度回転での配置を許可")
+    parser.add_argument("--trim", action="store_true", help="透明な縁を切り落とす")
+    parser.add_argument("--force", action="store_true",
+                        help="ビルドキャッシュを無視して再生成")
+    args = parser.parse_args()
+
+    paths = collect_sources(args.sources)
+    if not paths:
+        print("Error: スプライトが見つかりません")
+        return
+
+    cache = BuildCache(force=args.force)
+    start = time.perf_counter()
+    metadata = build_atlas(paths, args.output_dir, args.name, args.max_size, args.padding,
+                           args.extrude, args.rotate, args.trim, cache)
+    cache.save()
+    elapsed = time.perf_counter() - start
+
+    print(f"スプライト {len(metadata['sprites'])}枚 -> アトラス {len(metadata['atlases'])}枚 ({elapsed:.2f}s)")
+    for atlas in metadata["atlases"]:
+        print(f"  {atlas['file']}: {atlas['width']}x{atlas['height']}  "
+              f"{atlas['sprites']}枚  充填率 {atlas['efficiency'] * 100:.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,293 @@
+"""
+サイズが一番小さくなる形式・フィルタ・zlib 設定を選んで PNG にエンコードするモジュール
+PIL の Image.save(..., "PNG") は常に同じ設定（フィルタは適応型のみ、zlib レベル 6）で書き出すため、
+単色ベタ塗りのパネルや色替えした包丁でもフルカラー RGBA のまま大きくなる
+
+試す候補:
+  形式        RGBA / RGB / LA / L への縮退（不透明・グレーなら）、
+              256色以下なら完全なパレット（16色以下ならビット深度も下げる）、
+              max_error > 0 ならパレット減色（各ピクセルの各チャンネルの誤差が max_error 以下のときだけ）
+  フィルタ    None / Sub / Up / Average / Paeth を全行に固定 + 行ごとに選ぶ適応型（numpy で全行まとめて計算）
+  zlib        レベル9、strategy は default / filtered
+  PIL         Image.save(..., optimize=True) の結果（小さなパレット画像向け）
+
+エンコード結果は PIL で読み直して元画像（減色なら誤差の上限）と照合する。
+
+使い方（ライブラリとして）:
+  data = encode_png(image)                  # 可逆
+  data = encode_png(image, max_error=3)     # 誤差 3/255 までの減色を許す
+  data = encode_png(image, effort="fast")   # フィルタは適応型と None だけ試す
+"""
+
+from PIL import Image
+from build_trace import span
+import numpy as np
+import io
+import struct
+import zlib
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# IHDR の color type
+COLOR_GRAY = 0
+COLOR_RGB = 2
+COLOR_PALETTE = 3
+COLOR_GRAY_ALPHA = 4
+COLOR_RGBA = 6
+CHANNELS = {COLOR_GRAY: 1, COLOR_RGB: 3, COLOR_PALETTE: 1, COLOR_GRAY_ALPHA: 2, COLOR_RGBA: 4}
+
+FILTER_NONE, FILTER_SUB, FILTER_UP, FILTER_AVERAGE, FILTER_PAETH = range(5)
+ADAPTIVE = "adaptive"
+
+# effort ごとに試すフィルタと zlib の strategy
+EFFORT_FILTERS = {
+    "fast": [ADAPTIVE, FILTER_NONE],
+    "full": [ADAPTIVE, FILTER_NONE, FILTER_SUB, FILTER_UP, FILTER_AVERAGE, FILTER_PAETH],
+}
+EFFORT_STRATEGIES = {
+    "fast": [zlib.Z_DEFAULT_STRATEGY],
+    "full": [zlib.Z_DEFAULT_STRATEGY, zlib.Z_FILTERED],
+}
+
+# 一度にフィルタをかける行数（大きな画像でも int16 の中間配列がこの行数分で済む）
+ROW_BAND = 256
+
+
+# ============================================
+# 形式（color type / bit depth）の候補
+# ============================================
+class Candidate:
+    """エンコードする形式1つ分（行ごとのバイト列とパレット）"""
+
+    def __init__(self, label, color_type, bit_depth, rows, plte=None, trns=None):
+        self.label = label
+        self.color_type = color_type
+        self.bit_depth = bit_depth
+        self.rows = rows  # (height, 行のバイト数) の uint8
+        self.plte = plte
+        self.trns = trns
+        # フィルタが参照する左隣のバイト数（1バイト未満の画素は 1）
+        self.bpp = max(1, CHANNELS[color_type] * bit_depth // 8)
+
+
+def pack_indices(indices, bit_depth):
+    """パレット番号 (height, width) を bit_depth ビットずつ詰めた行にする"""
+    if bit_depth == 8:
+        return indices.astype(np.uint8)
+    per_byte = 8 // bit_depth
+    height, width = indices.shape
+    padded = np.zeros((height, -(-width // per_byte) * per_byte), dtype=np.uint8)
+    padded[:, :width] = indices
+    groups = padded.reshape(height, -1, per_byte)
+    shifts = (8 - bit_depth * (np.arange(per_byte) + 1)).astype(np.uint8)
+    return np.bitwise_or.reduce(groups << shifts, axis=2).astype(np.uint8)
+
+
+def palette_candidate(label, indices, colors):
+    """パレット番号と RGBA のパレットから候補を作る（透明度が要る色だけ tRNS に入れる）"""
+    # tRNS を短くするため、半透明の色をパレットの先頭に並べ替える
+    order = np.argsort(colors[:, 3] == 255, kind="stable")
+    remap = np.empty(len(order), dtype=np.uint8)
+    remap[order] = np.arange(len(order), dtype=np.uint8)
+    colors = colors[order]
+    indices = remap[indices]
+
+    count = len(colors)
+    bit_depth = 1 if count <= 2 else 2 if count <= 4 else 4 if count <= 16 else 8
+    translucent = int((colors[:, 3] < 255).sum())
+    return Candidate(label, COLOR_PALETTE, bit_depth, pack_indices(indices, bit_depth),
+                     plte=colors[:, :3].tobytes(),
+                     trns=colors[:translucent, 3].tobytes() if translucent else None)
+
+
+def exact_palette(pixels):
+    """256色以下なら (パレット番号, RGBA のパレット)、それ以上なら None"""
+    packed = pixels.view(np.uint32).reshape(pixels.shape[:2])
+    colors, indices = np.unique(packed, return_inverse=True)
+    if len(colors) > 256:
+        return None
+    return indices.reshape(packed.shape), colors.view(np.uint8).reshape(-1, 4)
+
+
+def quantized_palette(image, pixels, max_error):
+    """
+    256色に減色し、各チャンネルの誤差が max_error 以下なら (パレット番号, パレット, 誤差) を返す
+    完全に透明なピクセル同士の色の違いは見えないので数えない
+    """
+    quantized = image.quantize(256, method=Image.Quantize.FASTOCTREE, dither=Image.Dither.NONE)
+    indices = np.asarray(quantized)
+    palette = np.asarray(quantized.getpalette("RGBA"), dtype=np.uint8).reshape(-1, 4)
+    used = int(indices.max()) + 1
+    palette = palette[:used]
+
+    restored = palette[indices]
+    diff = np.abs(restored.astype(np.int16) - pixels.astype(np.int16))
+    invisible = (pixels[..., 3] == 0) & (restored[..., 3] == 0)
+    diff[invisible] = 0
+    error = int(diff.max())
+    if error > max_error:
+        return None
+    return indices, palette, error
+
+
+def candidates(image, max_error=0):
+    """画像を表せる形式の候補を小さくなりそうな順に返す"""
+    pixels = np.ascontiguousarray(np.asarray(image.convert("RGBA")))
+    height, width = pixels.shape[:2]
+    opaque = bool((pixels[..., 3] == 255).all())
+    gray = bool(((pixels[..., 0] == pixels[..., 1]) & (pixels[..., 1] == pixels[..., 2])).all())
+
+    result = []
+    palette = exact_palette(pixels)
+    if palette is not None:
+        result.append(palette_candidate("palette", *palette))
+    elif max_error > 0:
+        quantized = quantized_palette(image.convert("RGBA"), pixels, max_error)
+        if quantized is not None:
+            indices, colors, error = quantized
+            result.append(palette_candidate(f"quantized(err {error})", indices, colors))
+
+    if gray:
+        if opaque:
+            result.append(Candidate("L", COLOR_GRAY, 8, pixels[..., 0].copy()))
+        else:
+            result.append(Candidate("LA", COLOR_GRAY_ALPHA, 8,
+                                    pixels[..., [0, 3]].reshape(height, width * 2)))
+    if opaque:
+        result.append(Candidate("RGB", COLOR_RGB, 8, pixels[..., :3].reshape(height, width * 3)))
+    else:
+        result.append(Candidate("RGBA", COLOR_RGBA, 8, pixels.reshape(height, width * 4)))
+    return result
+
+
+# ============================================
+# フィルタ
+# ============================================
+def filter_rows(rows, bpp, previous=None):
+    """
+    5種類のフィルタを全行にかけた結果を (5, height, 行のバイト数) で返す
+    どのフィルタも元のバイト列（左・上・左上）しか参照しないので、全行まとめて計算できる
+    previous: rows の直前の行（画像の途中から計算するとき。None なら先頭行として扱う）
+    """
+    x = rows.astype(np.int16)
+    a = np.zeros_like(x)
+    a[:, bpp:] = x[:, :-bpp]
+    b = np.zeros_like(x)
+    b[1:] = x[:-1]
+    c = np.zeros_like(x)
+    c[1:, bpp:] = x[:-1, :-bpp]
+    if previous is not None:
+        b[0] = previous
+        c[0, bpp:] = previous[:-bpp]
+
+    p = a + b - c
+    pa, pb, pc = np.abs(p - a), np.abs(p - b), np.abs(p - c)
+    paeth = np.where((pa <= pb) & (pa <= pc), a, np.where(pb <= pc, b, c))
+
+    filtered = np.stack([x, x - a, x - b, x - ((a + b) >> 1), x - paeth])
+    return (filtered & 0xFF).astype(np.uint8)
+
+
+def filtered_stream(filtered, choice):
+    """
+    フィルタ済みの行に先頭のフィルタ番号を付けて IDAT の中身（圧縮前）にする
+    choice: フィルタ番号、または ADAPTIVE（行ごとに符号付きバイトの絶対値の和が最小のもの）
+    """
+    height = filtered.shape[1]
+    if choice == ADAPTIVE:
+        cost = np.abs(filtered.view(np.int8).astype(np.int32)).sum(axis=2)
+        types = cost.argmin(axis=0)
+    else:
+        types = np.full(height, choice)
+    body = filtered[types, np.arange(height)]
+    return np.hstack([types.astype(np.uint8)[:, None], body]).tobytes()
+
+
+# ============================================
+# PNG の組み立て
+# ============================================
+def chunk(kind, data):
+    return (struct.pack(">I", len(data)) + kind + data
+            + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF))
+
+
+def assemble(candidate, width, height, idat):
+    parts = [PNG_SIGNATURE, chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, candidate.bit_depth,
+                                                       candidate.color_type, 0, 0, 0))]
+    if candidate.plte is not None:
+        parts.append(chunk(b"PLTE", candidate.plte))
+    if candidate.trns is not None:
+        parts.append(chunk(b"tRNS", candidate.trns))
+    parts.append(chunk(b"IDAT", idat))
+    parts.append(chunk(b"IEND", b""))
+    return b"".join(parts)
+
+
+def compressor(strategy):
+    return zlib.compressobj(9, zlib.DEFLATED, 15, 9, strategy)
+
+
+def compress_filtered(rows, bpp, choices, strategies):
+    """
+    フィルタ（choices）× zlib の strategy の組み合わせごとに IDAT を作る
+    ROW_BAND 行ずつフィルタをかけて各 compressobj に流すので、フィルタ済みの画像全体やフィルタごとの
+    ストリームは持たない（zlib は入力の区切り方によらず同じ結果になる）
+    """
+    compressors = {(choice, strategy): compressor(strategy) for choice in choices for strategy in strategies}
+    parts = {key: [] for key in compressors}
+    for start in range(0, len(rows), ROW_BAND):
+        previous = rows[start - 1] if start > 0 else None
+        filtered = filter_rows(rows[start:start + ROW_BAND], bpp, previous)
+        for choice in choices:
+            stream = filtered_stream(filtered, choice)
+            for strategy in strategies:
+                parts[choice, strategy].append(compressors[choice, strategy].compress(stream))
+    return {key: b"".join(parts[key]) + compressors[key].flush() for key in compressors}
+
+
+def encode_png_detail(image, max_error=0, effort="full"):
+    """
+    一番小さい PNG のバイト列と、選んだ設定の説明を返す
+    エンコード結果は読み直して検証する（食い違えば ValueError）
+    """
+    width, height = image.size
+    best = None
+    for candidate in candidates(image, max_error):
+        with span("png_filter_deflate", format=candidate.label):
+            idats = compress_filtered(candidate.rows, candidate.bpp,
+                                      EFFORT_FILTERS[effort], EFFORT_STRATEGIES[effort])
+        for (choice, strategy), idat in idats.items():
+            data = assemble(candidate, width, height, idat)
+            if best is None or len(data) < len(best[0]):
+                filter_name = choice if choice == ADAPTIVE else \
+                    ("none", "sub", "up", "average", "paeth")[choice]
+                best = (data, f"{candidate.label} {candidate.bit_depth}bit {filter_name} "
+                              f"{'filtered' if strategy == zlib.Z_FILTERED else 'default'}")
+
+    # PIL の optimize=True も候補に入れる（小さなパレット画像ではこちらが勝つことがある）
+    buffer = io.BytesIO()
+    image.save(buffer, "PNG", optimize=True)
+    if len(buffer.getvalue()) < len(best[0]):
+        best = (buffer.getvalue(), f"PIL optimize ({image.mode})")
+
+    with span("png_verify"):
+        verify(image, best[0], max_error)
+    return best
+
+
+def encode_png(image, max_error=0, effort="full"):
+    """一番小さい PNG のバイト列を返す"""
+    return encode_png_detail(image, max_error, effort)[0]
+
+
+def verify(image, data, max_error):
+    """エンコード結果を PIL で読み直し、元画像との誤差が max_error 以下か確かめる"""
+    original = np.asarray(image.convert("RGBA"))
+    decoded = np.asarray(Image.open(io.BytesIO(data)).convert("RGBA"))
+    if decoded.shape != original.shape:
+        raise ValueError("PNG の再エンコード結果が元画像と一致しません")
+    # uint8 のまま差の絶対値を取る（大きな画像で int16 のコピーを作らない）
+    diff = np.maximum(decoded, original) - np.minimum(decoded, original)
+    diff[(original[..., 3] == 0) & (decoded[..., 3] == 0)] = 0
+    if int(diff.max(initial=0)) > max_error:
+        raise ValueError("PNG の再エンコード結果が元画像と一致しません")
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+魚画像からStageData.csvの行を自動生成するスクリプト
+grid_cols / grid_rows / brick_width を手で調整する代わりに、候補グリッドを総当たりで評価する
+
+画像ごとにアルファの累積和テーブル（summed-area table）を1回だけ作り、
+どのグリッドサイズでも各セルのアルファ合計を O(1) で求める（候補ごとの再サンプリングなし）
+ブロックの有無は BrickManager / bake_brick_patterns.bake_pattern と同じくセルごとに 3x3 点をサンプリングして決める
+（平均アルファで決めると、焼き込んだ実際のブロック数と食い違う）
+
+評価項目（小さいほど良い）:
+  シルエット再現度  ブロックで覆った領域と魚のアルファの IoU（はみ出し・欠けで下がる）
+  クリア時間       ブロック数 ÷ 破壊ペース と time_limit の差
+  ブロック形状     セルの縦横比が正方形からどれだけ離れているか
+
+破壊ペース（ブロック/秒）は既存の StageData.csv の各ステージ（焼き込んだ実際のブロック数 ÷ time_limit）から求める
+
+使い方:
+  python search_stage_grids.py fish_images/ --time-limit 90
+  python search_stage_grids.py ../Assets/Resources/Sprites/ --append    # StageData.csv に追記（Resources の画像だけ）
+"""
+
+from bake_brick_patterns import (STAGE_DATA_PATH, RESOURCES_DIR, load_stage_data,
+                                 resource_image_path, load_alpha, bake_pattern)
+import numpy as np
+import argparse
+import glob
+import os
+import time
+
+STAGE_COLUMNS = ["stage_id", "stage_name", "fish_image", "grid_cols", "grid_rows",
+                 "brick_width", "time_limit", "bonus_multiplier"]
+
+# 既存ステージがないときの破壊ペース（ブロック/秒）
+DEFAULT_CLEAR_RATE = 0.6
+
+# フィールド幅（grid_cols * brick_width）の既定値 = 既存ステージ1の 17 * 0.9
+DEFAULT_FIELD_WIDTH = 17 * 0.9
+
+# 評価の重み
+WEIGHT_FIDELITY = 1.0
+WEIGHT_TIME = 1.0
+WEIGHT_ASPECT = 0.5
+
+
+def summed_area_table(alpha):
+    """左上に0の行・列を足した累積和テーブル（float64）"""
+    table = np.zeros((alpha.shape[0] + 1, alpha.shape[1] + 1), dtype=np.float64)
+    np.cumsum(np.cumsum(alpha, axis=0, dtype=np.float64), axis=1, out=table[1:, 1:])
+    return table
+
+
+def cell_sums(table, grid_cols, grid_rows):
+    """
+    グリッドの各セルのアルファ合計とセル面積を返す（各 (grid_rows, grid_cols)）
+    セルの境界は画像サイズをグリッド数で等分して丸めた位置
+    """
+    height, width = table.shape[0] - 1, table.shape[1] - 1
+    xs = np.rint(np.linspace(0, width, grid_cols + 1)).astype(np.int64)
+    ys = np.rint(np.linspace(0, height, grid_rows + 1)).astype(np.int64)
+
+    x0, x1 = xs[None, :-1], xs[None, 1:]
+    y0, y1 = ys[:-1, None], ys[1:, None]
+    sums = table[y1, x1] - table[y0, x1] - table[y1, x0] + table[y0, x0]
+    areas = (y1 - y0) * (x1 - x0)
+    return sums, areas
+
+
+def score_grid(alpha, table, total_alpha, grid_cols, grid_rows, time_limit, clear_rate):
+    """候補グリッドの評価値と内訳を返す"""
+    sums, areas = cell_sums(table, grid_cols, grid_rows)
+    # bake_pattern は row 0 がテクスチャの一番上、累積和テーブルは一番下なので上下を合わせる
+    covered = bake_pattern(alpha, grid_cols, grid_rows)[::-1].astype(bool)
+
+    # ブロック領域と魚のアルファの IoU（覆ったセルの透明部分がはみ出し、覆わなかった不透明部分が欠け）
+    overlap = float(sums[covered].sum())
+    overshoot = float((areas - sums)[covered].sum())
+    fidelity = overlap / (total_alpha + overshoot)
+
+    bricks = int(covered.sum())
+    clear_time = bricks / clear_rate
+    time_error = abs(clear_time - time_limit) / time_limit
+
+    height, width = table.shape[0] - 1, table.shape[1] - 1
+    cell_aspect = (width / grid_cols) / (height / grid_rows)
+    aspect_error = abs(np.log(cell_aspect))
+
+    score = (WEIGHT_FIDELITY * (1.0 - fidelity) + WEIGHT_TIME * time_error
+             + WEIGHT_ASPECT * aspect_error)
+    return score, {"fidelity": fidelity, "bricks": bricks, "clear_time": clear_time,
+                   "cell_aspect": cell_aspect}
+
+
+def search_grid(alpha, time_limit, clear_rate, cols_range, rows_range):
+    """全候補を評価して最良の (score, grid_cols, grid_rows, 内訳) を返す"""
+    table = summed_area_table(alpha)
+    total_alpha = table[-1, -1]
+    if total_alpha <= 0:
+        return None
+
+    best = None
+    for grid_cols in range(cols_range[0], cols_range[1] + 1):
+        for grid_rows in range(rows_range[0], rows_range[1] + 1):
+            score, detail = score_grid(alpha, table, total_alpha, grid_cols, grid_rows, time_limit, clear_rate)
+            if best is None or score < best[0]:
+                best = (score, grid_cols, grid_rows, detail)
+    return best
+
+
+def calibrate_clear_rate(stages):
+    """既存ステージの実際のブロック数 ÷ time_limit から破壊ペースを求める"""
+    rates = []
+    for stage in stages:
+        image_path = resource_image_path(stage["fish_image"])
+        if image_path is None or stage["time_limit"] <= 0:
+            continue
+        bricks = bake_pattern(load_alpha(image_path), stage["grid_cols"], stage["grid_rows"]).sum()
+        rates.append(bricks / stage["time_limit"])
+    return float(np.mean(rates)) if rates else DEFAULT_CLEAR_RATE
+
+
+def resource_path(image_path):
+    """Resources 相対パス（拡張子なし）。Resources 外の画像はゲームから読めないので None"""
+    rel = os.path.relpath(os.path.abspath(image_path), os.path.abspath(RESOURCES_DIR))
+    if rel.startswith(".."):
+        return None
+    return os.path.splitext(rel)[0].replace(os.sep, "/")
+
+
+def collect_images(sources):
+    """ファイル・ディレクトリ・globパターンからPNGの一覧を作る"""
+    paths = []
+    for source in sources:
+        if os.path.isdir(source):
+            paths.extend(sorted(glob.glob(os.path.join(source, "*.png"))))
+        else:
+            paths.extend(sorted(glob.glob(source)))
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="魚画像からStageData.csvの行を自動生成")
+    parser.add_argument("images", nargs="+", help="魚画像（ファイル・ディレクトリ・globパターン）")
+    parser.add_argument("--stage-data", default=STAGE_DATA_PATH, help="StageData.csv のパス")
+    parser.add_argument("--time-limit", type=int, default=90, help="目標クリア時間（秒）")
+    parser.add_argument("--cols", type=int, nargs=2, default=(6, 60), metavar=("MIN", "MAX"),
+                        help="grid_cols の探索範囲")
+    parser.add_argument("--rows", type=int, nargs=2, default=(6, 60), metavar=("MIN", "MAX"),
+                        help="grid_rows の探索範囲")
+    parser.add_argument("--field-width", type=float, default=DEFAULT_FIELD_WIDTH,
+                        help="grid_cols * brick_width の目標値")
+    parser.add_argument("--append", action="store_true", help="StageData.csv に追記する")
+    args = parser.parse_args()
+
+    images = collect_images(args.images)
+    outside = [path for path in images if resource_path(path) is None]
+    if args.append and outside:
+        # 存在しないリソースを指す行を StageData.csv に書かない
+        raise SystemExit(f"Error: Resources の外の画像は追記できません（{RESOURCES_DIR}/Sprites にコピーしてから実行）: "
+                         f"{', '.join(outside)}")
+
+    stages = load_stage_data(args.stage_data) if os.path.exists(args.stage_data) else []
+    clear_rate = calibrate_clear_rate(stages)
+    next_id = max((s["stage_id"] for s in stages), default=0) + 1
+    print(f"破壊ペース: {clear_rate:.3f} ブロック/秒（既存 {len(stages)} ステージから）")
+
+    start = time.perf_counter()
+    rows = []
+    for image_path in images:
+        result = search_grid(load_alpha(image_path), args.time_limit, clear_rate, args.cols, args.rows)
+        if result is None:
+            print(f"Warning: {image_path} は全面透明です")
+            continue
+
+        score, grid_cols, grid_rows, detail = result
+        stage_name = os.path.splitext(os.path.basename(image_path))[0]
+        brick_width = round(args.field_width / grid_cols, 2)
+        fish_image = resource_path(image_path)
+        if fish_image is None:
+            fish_image = f"Sprites/{stage_name}"
+            print(f"Warning: {image_path} は Resources の外にあります（行の fish_image は {fish_image} と仮定）")
+        rows.append([next_id, stage_name, fish_image, grid_cols, grid_rows,
+                     brick_width, args.time_limit, 1.0])
+        print(f"  {stage_name}: {grid_cols}x{grid_rows}  ブロック {detail['bricks']}個  "
+              f"再現度 {detail['fidelity'] * 100:.1f}%  推定 {detail['clear_time']:.0f}秒  "
+              f"セル縦横比 {detail['cell_aspect']:.2f}  (score {score:.3f})")
+        next_id += 1
+
+    candidates = (args.cols[1] - args.cols[0] + 1) * (args.rows[1] - args.rows[0] + 1)
+    print(f"{len(rows)}画像 x {candidates}候補を {time.perf_counter() - start:.2f}秒で評価")
+
+    lines = [",".join(str(v) for v in row) for row in rows]
+    if args.append and lines:
+        with open(args.stage_data, "rb") as f:
+            ends_with_newline = f.read().endswith(b"\n")
+        with open(args.stage_data, "a", encoding="utf-8", newline="\n") as f:
+            if not ends_with_newline:
+                f.write("\n")
+            f.write("\n".join(lines) + "\n")
+        print(f"追記しました: {args.stage_data}")
+    else:
+        print()
+        print(",".join(STAGE_COLUMNS))
+        print("\n".join(lines))
+
+
+if __name__ == "__main__":
+    main()
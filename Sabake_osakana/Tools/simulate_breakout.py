@@ -0,0 +1,419 @@
+#!/usr/bin/env python3
+"""
+ステージバランス調整用のブロック崩しヘッドレスシミュレーター
+
+Unity 上の AutoPlayer + SimulationLogger は実時間でしか回せないため、
+本体のループ（壁・パドル・ブロックでの反射、ライフ、制限時間、速度上昇）と
+AutoPlayer 相当のパドル操作を NumPy で再現し、数千ゲームを配列でまとめて1ステップずつ進める。
+バッチはプロセスプールに分散する。
+
+再現している値（SampleScene / 各スクリプトの既定値）:
+  カメラ         orthographic size 10、アスペクト比 16:9（--aspect で変更）
+  壁             WallSetup の左右マージン 6.7
+  パドル         幅 4 x 高さ 0.3、y = 下端 + |initialYOffset| 0.8 + 0.5
+  ボール         半径 0.36（CircleCollider2D 0.3 x scale 1.2）、baseSpeed 8、
+                 残り 50% で 1.2倍 / 25% で 1.5倍、縦成分は最低 30%
+  ブロック       StageData.csv の行 + bake_brick_patterns と同じパターン、
+                 BrickManager の配置（spacing 0.05、autoCenter、高さは画像の縦横比から）
+  AutoPlayer     reactionSpeed 0.8、predictionError 0.5、launchDelay 0.5
+  物理           Fixed Timestep 0.02 秒
+
+簡略化している点:
+  ブロックとの当たりは軸ごと（x → y の順）にボールの進行方向の端の1点で判定し、1ステップで各軸1個まで
+  AutoPlayer の可動域はカメラ端ではなく壁の内側（PaddleController と同じ）
+  全ブロック破壊後のボーナスタイム・スキル・パワーアップは扱わない（破壊した時点でクリア）
+
+使い方:
+  python simulate_breakout.py                         # 全ステージを 2000 ゲームずつ
+  python simulate_breakout.py --stages 1 --games 10000 -j 8
+  python simulate_breakout.py --prediction-error 1.0 --json result.json
+"""
+
+from bake_brick_patterns import STAGE_DATA_PATH, load_stage_data, resource_image_path, load_alpha, bake_pattern
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import argparse
+import json
+import os
+import time
+
+# Fixed Timestep（ProjectSettings/TimeManager.asset）
+FIXED_DT = 0.02
+
+# カメラと壁（SampleScene / WallSetup）
+ORTHO_SIZE = 10.0
+DEFAULT_ASPECT = 16 / 9
+WALL_MARGIN = 6.7
+
+# パドル（SampleScene の Paddle / PaddleController）
+PADDLE_WIDTH = 4.0
+PADDLE_HEIGHT = 0.3
+PADDLE_Y_OFFSET = 0.8
+
+# ボール（BallController）
+BALL_RADIUS = 0.3 * 1.2
+BALL_OFFSET_Y = 0.5
+BASE_SPEED = 8.0
+SPEED_STEPS = ((0.25, 1.5), (0.5, 1.2))  # (残りブロック比率, 倍率) の小さい順
+MIN_VERTICAL_RATIO = 0.3
+LAUNCH_ANGLE = (45.0, 135.0)
+PADDLE_ANGLE = (150.0, 30.0)  # 左端, 右端
+
+# ブロック配置（BrickManager）
+BRICK_SPACING = 0.05
+BRICK_CENTER_Y_OFFSET = 0.5
+
+# GameState
+INITIAL_LIVES = 5
+
+# AutoPlayer
+REACTION_SPEED = 0.8
+PREDICTION_ERROR = 0.5
+LAUNCH_DELAY = 0.5
+
+# 終了理由
+END_CLEAR = 0
+END_TIME_UP = 1
+END_GAME_OVER = 2
+END_NAMES = {END_CLEAR: "clear", END_TIME_UP: "time_up", END_GAME_OVER: "game_over"}
+
+
+def field_bounds(aspect=DEFAULT_ASPECT):
+    """壁の内側の (left, right, top, bottom)"""
+    half_width = ORTHO_SIZE * aspect
+    return (-half_width + WALL_MARGIN, half_width - WALL_MARGIN, ORTHO_SIZE, -ORTHO_SIZE)
+
+
+def stage_layout(stage, aspect=DEFAULT_ASPECT):
+    """
+    StageData の行からシミュレーション用の配置を作る
+    ブロックの中心は BrickManager.CalculateStartPosition / CreateFishBricks と同じ
+    """
+    image_path = resource_image_path(stage["fish_image"])
+    if image_path is None:
+        return None
+    alpha = load_alpha(image_path)
+    pattern = bake_pattern(alpha, stage["grid_cols"], stage["grid_rows"]).astype(bool)
+
+    cols, rows = stage["grid_cols"], stage["grid_rows"]
+    brick_width = stage["brick_width"]
+    image_aspect = alpha.shape[1] / alpha.shape[0]
+    brick_height = (cols * brick_width) / (rows * image_aspect)
+
+    total_width = cols * (brick_width + BRICK_SPACING) - BRICK_SPACING
+    total_height = rows * (brick_height + BRICK_SPACING) - BRICK_SPACING
+    start_x = -total_width / 2
+    start_y = total_height / 2 + BRICK_CENTER_Y_OFFSET
+
+    left, right, top, bottom = field_bounds(aspect)
+    return {
+        "stage_id": stage["stage_id"],
+        "stage_name": stage["stage_name"],
+        "pattern": pattern,
+        "brick_width": brick_width,
+        "brick_height": brick_height,
+        # ブロック (0, 0) の左上の角
+        "grid_left": start_x - brick_width / 2,
+        "grid_top": start_y + brick_height / 2,
+        "time_limit": float(stage["time_limit"]),
+        "field": (left, right, top, bottom),
+        "paddle_y": bottom + PADDLE_Y_OFFSET + 0.5,
+    }
+
+
+def brick_cells(layout, x, y):
+    """
+    座標が乗っているブロックの (row, col) と、ブロック上かどうか（隙間・グリッド外は False）
+    """
+    pitch_x = layout["brick_width"] + BRICK_SPACING
+    pitch_y = layout["brick_height"] + BRICK_SPACING
+    rows, cols = layout["pattern"].shape
+
+    local_x = x - layout["grid_left"]
+    local_y = layout["grid_top"] - y
+    col = np.floor(local_x / pitch_x).astype(np.int64)
+    row = np.floor(local_y / pitch_y).astype(np.int64)
+    on_brick = ((col >= 0) & (col < cols) & (row >= 0) & (row < rows)
+                & (local_x - col * pitch_x < layout["brick_width"])
+                & (local_y - row * pitch_y < layout["brick_height"]))
+    return np.clip(row, 0, rows - 1), np.clip(col, 0, cols - 1), on_brick
+
+
+def predict_landing_x(pos, vel, paddle_y, min_x, max_x):
+    """
+    AutoPlayer.PredictLandingX を配列で計算
+    壁での反射の繰り返しは、幅 2w の周期で折り返す計算に置き換えている（結果は同じ）
+    """
+    paddle_top = paddle_y + 0.5
+    with np.errstate(divide="ignore", invalid="ignore"):
+        time_to_reach = (pos[:, 1] - paddle_top) / -vel[:, 1]
+    predicted = pos[:, 0] + vel[:, 0] * time_to_reach
+
+    left, right = min_x - 0.5, max_x + 0.5
+    width = right - left
+    u = np.mod(predicted - left, 2 * width)
+    predicted = left + np.where(u <= width, u, 2 * width - u)
+
+    fallback = (np.abs(vel[:, 1]) < 0.1) | ~(time_to_reach >= 0)
+    return np.where(fallback, pos[:, 0], predicted)
+
+
+def direction_from_angle(degrees):
+    """角度（度）から単位ベクトルの配列 (n, 2)"""
+    radians = np.radians(degrees)
+    return np.stack([np.cos(radians), np.sin(radians)], axis=1)
+
+
+def simulate_batch(layout, games, seed, reaction_speed=REACTION_SPEED,
+                   prediction_error=PREDICTION_ERROR, launch_delay=LAUNCH_DELAY):
+    """
+    同じステージを games ゲーム同時に進める
+
+    Returns:
+        dict: 各ゲームの clear_time（未クリアは NaN）、destroyed、total、end（終了理由）、
+              lives（残りライフ）の配列
+    """
+    rng = np.random.default_rng(seed)
+    left, right, top, bottom = layout["field"]
+    paddle_y = layout["paddle_y"]
+    paddle_top = paddle_y + PADDLE_HEIGHT / 2
+    paddle_bottom = paddle_y - PADDLE_HEIGHT / 2
+    half_paddle = PADDLE_WIDTH / 2
+    min_x, max_x = left + half_paddle, right - half_paddle
+    dt = FIXED_DT
+
+    alive = np.broadcast_to(layout["pattern"], (games,) + layout["pattern"].shape).copy()
+    total = int(layout["pattern"].sum())
+    index = np.arange(games)
+
+    pos = np.zeros((games, 2))
+    vel = np.zeros((games, 2))
+    paddle_x = np.zeros(games)
+    target_x = np.zeros(games)
+    launched = np.zeros(games, dtype=bool)
+    launch_timer = np.full(games, launch_delay)
+    lives = np.full(games, INITIAL_LIVES)
+    destroyed = np.zeros(games, dtype=np.int64)
+    play_time = np.zeros(games)
+    active = np.ones(games, dtype=bool)
+    end = np.full(games, -1)
+    clear_time = np.full(games, np.nan)
+    pos[:, 0] = paddle_x
+    pos[:, 1] = paddle_y + BALL_OFFSET_Y
+
+    while active.any():
+        # --- Ready: 発射待ち（制限時間は進まない）---
+        ready = active & ~launched
+        launch_timer[ready] -= dt
+        launch = ready & (launch_timer <= 0)
+        if launch.any():
+            angles = rng.uniform(*LAUNCH_ANGLE, size=int(launch.sum()))
+            vel[launch] = direction_from_angle(angles)  # 速さは下でかける
+            launched |= launch
+        waiting = active & ~launched
+        pos[waiting, 0] = paddle_x[waiting]
+        pos[waiting, 1] = paddle_y + BALL_OFFSET_Y
+
+        playing = active & launched
+        if not playing.any():
+            continue
+        play_time[playing] += dt
+
+        # --- 速度（UpdateSpeedBasedOnProgress + MaintainSpeed）---
+        remaining_ratio = 1.0 - destroyed / max(total, 1)
+        multiplier = np.ones(games)
+        for ratio, value in reversed(SPEED_STEPS):
+            multiplier[remaining_ratio <= ratio] = value
+        speed = BASE_SPEED * multiplier
+
+        direction = vel / np.maximum(np.linalg.norm(vel, axis=1, keepdims=True), 1e-9)
+        flat = np.abs(direction[:, 1]) < MIN_VERTICAL_RATIO
+        direction[flat, 1] = np.where(direction[flat, 1] >= 0, 1.0, -1.0) * MIN_VERTICAL_RATIO
+        direction /= np.linalg.norm(direction, axis=1, keepdims=True)
+        vel = np.where(playing[:, None], direction * speed[:, None], vel)
+
+        # --- AutoPlayer（Playing 中だけパドルを動かす）---
+        falling = playing & (vel[:, 1] < 0)
+        noise = rng.uniform(-prediction_error, prediction_error, size=games)
+        predicted = predict_landing_x(pos, vel, paddle_y, min_x, max_x) + noise
+        target_x = np.where(falling, np.clip(predicted, min_x, max_x),
+                            np.where(playing, target_x + (0.0 - target_x) * min(dt * 2, 1.0), target_x))
+        step = min(dt * 10 * reaction_speed, 1.0)
+        paddle_x = np.where(playing, np.clip(paddle_x + (target_x - paddle_x) * step, min_x, max_x), paddle_x)
+
+        # --- ボールの移動とブロック（軸ごと）---
+        for axis in (0, 1):
+            moved = pos[:, axis] + vel[:, axis] * dt
+            probe = pos.copy()
+            probe[:, axis] = moved + np.sign(vel[:, axis]) * BALL_RADIUS
+            row, col, on_brick = brick_cells(layout, probe[:, 0], probe[:, 1])
+            hit = playing & on_brick & alive[index, row, col]
+            alive[index[hit], row[hit], col[hit]] = False
+            destroyed += hit
+            vel[hit, axis] = -vel[hit, axis]
+            pos[:, axis] = np.where(playing & ~hit, moved, pos[:, axis])
+
+        # --- 壁 ---
+        x, y = pos[:, 0], pos[:, 1]
+        hit_left = playing & (x - BALL_RADIUS < left)
+        hit_right = playing & (x + BALL_RADIUS > right)
+        hit_top = playing & (y + BALL_RADIUS > top)
+        pos[hit_left, 0] = left + BALL_RADIUS
+        vel[hit_left, 0] = np.abs(vel[hit_left, 0])
+        pos[hit_right, 0] = right - BALL_RADIUS
+        vel[hit_right, 0] = -np.abs(vel[hit_right, 0])
+        pos[hit_top, 1] = top - BALL_RADIUS
+        vel[hit_top, 1] = -np.abs(vel[hit_top, 1])
+
+        # --- パドル（OnCollisionEnter2D + 貫通防止）---
+        on_paddle = (playing & (vel[:, 1] < 0)
+                     & (pos[:, 1] - BALL_RADIUS <= paddle_top)
+                     & (pos[:, 1] - BALL_RADIUS > paddle_bottom - 0.5)
+                     & (np.abs(pos[:, 0] - paddle_x) <= half_paddle + BALL_RADIUS))
+        if on_paddle.any():
+            hit_point = np.clip((pos[on_paddle, 0] - paddle_x[on_paddle]) / half_paddle, -1.0, 1.0)
+            angles = PADDLE_ANGLE[0] + (PADDLE_ANGLE[1] - PADDLE_ANGLE[0]) * (hit_point + 1) / 2
+            vel[on_paddle] = direction_from_angle(angles) * speed[on_paddle, None]
+            pos[on_paddle, 1] = paddle_top + BALL_RADIUS
+
+        # --- 終了判定 ---
+        cleared = playing & (destroyed >= total)
+        clear_time[cleared] = play_time[cleared]
+        end[cleared] = END_CLEAR
+        active &= ~cleared
+
+        lost = active & (pos[:, 1] - BALL_RADIUS < bottom)
+        lives -= lost
+        over = lost & (lives <= 0)
+        end[over] = END_GAME_OVER
+        active &= ~over
+        reset = lost & ~over
+        launched[reset] = False
+        launch_timer[reset] = launch_delay
+        vel[reset] = 0.0
+
+        time_up = active & (play_time >= layout["time_limit"])
+        end[time_up] = END_TIME_UP
+        active &= ~time_up
+
+    return {"clear_time": clear_time, "destroyed": destroyed, "total": total,
+            "end": end, "lives": lives}
+
+
+def _simulate_job(job):
+    """プロセスプール用"""
+    layout, games, seed, policy = job
+    return simulate_batch(layout, games, seed, **policy)
+
+
+def run_stage(layout, games, batch_size, seed, workers=None, policy=None):
+    """ステージを games ゲーム分バッチに分けて並列実行し、結果を結合する"""
+    policy = policy or {}
+    sizes = [batch_size] * (games // batch_size)
+    if games % batch_size:
+        sizes.append(games % batch_size)
+    seeds = np.random.SeedSequence([seed, layout["stage_id"]]).spawn(len(sizes))
+    jobs = [(layout, size, s, policy) for size, s in zip(sizes, seeds)]
+
+    workers = min(workers or os.cpu_count() or 1, len(jobs))
+    if workers == 1:
+        results = [_simulate_job(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_simulate_job, jobs))
+
+    return {
+        "clear_time": np.concatenate([r["clear_time"] for r in results]),
+        "destroyed": np.concatenate([r["destroyed"] for r in results]),
+        "total": results[0]["total"],
+        "end": np.concatenate([r["end"] for r in results]),
+        "lives": np.concatenate([r["lives"] for r in results]),
+    }
+
+
+def percentiles(values, points=(10, 50, 90)):
+    """空配列なら None"""
+    if values.size == 0:
+        return None
+    return {f"p{p}": round(float(np.percentile(values, p)), 2) for p in points}
+
+
+def summarize(layout, result):
+    """クリア時間とクリア率（%）の分布をまとめる"""
+    total = result["total"]
+    clear_pct = result["destroyed"] / max(total, 1) * 100
+    clear_time = result["clear_time"][~np.isnan(result["clear_time"])]
+    games = result["end"].size
+    return {
+        "stage_id": layout["stage_id"],
+        "stage_name": layout["stage_name"],
+        "games": games,
+        "bricks": total,
+        "time_limit": layout["time_limit"],
+        "end": {name: round(float(np.mean(result["end"] == code)), 4) for code, name in END_NAMES.items()},
+        "clear_time": dict(mean=round(float(clear_time.mean()), 2), **percentiles(clear_time))
+                      if clear_time.size else None,
+        "clear_percentage": dict(mean=round(float(clear_pct.mean()), 2), **percentiles(clear_pct)),
+        "lives_left_mean": round(float(result["lives"].mean()), 2),
+    }
+
+
+def print_summary(summary):
+    end = summary["end"]
+    print(f"ステージ {summary['stage_id']} {summary['stage_name']}: {summary['games']}ゲーム "
+          f"ブロック {summary['bricks']}個 制限 {summary['time_limit']:.0f}秒")
+    print(f"  終了: クリア {end['clear'] * 100:.1f}%  時間切れ {end['time_up'] * 100:.1f}%  "
+          f"ゲームオーバー {end['game_over'] * 100:.1f}%")
+    ct = summary["clear_time"]
+    if ct:
+        print(f"  クリア時間: 平均 {ct['mean']:.1f}秒  p10 {ct['p10']:.1f}  p50 {ct['p50']:.1f}  p90 {ct['p90']:.1f}")
+    cp = summary["clear_percentage"]
+    print(f"  クリア率:   平均 {cp['mean']:.1f}%  p10 {cp['p10']:.1f}  p50 {cp['p50']:.1f}  p90 {cp['p90']:.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ブロック崩しのヘッドレス・モンテカルロシミュレーション")
+    parser.add_argument("--stage-data", default=STAGE_DATA_PATH, help="StageData.csv のパス")
+    parser.add_argument("--stages", type=int, nargs="*", help="対象の stage_id（既定: 全ステージ）")
+    parser.add_argument("--games", type=int, default=2000, help="ステージごとのゲーム数")
+    parser.add_argument("--batch", type=int, default=500, help="1プロセスでまとめて進めるゲーム数")
+    parser.add_argument("--seed", type=int, default=0, help="乱数シード")
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+                        help="ワーカープロセス数（既定: CPUコア数）")
+    parser.add_argument("--aspect", type=float, default=DEFAULT_ASPECT, help="カメラのアスペクト比")
+    parser.add_argument("--reaction-speed", type=float, default=REACTION_SPEED,
+                        help="AutoPlayer.reactionSpeed")
+    parser.add_argument("--prediction-error", type=float, default=PREDICTION_ERROR,
+                        help="AutoPlayer.predictionError")
+    parser.add_argument("--launch-delay", type=float, default=LAUNCH_DELAY,
+                        help="AutoPlayer.launchDelay")
+    parser.add_argument("--json", help="集計結果をJSONで保存するパス")
+    args = parser.parse_args()
+
+    policy = {"reaction_speed": args.reaction_speed, "prediction_error": args.prediction_error,
+              "launch_delay": args.launch_delay}
+    stages = load_stage_data(args.stage_data)
+    if args.stages:
+        stages = [s for s in stages if s["stage_id"] in args.stages]
+
+    summaries = []
+    for stage in stages:
+        layout = stage_layout(stage, args.aspect)
+        if layout is None:
+            print(f"Warning: stage {stage['stage_id']}: {stage['fish_image']} が見つかりません")
+            continue
+        start = time.perf_counter()
+        result = run_stage(layout, args.games, args.batch, args.seed, args.jobs, policy)
+        summary = summarize(layout, result)
+        print_summary(summary)
+        print(f"  ({time.perf_counter() - start:.1f}秒)")
+        summaries.append(summary)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(summaries, f, ensure_ascii=False, indent=2)
+        print(f"保存しました: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
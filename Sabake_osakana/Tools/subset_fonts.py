@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+ゲームで表示する文字だけを残したフォント（サブセット）を作るスクリプト
+x12y16pxMaruMonica.ttf（3MB・8000字以上）や日本語フォールバックの meiryo.ttc をそのまま使うと、
+フォントのメモリ・SDF アトラスの大きさ・起動時の読み込みがすべて使わない字の分だけ重くなる
+
+文字セット:
+  Resources/TextData.csv    text 列（TextDataManager と同じく、先頭3つのカンマより後ろ全部）
+  Resources/StageData.csv   stage_name 列
+  Assets/Scripts/*.cs       文字列リテラル（SkillData のスキル名や UIManager の既定文言など、CSV を通さずに
+                            表示する文字があるため。Debug ログ・Header / Tooltip 属性・コメントは除く）
+  追加の文字                 EXTRA_CHARACTERS（ASCII・全角数字・HUD の記号）+ --extra / --extra-file
+
+出力（Assets/Fonts/Subset/）:
+  x12y16pxMaruMonica.ttf    サブセット（.ttc は FONTS の font_number の1書体だけを .ttf にする）
+  meiryo.ttf
+  characters.txt            文字セット（Tools > Auto Generate Japanese Font Asset などが TMP のアトラスに使う）
+
+ビルドキャッシュ（build_cache.py）のキーに文字セットを含めるので、
+CSV を書き換えても使う文字が変わらなければフォントは作り直さない。
+元のフォントがリポジトリにない場合（meiryo.ttc は同梱していない）はスキップする。
+
+使い方:
+  python subset_fonts.py
+  python subset_fonts.py --extra "★☆" --extra-file extra_chars.txt
+  python subset_fonts.py --dry-run      # 文字数と削減量だけ表示
+"""
+
+from fontTools import subset
+from fontTools.ttLib import TTFont
+from build_cache import BuildCache, write_if_changed
+from build_trace import traced
+import argparse
+import csv
+import io
+import logging
+import os
+import re
+import time
+
+RESOURCES_DIR = "../Assets/Resources"
+TEXT_DATA_PATH = f"{RESOURCES_DIR}/TextData.csv"
+STAGE_DATA_PATH = f"{RESOURCES_DIR}/StageData.csv"
+SCRIPTS_DIR = "../Assets/Scripts"
+FONTS_DIR = "../Assets/Fonts"
+OUTPUT_DIR = f"{FONTS_DIR}/Subset"
+CHARACTERS_PATH = f"{OUTPUT_DIR}/characters.txt"
+
+# サブセットにするフォント（.ttc は font_number の書体）
+FONTS = [
+    {"path": f"{FONTS_DIR}/x12y16pxMaruMonica.ttf", "font_number": 0},
+    {"path": f"{FONTS_DIR}/meiryo.ttc", "font_number": 0},
+]
+
+# CSV 以外で表示する文字（書式の数字、HUD の記号など）
+EXTRA_CHARACTERS = (
+    "".join(chr(c) for c in range(0x20, 0x7F))   # ASCII
+    + "０１２３４５６７８９"
+    + "♥★☆×・…ー～：！？。、「」（）％"
+)
+
+CS_COMMENT = re.compile(r"//[^\n]*|/\*.*?\*/", re.S)
+CS_STRING = re.compile(r'"((?:[^"\\\n]|\\.)*)"')
+CS_ESCAPE = re.compile(r"\\.")
+# 画面に出ない文字列の行（ログ・インスペクタ用の属性）
+CS_IGNORED_LINE = re.compile(r"\bDebug\.|\[(?:Header|Tooltip)\(")
+
+
+# ============================================
+# 文字セット
+# ============================================
+def read_csv_rows(path):
+    """コメント行（#）を除いた CSV の行"""
+    with open(path, encoding="utf-8-sig") as f:
+        lines = [line for line in f if not line.lstrip().startswith("#")]
+    return list(csv.reader(io.StringIO("".join(lines))))
+
+
+def text_data_characters(path=TEXT_DATA_PATH):
+    """TextData.csv の text 列の文字（text にはカンマを含められる）"""
+    chars = set()
+    rows = read_csv_rows(path)
+    for row in rows[1:]:
+        if len(row) >= 4:
+            chars.update(",".join(row[3:]).strip())
+    return chars
+
+
+def stage_name_characters(path=STAGE_DATA_PATH):
+    """StageData.csv の stage_name 列の文字"""
+    rows = read_csv_rows(path)
+    column = rows[0].index("stage_name")
+    return {c for row in rows[1:] if len(row) > column for c in row[column].strip()}
+
+
+def script_characters(scripts_dir=SCRIPTS_DIR):
+    """C# スクリプトの文字列リテラルの文字（エスケープシーケンスは除く）"""
+    chars = set()
+    for root, _, files in os.walk(scripts_dir):
+        for name in files:
+            if not name.endswith(".cs"):
+                continue
+            with open(os.path.join(root, name), encoding="utf-8-sig") as f:
+                code = CS_COMMENT.sub("", f.read())
+            for line in code.splitlines():
+                if CS_IGNORED_LINE.search(line):
+                    continue
+                for literal in CS_STRING.findall(line):
+                    chars.update(CS_ESCAPE.sub("", literal))
+    return chars
+
+
+def collect_characters(extra=""):
+    """サブセットに残す文字（コードポイント順の文字列。改行などの制御文字は除く）"""
+    chars = set(EXTRA_CHARACTERS) | set(extra)
+    chars |= text_data_characters()
+    if os.path.exists(STAGE_DATA_PATH):
+        chars |= stage_name_characters()
+    chars |= script_characters()
+    return "".join(sorted(c for c in chars if c.isprintable()))
+
+
+# ============================================
+# サブセット
+# ============================================
+def subset_options():
+    options = subset.Options()
+    options.layout_features = ["*"]   # 縦書き・字形の置き換えなどは残す
+    options.name_IDs = ["*"]          # Unity の fontNames が書体名で参照する
+    options.notdef_outline = True     # 足りない字は豆腐として見えるように
+    options.recalc_bounds = True
+    return options
+
+
+@traced("subset_font")
+def subset_font(path, characters, font_number=0):
+    """
+    フォントを characters だけに絞った .ttf のバイト列と、見つからなかった文字を返す
+    埋め込みビットマップ（EBDT/EBLC）は TMP の SDF 生成で使わないので落とす
+    """
+    # head の更新日時を書き換えない（同じ文字セットなら同じバイト列になるように）
+    font = TTFont(path, fontNumber=font_number, lazy=False, recalcTimestamp=False)
+    cmap = font.getBestCmap() or {}
+    missing = [c for c in characters if ord(c) not in cmap and c != " "]
+
+    subsetter = subset.Subsetter(subset_options())
+    subsetter.populate(text=characters)
+    subsetter.subset(font)
+
+    buffer = io.BytesIO()
+    font.save(buffer)
+    return buffer.getvalue(), missing
+
+
+def output_font_path(path, output_dir=OUTPUT_DIR):
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(output_dir, stem + ".ttf")
+
+
+def subset_fonts(characters, fonts=FONTS, output_dir=OUTPUT_DIR, cache=None, dry_run=False):
+    """
+    全フォントのサブセットを作り、[(元のパス, 出力パス, 元のバイト数, 新しいバイト数, 見つからない文字), ...] を返す
+    元のフォントがないものは出力パスを None にする
+    """
+    results = []
+    for font in fonts:
+        path = font["path"]
+        if not os.path.exists(path):
+            results.append((path, None, 0, 0, []))
+            continue
+
+        output_path = output_font_path(path, output_dir)
+        params = {"characters": characters, "font_number": font["font_number"]}
+        key = cache.compute_key("subset_fonts", params=params, inputs=[path], code=[__file__]) if cache else None
+        if cache is not None and not dry_run and cache.is_up_to_date(output_path, key):
+            results.append((path, output_path, os.path.getsize(path), os.path.getsize(output_path), None))
+            continue
+
+        data, missing = subset_font(path, characters, font["font_number"])
+        if not dry_run:
+            write_if_changed(output_path, data)
+            if cache is not None:
+                cache.record(output_path, key, "subset_fonts",
+                             params={"characters": len(characters), "font_number": font["font_number"]},
+                             inputs=[path])
+        results.append((path, output_path, os.path.getsize(path), len(data), missing))
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="ゲームで表示する文字だけのフォントを作る")
+    parser.add_argument("--extra", default="", help="追加で残す文字")
+    parser.add_argument("--extra-file", action="append", default=[],
+                        help="追加で残す文字を書いたテキストファイル（複数可）")
+    parser.add_argument("--output-dir", default=OUTPUT_DIR, help="出力先")
+    parser.add_argument("--dry-run", action="store_true", help="書き込まずに文字数と削減量だけ表示する")
+    parser.add_argument("--force", action="store_true", help="ビルドキャッシュを無視して再生成")
+    args = parser.parse_args(argv)
+
+    # fontTools は落としたテーブルごとに警告を出すので抑える
+    logging.getLogger("fontTools.subset").setLevel(logging.ERROR)
+
+    extra = args.extra
+    for path in args.extra_file:
+        with open(path, encoding="utf-8") as f:
+            extra += f.read()
+
+    start = time.perf_counter()
+    characters = collect_characters(extra)
+    cache = BuildCache(force=args.force)
+    results = subset_fonts(characters, FONTS, args.output_dir, cache, args.dry_run)
+    if not args.dry_run:
+        characters_path = os.path.join(args.output_dir, os.path.basename(CHARACTERS_PATH))
+        write_if_changed(characters_path, (characters + "\n").encode("utf-8"))
+        cache.save()
+
+    print(f"文字セット: {len(characters)}字")
+    for path, output_path, before, after, missing in results:
+        if output_path is None:
+            print(f"  {os.path.relpath(path)}: 見つからないのでスキップ")
+            continue
+        status = "変更なし" if missing is None else f"{before:,} -> {after:,} バイト"
+        print(f"  {os.path.relpath(path)} -> {os.path.relpath(output_path)}: {status}"
+              f"（{after / before * 100:.1f}%）")
+        if missing:
+            print(f"    フォントにない文字 {len(missing)}字: {''.join(missing)}")
+    print(f"{time.perf_counter() - start:.2f}秒")
+    if args.dry_run:
+        print("--dry-run のため書き込んでいません")
+
+
+if __name__ == "__main__":
+    main()
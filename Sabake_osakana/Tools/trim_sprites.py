@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+"""
+大きなスプライトの透明な縁を切り落とすスクリプト
+sakana_normal.png / kirimi.png (1155x1155) や bone_image.png (1170x1251) は
+周囲が大きく透明で、モバイルのテクスチャメモリとアップロード時間を無駄にしている
+
+切り落とした位置は Assets/Resources/SpriteTrim.csv に記録し、画面上の配置は変えない:
+  BrickManager / FeverManager   元画像のサイズ（source_width/height）を基準にグリッド・スケールを計算
+  bake_brick_patterns.py        元画像のサイズに戻してからパターンを焼き込む
+  .meta (Single)                ピボットをカスタムにして元画像の同じ位置を指すようにする
+  .meta (Multiple)              サブスプライトの矩形をずらす（矩形からはみ出す切り方はしない）
+
+SpriteTrim.csv の offset_x / offset_y は元画像の左下からの位置（Texture2D と同じ座標）
+
+トリミング前後で、各ステージのブロック配置（魚の画像をグリッドで分割した結果）と
+骨のスプライト矩形が元画像の座標で一致するかを確認し、ずれる場合は警告して書き込まない
+
+使い方:
+  python trim_sprites.py                      # 既定のスプライトをトリミング
+  python trim_sprites.py --dry-run            # 削減量と確認結果を表示するだけ
+  python trim_sprites.py ../Assets/Resources/Sprites/fish1.png --padding 2
+"""
+
+from PIL import Image
+from build_cache import save_png, write_if_changed
+from pack_sprite_atlas import alpha_bbox
+import numpy as np
+import argparse
+import csv
+import io
+import os
+import re
+
+RESOURCES_DIR = "../Assets/Resources"
+SPRITES_DIR = f"{RESOURCES_DIR}/Sprites"
+TRIM_DATA_PATH = f"{RESOURCES_DIR}/SpriteTrim.csv"
+
+DEFAULT_SPRITES = [
+    f"{SPRITES_DIR}/sakana_normal.png",
+    f"{SPRITES_DIR}/kirimi.png",
+    f"{SPRITES_DIR}/bone_image.png",
+]
+
+# BrickManager が魚のブロックの背景として骨を重ねるスプライト
+BONE_SPRITE = "Sprites/bone_image"
+
+TRIM_COLUMNS = ["sprite", "source_width", "source_height",
+                "offset_x", "offset_y", "width", "height"]
+
+# 切り口のまわりに残す透明ピクセル（バイリニア補間で縁がにじまないように）
+DEFAULT_PADDING = 1
+
+# TextureImporter の alignment（0=Center ... 8=BottomRight, 9=Custom）→ 正規化ピボット
+ALIGNMENT_PIVOTS = {
+    0: (0.5, 0.5), 1: (0.0, 1.0), 2: (0.5, 1.0), 3: (1.0, 1.0), 4: (0.0, 0.5),
+    5: (1.0, 0.5), 6: (0.0, 0.0), 7: (0.5, 0.0), 8: (1.0, 0.0),
+}
+ALIGNMENT_CUSTOM = 9
+
+
+# ============================================
+# SpriteTrim.csv
+# ============================================
+def load_trim_data(path=TRIM_DATA_PATH):
+    """SpriteTrim.csv を {Resources 相対パス: 情報} で返す（ファイルがなければ空）"""
+    entries = {}
+    if not os.path.exists(path):
+        return entries
+    with open(path, encoding="utf-8") as f:
+        for row in csv.reader(f):
+            if not row or row[0].startswith("#") or row[0] == "sprite":
+                continue
+            entries[row[0]] = dict(zip(TRIM_COLUMNS[1:], (int(v) for v in row[1:7])))
+    return entries
+
+
+def save_trim_data(entries, path=TRIM_DATA_PATH):
+    """SpriteTrim.csv を書き出す（内容が同じなら書き込まない）"""
+    buffer = io.StringIO()
+    buffer.write("# offset_x, offset_y は元画像の左下からの位置（Texture2D と同じ座標）\n")
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(TRIM_COLUMNS)
+    for sprite in sorted(entries):
+        writer.writerow([sprite] + [entries[sprite][k] for k in TRIM_COLUMNS[1:]])
+    return write_if_changed(path, buffer.getvalue().encode("utf-8"))
+
+
+def resource_key(path, resources_dir=RESOURCES_DIR):
+    """画像パス → Resources 相対パス（拡張子なし）。Resources 外なら None"""
+    rel = os.path.relpath(os.path.abspath(path), os.path.abspath(resources_dir))
+    if rel.startswith(".."):
+        return None
+    return os.path.splitext(rel)[0].replace(os.sep, "/")
+
+
+def identity_entry(size):
+    return {"source_width": size[0], "source_height": size[1],
+            "offset_x": 0, "offset_y": 0, "width": size[0], "height": size[1]}
+
+
+def current_entry(size, entry):
+    """
+    今のファイルに対応するトリミング情報
+    元画像のサイズのまま（生成し直した直後など）ならトリミングなしとみなす
+    """
+    if entry is None:
+        return identity_entry(size)
+    if size == (entry["width"], entry["height"]):
+        return entry
+    if size == (entry["source_width"], entry["source_height"]):
+        return identity_entry(size)
+    raise ValueError(f"サイズ {size[0]}x{size[1]} が SpriteTrim.csv の記録と合いません")
+
+
+def untrim_alpha(alpha, entry):
+    """
+    トリミング済みのアルファ（左下原点 [y, x]）を元画像のサイズに戻す
+    切り落とした部分は透明（0）
+    """
+    if entry is None or alpha.shape == (entry["source_height"], entry["source_width"]):
+        return alpha
+    full = np.zeros((entry["source_height"], entry["source_width"]), dtype=alpha.dtype)
+    x, y = entry["offset_x"], entry["offset_y"]
+    full[y:y + alpha.shape[0], x:x + alpha.shape[1]] = alpha
+    return full
+
+
+# ============================================
+# .meta（TextureImporter）
+# ============================================
+META_SPRITE_MODE = re.compile(r"^  spriteMode: (\d+)$", re.M)
+META_ALIGNMENT = re.compile(r"^  alignment: (\d+)$", re.M)
+META_PIVOT = re.compile(r"^  spritePivot: \{x: ([-\d.e]+), y: ([-\d.e]+)\}$", re.M)
+META_RECT = re.compile(r"(      rect:\n        serializedVersion: 2\n"
+                       r"        x: )([-\d.]+)(\n        y: )([-\d.]+)"
+                       r"(\n        width: )([-\d.]+)(\n        height: )([-\d.]+)")
+
+
+def read_meta(image_path):
+    meta_path = image_path + ".meta"
+    if not os.path.exists(meta_path):
+        return None
+    with open(meta_path, encoding="utf-8") as f:
+        return f.read()
+
+
+def sprite_rects(meta):
+    """Multiple モードのサブスプライト矩形 [(x, y, width, height), ...]（左下原点）"""
+    mode = META_SPRITE_MODE.search(meta or "")
+    if not mode or mode.group(1) != "2":
+        return []
+    return [tuple(float(m.group(i)) for i in (2, 4, 6, 8)) for m in META_RECT.finditer(meta)]
+
+
+def sprite_pivot(meta):
+    """Single モードのピボット（正規化）。Single でなければ None"""
+    mode = META_SPRITE_MODE.search(meta or "")
+    if not mode or mode.group(1) != "1":
+        return None
+    alignment = int(META_ALIGNMENT.search(meta).group(1))
+    if alignment in ALIGNMENT_PIVOTS:
+        return ALIGNMENT_PIVOTS[alignment]
+    pivot = META_PIVOT.search(meta)
+    return float(pivot.group(1)), float(pivot.group(2))
+
+
+def format_number(value):
+    return str(int(value)) if float(value).is_integer() else f"{value:.6g}"
+
+
+def update_meta(meta, old, new):
+    """
+    トリミング位置が old → new に変わったときの .meta を返す
+    ピボット・サブスプライトが元画像の同じ位置を指すようにずらす
+    """
+    dx = old["offset_x"] - new["offset_x"]
+    dy = old["offset_y"] - new["offset_y"]
+
+    pivot = sprite_pivot(meta)
+    if pivot is not None:
+        # 元画像でのピボット位置（ピクセル）→ 新しい画像での正規化座標
+        px = pivot[0] * old["width"] + dx
+        py = pivot[1] * old["height"] + dy
+        new_pivot = (round(px / new["width"], 6), round(py / new["height"], 6))
+        if new_pivot != (0.5, 0.5):
+            meta = META_ALIGNMENT.sub(f"  alignment: {ALIGNMENT_CUSTOM}", meta, count=1)
+        else:
+            meta = META_ALIGNMENT.sub("  alignment: 0", meta, count=1)
+        meta = META_PIVOT.sub(f"  spritePivot: {{x: {format_number(new_pivot[0])}, "
+                              f"y: {format_number(new_pivot[1])}}}", meta, count=1)
+
+    def shift(m):
+        x = float(m.group(2)) + dx
+        y = float(m.group(4)) + dy
+        return (m.group(1) + format_number(x) + m.group(3) + format_number(y)
+                + m.group(5) + m.group(6) + m.group(7) + m.group(8))
+
+    return META_RECT.sub(shift, meta)
+
+
+# ============================================
+# トリミング
+# ============================================
+def trim_box(alpha, current, rects, padding, threshold):
+    """
+    元画像の座標（左下原点）での切り出し範囲 (x0, y0, x1, y1) を返す
+    不透明部分とサブスプライトの矩形（元画像の座標）をすべて含み、padding だけ余白を足す
+    """
+    boxes = []
+    # alpha は左下原点なので alpha_bbox の (left, top, right, bottom) がそのまま (x0, y0, x1, y1)
+    bbox = alpha_bbox(alpha, threshold)
+    if bbox is not None:
+        ox, oy = current["offset_x"], current["offset_y"]
+        boxes.append((bbox[0] + ox, bbox[1] + oy, bbox[2] + ox, bbox[3] + oy))
+    for x, y, w, h in rects:
+        boxes.append((int(np.floor(x)), int(np.floor(y)), int(np.ceil(x + w)), int(np.ceil(y + h))))
+    if not boxes:
+        # 全面透明なら1x1を残す
+        boxes.append((0, 0, 1, 1))
+
+    x0 = max(0, min(b[0] for b in boxes) - padding)
+    y0 = max(0, min(b[1] for b in boxes) - padding)
+    x1 = min(current["source_width"], max(b[2] for b in boxes) + padding)
+    y1 = min(current["source_height"], max(b[3] for b in boxes) + padding)
+    return x0, y0, x1, y1
+
+
+def source_rects(meta, entry):
+    """サブスプライトの矩形を元画像の座標に直す"""
+    return [(x + entry["offset_x"], y + entry["offset_y"], w, h) for x, y, w, h in sprite_rects(meta)]
+
+
+def plan_trim(path, trim_data, padding=DEFAULT_PADDING, threshold=0, image=None):
+    """
+    1枚分のトリミング内容を計算する（ファイルには書かない）
+    image を渡すと path を読む代わりにその画像を切り落とす（まだ書き出していない画像を1回で保存するとき）
+    返り値: sprite, image（切り出し後）, old/new（トリミング情報）, meta（更新後の .meta）, alpha（前後）
+    """
+    sprite = resource_key(path)
+    if image is None:
+        image = Image.open(path)
+    if image.mode != "RGBA":
+        image = image.convert("RGBA")
+    recorded = trim_data.get(sprite)
+    current = current_entry(image.size, recorded)
+    # .meta は記録済みのトリミングに合わせてある（画像だけ生成し直した場合も）
+    meta_entry = recorded or current
+    meta = read_meta(path) or ""
+
+    alpha = np.asarray(image)[::-1, :, 3]
+    rects = source_rects(meta, meta_entry)
+    x0, y0, x1, y1 = trim_box(alpha, current, rects, padding, threshold)
+    new = dict(current, offset_x=x0, offset_y=y0, width=x1 - x0, height=y1 - y0)
+
+    # 今の画像の座標（PIL は左上原点）で切り出す。はみ出た部分は透明で埋まる
+    left = x0 - current["offset_x"]
+    bottom = y0 - current["offset_y"]
+    top = image.size[1] - (bottom + new["height"])
+    cropped = image.crop((left, top, left + new["width"], top + new["height"]))
+    if threshold > 0:
+        # 閾値以下のピクセルは透明にする（切り落とす部分との境目をそろえる）
+        pixels = np.array(cropped)
+        pixels[pixels[..., 3] <= threshold] = 0
+        cropped = Image.fromarray(pixels, "RGBA")
+
+    new_meta = update_meta(meta, meta_entry, new) if meta else None
+    return {
+        "path": path, "sprite": sprite, "image": cropped, "old": current, "new": new,
+        "meta": new_meta,
+        "alpha_before": untrim_alpha(alpha, current),
+        "alpha_after": untrim_alpha(np.asarray(cropped)[::-1, :, 3], new),
+        "rects_before": rects,
+        "rects_after": source_rects(new_meta, new),
+    }
+
+
+def check_alignment(plans, stages):
+    """
+    BrickManager が前提にしている魚と骨の位置関係が変わらないか確認し、警告のリストを返す
+      魚  ステージごとのブロック配置（元画像をグリッドで分割してサンプリングした結果）
+      骨  サブスプライトの矩形（元画像の座標）
+    """
+    from bake_brick_patterns import bake_pattern
+
+    warnings = {}
+    for plan in plans:
+        messages = []
+        sprite = plan["sprite"]
+        before = plan["alpha_before"].astype(np.float32) / np.float32(255)
+        after = plan["alpha_after"].astype(np.float32) / np.float32(255)
+        for stage in stages:
+            if stage["fish_image"] != sprite:
+                continue
+            old_pattern = bake_pattern(before, stage["grid_cols"], stage["grid_rows"])
+            new_pattern = bake_pattern(after, stage["grid_cols"], stage["grid_rows"])
+            changed = int((old_pattern != new_pattern).sum())
+            if changed:
+                messages.append(f"ステージ{stage['stage_id']}のブロック配置が{changed}セル変わり、"
+                                f"骨の背景とずれます")
+        if plan["rects_before"] != plan["rects_after"]:
+            label = "骨の背景" if sprite == BONE_SPRITE else "サブスプライト"
+            messages.append(f"{label}の矩形が元画像の座標でずれます")
+        dropped = int(((plan["alpha_before"] > 0) & (plan["alpha_after"] == 0)).sum())
+        if dropped:
+            messages.append(f"半透明ピクセルが{dropped}個消えます")
+        if messages:
+            warnings[plan["path"]] = messages
+    return warnings
+
+
+def apply_trim(plan, trim_data):
+    """トリミング結果を PNG・.meta・trim_data に反映する（書き込んだら True）"""
+    changed = save_png(plan["image"], plan["path"])
+    if plan["meta"] is not None:
+        changed |= write_if_changed(plan["path"] + ".meta", plan["meta"].encode("utf-8"))
+
+    new = plan["new"]
+    if (new["width"], new["height"]) == (new["source_width"], new["source_height"]):
+        trim_data.pop(plan["sprite"], None)
+    else:
+        trim_data[plan["sprite"]] = new
+    return changed
+
+
+def trim_sprites(paths, padding=DEFAULT_PADDING, threshold=0, dry_run=False, force=False,
+                 trim_data_path=TRIM_DATA_PATH, stage_data_path=None, images=None):
+    """
+    スプライトをまとめてトリミングし、(計画のリスト, 警告) を返す
+    警告が出たスプライトは force=True でなければ書き込まない
+    images（パス → 画像）に渡した画像はファイルの代わりに切り落として、そのパスに書き出す
+    """
+    from bake_brick_patterns import STAGE_DATA_PATH, load_stage_data
+
+    stage_data_path = stage_data_path or STAGE_DATA_PATH
+    stages = load_stage_data(stage_data_path) if os.path.exists(stage_data_path) else []
+    trim_data = load_trim_data(trim_data_path)
+
+    plans = []
+    for path in paths:
+        if resource_key(path) is None:
+            print(f"Warning: {path} は Resources の外にあるため読み込み側で補正できません（スキップ）")
+            continue
+        plans.append(plan_trim(path, trim_data, padding, threshold, (images or {}).get(path)))
+    warnings = check_alignment(plans, stages)
+
+    for plan in plans:
+        if dry_run or (plan["path"] in warnings and not force):
+            continue
+        apply_trim(plan, trim_data)
+    if not dry_run:
+        save_trim_data(trim_data, trim_data_path)
+    return plans, warnings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="スプライトの透明な縁を切り落とす")
+    parser.add_argument("images", nargs="*", default=DEFAULT_SPRITES, help="トリミングする画像")
+    parser.add_argument("--padding", type=int, default=DEFAULT_PADDING,
+                        help="切り口のまわりに残す透明ピクセル数")
+    parser.add_argument("--threshold", type=int, default=0,
+                        help="このアルファ以下を透明とみなす（0 なら見た目は変わらない）")
+    parser.add_argument("--dry-run", action="store_true", help="書き込まずに結果だけ表示する")
+    parser.add_argument("--force", action="store_true", help="位置ずれの警告が出ても書き込む")
+    args = parser.parse_args()
+
+    plans, warnings = trim_sprites(args.images, args.padding, args.threshold,
+                                   args.dry_run, args.force)
+
+    total_before = total_after = 0
+    for plan in plans:
+        old, new = plan["old"], plan["new"]
+        before = old["width"] * old["height"] * 4
+        after = new["width"] * new["height"] * 4
+        total_before += before
+        total_after += after
+        print(f"  {plan['sprite']}: {old['width']}x{old['height']} -> {new['width']}x{new['height']} "
+              f"（元 {new['source_width']}x{new['source_height']}、"
+              f"offset ({new['offset_x']}, {new['offset_y']})、RGBA32 {before / 1024:.0f}KB -> "
+              f"{after / 1024:.0f}KB）")
+        for message in warnings.get(plan["path"], []):
+            print(f"    Warning: {message}" + ("" if args.force or args.dry_run else "（書き込みません）"))
+
+    if total_before:
+        print(f"テクスチャメモリ（RGBA32）: {total_before / 1024:.0f}KB -> {total_after / 1024:.0f}KB "
+              f"（{(1 - total_after / total_before) * 100:.0f}%削減）")
+    if args.dry_run:
+        print("--dry-run のため書き込んでいません")
+
+
+if __name__ == "__main__":
+    main()
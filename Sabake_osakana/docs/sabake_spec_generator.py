@@ -5,22 +5,59 @@ Sabake_osakana 仕様書Excel生成スクリプト
 
 使い方:
   python sabake_spec_generator.py
+  python sabake_spec_generator.py --streaming    # write-only で1行ずつ書き出す（大量の行向け）
+  python sabake_spec_generator.py -j 8           # サムネイル生成のプロセス数
+  python sabake_spec_generator.py --incremental  # 入力が変わったシートだけ作り直して既存の仕様書に差し込む
 
-出力先:
-  G:/マイドライブ/t0kag3/AIJiyukenkyu/Game/Unity/Sabake_osakana/docs/specification.xlsx
+docs/specification_update_*.txt（仕様書追記内容）は自動で読み込み、08_更新履歴 シートに載せる。
+
+出力先（--output で変更可）:
+  docs/specification.xlsx
+ローカル専用の素材フォルダ（ForlocalAsset）は環境変数 SABAKE_ASSET_BASE で指定する
+（既定はプロジェクト直下の ForlocalAsset）。
 """
 
-from openpyxl import Workbook
-from openpyxl.styles import Font, Alignment, Border, Side, PatternFill
+from openpyxl import Workbook, load_workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, Alignment, Border, Side, PatternFill, NamedStyle
 from openpyxl.utils import get_column_letter
 from openpyxl.drawing.image import Image as XLImage
+from PIL import Image
+from concurrent.futures import ProcessPoolExecutor
+from unity_asset_index import scan_assets
+import argparse
+import csv
+import glob
+import hashlib
+import inspect
 import os
+import re
+import sys
+
+# 処理段階ごとの計測（Tools/build_trace.py。SABAKE_TRACE を設定したときだけ記録する）
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Tools"))
+from build_trace import span
 
 # ============================================
 # 設定
 # ============================================
-OUTPUT_PATH = "/mnt/c/temp/specification.xlsx"
-ASSET_BASE = "G:/マイドライブ/t0kag3/AIJiyukenkyu/Game/Unity/Sabake_osakana/ForlocalAsset"
+DOCS_DIR = os.path.dirname(os.path.abspath(__file__))
+OUTPUT_PATH = os.path.join(DOCS_DIR, "specification.xlsx")
+ASSET_BASE = os.environ.get("SABAKE_ASSET_BASE", os.path.join(DOCS_DIR, "..", "ForlocalAsset"))
+# Sprites に sakana_normal.png がないときに 04_画像アセット に載せる魚の絵
+FALLBACK_FISH_PATH = os.path.join(ASSET_BASE, "sakana", "sakana_normal.png")
+RESOURCES_DIR = os.path.join(DOCS_DIR, "..", "Assets", "Resources")
+UPDATE_NOTES_PATTERN = os.path.join(DOCS_DIR, "specification_update_*.txt")
+
+# 差分生成: シートごとの入力ハッシュを保存する非表示シート
+HASH_SHEET = "_sources"
+SPRITES_DIR = os.path.join(RESOURCES_DIR, "Sprites")
+
+# サムネイル（元画像をそのまま埋め込むとxlsxが肥大化するため、縮小版を埋め込む）
+THUMBNAIL_CACHE_DIR = os.path.join(DOCS_DIR, ".thumbnail_cache")
+THUMBNAIL_SIZE = (120, 100)  # プレビュー列（幅25・行の高さ80）に収まる大きさ
+THUMBNAIL_VERSION = 1        # 縮小方法を変えたら上げる（キャッシュを作り直す）
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg")
 
 # スタイル定義
 HEADER_FILL = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
@@ -35,40 +72,113 @@ THIN_BORDER = Border(
     bottom=Side(style='thin')
 )
 
-def apply_header_style(cell):
-    cell.fill = HEADER_FILL
-    cell.font = HEADER_FONT
-    cell.alignment = Alignment(horizontal='center', vertical='center')
-    cell.border = THIN_BORDER
+# 状態列の色分け
+STATUS_COLORS = {
+    "既存": "C6EFCE",
+    "要作成": "FFEB9C",
+    "未作成": "FFC7CE",
+}
+
+# 名前付きスタイル（ブックに1回だけ登録し、セルからは名前で参照する）
+STYLE_HEADER = "spec_header"
+STYLE_SECTION = "spec_section"
+STYLE_NORMAL = "spec_normal"
+STYLE_CENTER = "spec_center"
+
+
+def create_named_styles():
+    """仕様書で使う名前付きスタイルの一覧"""
+    styles = [
+        NamedStyle(name=STYLE_HEADER, font=HEADER_FONT, fill=HEADER_FILL, border=THIN_BORDER,
+                   alignment=Alignment(horizontal='center', vertical='center')),
+        NamedStyle(name=STYLE_SECTION, font=SECTION_FONT, fill=SECTION_FILL, border=THIN_BORDER),
+    ]
+    bases = {
+        STYLE_NORMAL: Alignment(vertical='center', wrap_text=True),
+        STYLE_CENTER: Alignment(horizontal='center', vertical='center'),
+    }
+    for name, alignment in bases.items():
+        styles.append(NamedStyle(name=name, font=NORMAL_FONT, border=THIN_BORDER, alignment=alignment))
+        for status, color in STATUS_COLORS.items():
+            styles.append(NamedStyle(
+                name=f"{name}_{status}", font=NORMAL_FONT, border=THIN_BORDER, alignment=alignment,
+                fill=PatternFill(start_color=color, end_color=color, fill_type="solid")))
+    return styles
+
+
+def status_style(value, base=STYLE_NORMAL):
+    """状態列の値に対応するスタイル名"""
+    return f"{base}_{value}" if value in STATUS_COLORS else base
+
+
+def new_workbook(streaming=False):
+    """
+    名前付きスタイルを登録した空のブックを作る
+    streaming=True なら write_only（セルを保持せず1行ずつ書き出す）
+    """
+    wb = Workbook(write_only=streaming)
+    if not streaming:
+        wb.remove(wb.active)
+    register_named_styles(wb)
+    return wb
+
+
+def register_named_styles(wb):
+    """まだ登録されていない名前付きスタイルを登録する（既存の仕様書に差し込むとき用）"""
+    registered = {style if isinstance(style, str) else style.name for style in wb.named_styles}
+    for style in create_named_styles():
+        if style.name not in registered:
+            wb.add_named_style(style)
+
+
+class SheetWriter:
+    """
+    1シート分の書き出し
+    通常モードはセルに、ストリーミングモードは WriteOnlyCell の行としてそのまま書き出す。
+    ストリーミングモードでは書いた行を後から変更できないので、行は上から順に1回だけ渡す。
+    """
+
+    def __init__(self, wb, title, widths):
+        self.ws = wb.create_sheet(title)
+        self.streaming = wb.write_only
+        self.row = 0
+        for i, width in enumerate(widths, 1):
+            self.ws.column_dimensions[get_column_letter(i)].width = width
+
+    def append(self, values, styles, height=None):
+        """1行書き出す（styles は列ごとのスタイル名）"""
+        self.row += 1
+        if height:
+            self.ws.row_dimensions[self.row].height = height
+
+        if self.streaming:
+            cells = []
+            for value, style in zip(values, styles):
+                cell = WriteOnlyCell(self.ws, value=value)
+                cell.style = style
+                cells.append(cell)
+            self.ws.append(cells)
+        else:
+            for col, (value, style) in enumerate(zip(values, styles), 1):
+                self.ws.cell(row=self.row, column=col, value=value).style = style
+        return self.row
 
-def apply_section_style(cell):
-    cell.fill = SECTION_FILL
-    cell.font = SECTION_FONT
-    cell.border = THIN_BORDER
+    def header(self, headers):
+        self.append(headers, [STYLE_HEADER] * len(headers))
 
-def apply_normal_style(cell):
-    cell.font = NORMAL_FONT
-    cell.border = THIN_BORDER
-    cell.alignment = Alignment(vertical='center', wrap_text=True)
+    def add_image(self, image, anchor):
+        self.ws.add_image(image, anchor)
 
-def set_column_widths(ws, widths):
-    for i, width in enumerate(widths, 1):
-        ws.column_dimensions[get_column_letter(i)].width = width
 
 # ============================================
 # シート1: 全体概要
 # ============================================
 def create_overview_sheet(wb):
-    ws = wb.active
-    ws.title = "01_全体概要"
+    sheet = SheetWriter(wb, "01_全体概要", [15, 25, 40, 40])
 
     # ヘッダー
     headers = ["セクション", "項目", "値", "備考"]
-    set_column_widths(ws, [15, 25, 40, 40])
-
-    for col, header in enumerate(headers, 1):
-        cell = ws.cell(row=1, column=col, value=header)
-        apply_header_style(cell)
+    sheet.header(headers)
 
     # データ定義（編集しやすい形式）
     data = [
@@ -105,81 +215,98 @@ def create_overview_sheet(wb):
         ("", "残機", "3", "初期値"),
     ]
 
-    for row_idx, row_data in enumerate(data, 2):
-        for col_idx, value in enumerate(row_data, 1):
-            cell = ws.cell(row=row_idx, column=col_idx, value=value)
-            if row_data[0] and col_idx == 1:  # セクション名
-                apply_section_style(cell)
-            else:
-                apply_normal_style(cell)
+    for row_data in data:
+        # セクション名
+        first = STYLE_SECTION if row_data[0] else STYLE_NORMAL
+        sheet.append(row_data, [first] + [STYLE_NORMAL] * (len(row_data) - 1))
 
-    return ws
+    return sheet.ws
 
 # ============================================
 # シート2: ファイル依存関係
 # ============================================
-def create_dependencies_sheet(wb):
-    ws = wb.create_sheet("02_ファイル依存関係")
+# 予定していたファイルと説明（種別, パス, 備考）。見つからないものは 未作成 として載せる
+PLANNED_FILES = [
+    ("Script", "Assets/Scripts/GameManager.cs", "ゲーム全体の管理"),
+    ("Script", "Assets/Scripts/PaddleController.cs", "パドル操作"),
+    ("Script", "Assets/Scripts/BallController.cs", "ボール物理"),
+    ("Script", "Assets/Scripts/BrickController.cs", "ブロック破壊処理"),
+    ("Script", "Assets/Scripts/FishLayerManager.cs", "魚レイヤー表示管理"),
+    ("Script", "Assets/Scripts/UIManager.cs", "UI制御"),
+    ("Prefab", "Assets/Prefabs/Brick.prefab", "ブロックPrefab"),
+    ("Prefab", "Assets/Prefabs/Ball.prefab", "ボールPrefab"),
+    ("Prefab", "Assets/Prefabs/Paddle.prefab", "パドルPrefab"),
+    ("Scene", "Assets/Scenes/TitleScene.unity", "タイトル画面"),
+    ("Scene", "Assets/Scenes/GameScene.unity", "メインゲーム"),
+    ("Scene", "Assets/Scenes/ResultScene.unity", "リザルト画面"),
+]
+
+# シート上の区分（見出し, 種別, 拡張子）
+DEPENDENCY_SECTIONS = [
+    ("【スクリプト】", "Script", ".cs"),
+    ("【Prefab】", "Prefab", ".prefab"),
+    ("【シーン】", "Scene", ".unity"),
+]
+
+# 自作でないフォルダ（一覧には載せず、依存先としてだけ表示する）
+THIRD_PARTY_DIRS = ("Assets/TextMesh Pro/", "Assets/MobileDependencyResolver/", "Assets/_Recovery/")
+
+def dependency_rows(index):
+    """
+    GUID 索引から依存関係シートの行を作る
+    スクリプトの依存先はクラス名の参照、シーン・Prefab の依存先は GUID の参照
+    """
+    notes = {path: note for _, path, note in PLANNED_FILES}
+    rows = []
+    for title, kind, extension in DEPENDENCY_SECTIONS:
+        if rows:
+            rows.append(("", "", "", "", "", ""))
+        rows.append((title, "", "", "", "", ""))
+
+        found = [p for p in index.find("Assets", extension) if not p.startswith(THIRD_PARTY_DIRS)]
+        planned = [p for k, p, _ in PLANNED_FILES if k == kind and p not in found]
+        for path in sorted(found) + planned:
+            exists = path in found
+            deps = ", ".join(os.path.basename(p) for p in index.deps(path))
+            note = notes.get(path, "")
+            if kind == "Script":
+                scenes = [os.path.basename(p) for p in index.rdeps(path)
+                          if p.endswith(".unity") and not p.startswith(THIRD_PARTY_DIRS)]
+                if scenes:
+                    note = "、".join(filter(None, [note, "使用シーン: " + ", ".join(scenes)]))
+            rows.append((os.path.basename(path), kind, os.path.dirname(path), deps,
+                         "既存" if exists else "未作成", note))
+    return rows
+
+def create_dependencies_sheet(wb, index=None):
+    sheet = SheetWriter(wb, "02_ファイル依存関係", [30, 12, 15, 35, 10, 40])
 
     headers = ["ファイル名", "種別", "場所", "依存先", "状態", "備考"]
-    set_column_widths(ws, [30, 12, 15, 35, 10, 40])
-
-    for col, header in enumerate(headers, 1):
-        cell = ws.cell(row=1, column=col, value=header)
-        apply_header_style(cell)
+    sheet.header(headers)
 
     # ファイル依存関係データ（スクリプト/Prefab/シーンのみ、アセットは別シート）
-    files = [
-        # ファイル名, 種別, 場所, 依存先, 状態, 備考
-        ("【スクリプト】", "", "", "", "", ""),
-        ("GameManager.cs", "Script", "Assets/Scripts", "", "未作成", "ゲーム全体の管理"),
-        ("PaddleController.cs", "Script", "Assets/Scripts", "GameManager.cs", "未作成", "パドル操作"),
-        ("BallController.cs", "Script", "Assets/Scripts", "GameManager.cs", "未作成", "ボール物理"),
-        ("BrickController.cs", "Script", "Assets/Scripts", "GameManager.cs", "未作成", "ブロック破壊処理"),
-        ("FishLayerManager.cs", "Script", "Assets/Scripts", "BrickController.cs", "未作成", "魚レイヤー表示管理"),
-        ("UIManager.cs", "Script", "Assets/Scripts", "GameManager.cs", "未作成", "UI制御"),
-        ("", "", "", "", "", ""),
-        ("【Prefab】", "", "", "", "", ""),
-        ("Brick.prefab", "Prefab", "Assets/Prefabs", "BrickController.cs", "未作成", "ブロックPrefab"),
-        ("Ball.prefab", "Prefab", "Assets/Prefabs", "BallController.cs", "未作成", "ボールPrefab"),
-        ("Paddle.prefab", "Prefab", "Assets/Prefabs", "PaddleController.cs", "未作成", "パドルPrefab"),
-        ("", "", "", "", "", ""),
-        ("【シーン】", "", "", "", "", ""),
-        ("TitleScene.unity", "Scene", "Assets/Scenes", "", "未作成", "タイトル画面"),
-        ("GameScene.unity", "Scene", "Assets/Scenes", "全Prefab", "未作成", "メインゲーム"),
-        ("ResultScene.unity", "Scene", "Assets/Scenes", "", "未作成", "リザルト画面"),
-    ]
+    if index is None:
+        index = scan_assets()
+    files = dependency_rows(index)
 
-    for row_idx, row_data in enumerate(files, 2):
-        for col_idx, value in enumerate(row_data, 1):
-            cell = ws.cell(row=row_idx, column=col_idx, value=value)
-            if row_data[0].startswith("【"):  # セクション見出し
-                apply_section_style(cell)
-            else:
-                apply_normal_style(cell)
-                # 状態に応じて色分け
-                if col_idx == 5:  # 状態列
-                    if value == "既存":
-                        cell.fill = PatternFill(start_color="C6EFCE", end_color="C6EFCE", fill_type="solid")
-                    elif value == "要作成":
-                        cell.fill = PatternFill(start_color="FFEB9C", end_color="FFEB9C", fill_type="solid")
-                    elif value == "未作成":
-                        cell.fill = PatternFill(start_color="FFC7CE", end_color="FFC7CE", fill_type="solid")
-
-    return ws
+    for row_data in files:
+        if row_data[0].startswith("【"):  # セクション見出し
+            styles = [STYLE_SECTION] * len(row_data)
+        else:
+            styles = [STYLE_NORMAL] * len(row_data)
+            styles[4] = status_style(row_data[4])  # 状態列は色分け
+        sheet.append(row_data, styles)
+
+    return sheet.ws
 
 # ============================================
 # シート3: 画面遷移
 # ============================================
 def create_screen_flow_sheet(wb):
-    ws = wb.create_sheet("03_画面遷移")
+    sheet = SheetWriter(wb, "03_画面遷移", [18, 15, 40, 30, 18, 35])
 
     headers = ["シーン", "状態", "表示要素", "操作", "遷移先", "備考"]
-    set_column_widths(ws, [18, 15, 40, 30, 18, 35])
-
-    for col, header in enumerate(headers, 1):
-        cell = ws.cell(row=1, column=col, value=header)
-        apply_header_style(cell)
+    sheet.header(headers)
 
     # 画面遷移データ
     flows = [
@@ -196,28 +323,94 @@ def create_screen_flow_sheet(wb):
         ("ResultScene", "（将来）", "ハイスコア表示など", "", "", "将来実装"),
     ]
 
-    for row_idx, row_data in enumerate(flows, 2):
-        for col_idx, value in enumerate(row_data, 1):
-            cell = ws.cell(row=row_idx, column=col_idx, value=value)
-            if row_data[0] and col_idx == 1:  # シーン名
-                apply_section_style(cell)
-            else:
-                apply_normal_style(cell)
+    for row_data in flows:
+        # シーン名
+        first = STYLE_SECTION if row_data[0] else STYLE_NORMAL
+        sheet.append(row_data, [first] + [STYLE_NORMAL] * (len(row_data) - 1))
+
+    return sheet.ws
 
-    return ws
+# ============================================
+# サムネイル生成（内容ハッシュでキャッシュ、プロセスプールで並列）
+# ============================================
+def collect_sprite_images(sprites_dir=SPRITES_DIR):
+    """Sprites フォルダ以下の画像（サブフォルダ含む）を名前順で返す"""
+    paths = []
+    for root, dirs, files in os.walk(sprites_dir):
+        dirs.sort()
+        for name in sorted(files):
+            if name.lower().endswith(IMAGE_EXTENSIONS):
+                paths.append(os.path.join(root, name))
+    return paths
+
+def thumbnail_cache_path(image_path):
+    """元画像の内容ハッシュから決まるサムネイルのキャッシュパス"""
+    digest = hashlib.sha256()
+    with open(image_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    width, height = THUMBNAIL_SIZE
+    name = f"{digest.hexdigest()[:32]}_{width}x{height}_v{THUMBNAIL_VERSION}.png"
+    return os.path.join(THUMBNAIL_CACHE_DIR, name)
+
+def render_thumbnail(job):
+    """プロセスプール用: 1枚縮小してキャッシュに保存"""
+    image_path, cache_path = job
+    with span("thumbnail", path=image_path), Image.open(image_path) as img:
+        with span("decode"):
+            img = img.convert("RGBA")
+        with span("resize_lanczos", size=list(img.size)):
+            img.thumbnail(THUMBNAIL_SIZE, Image.LANCZOS)
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with span("thumbnail_save"):
+            img.save(tmp_path, "PNG", optimize=True)
+    os.replace(tmp_path, cache_path)
+    return cache_path
+
+def build_thumbnails(image_paths, workers=None):
+    """
+    画像ごとのサムネイルを用意する
+    キャッシュにない（内容が変わった）画像だけをプロセスプールで縮小する
+
+    Returns:
+        {画像パス: {"thumbnail": サムネイルのパス, "size": (元の幅, 元の高さ)}}
+    """
+    os.makedirs(THUMBNAIL_CACHE_DIR, exist_ok=True)
+    result = {}
+    jobs = []
+    for image_path in image_paths:
+        cache_path = thumbnail_cache_path(image_path)
+        with Image.open(image_path) as img:  # ヘッダーだけ読む
+            size = img.size
+        result[image_path] = {"thumbnail": cache_path, "size": size}
+        if not os.path.exists(cache_path):
+            jobs.append((image_path, cache_path))
+
+    workers = min(workers or os.cpu_count() or 1, max(1, len(jobs)))
+    if workers == 1:
+        for job in jobs:
+            render_thumbnail(job)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(render_thumbnail, jobs))
+    print(f"サムネイル: {len(image_paths)}枚（新規 {len(jobs)}枚、キャッシュ {len(image_paths) - len(jobs)}枚）")
+    return result
+
+def thumbnail_image(thumbnail):
+    """埋め込み用の XLImage（サムネイルの実寸で表示）"""
+    img = XLImage(thumbnail["thumbnail"])
+    with Image.open(thumbnail["thumbnail"]) as pil_img:
+        img.width, img.height = pil_img.size
+    return img
 
 # ============================================
 # シート4: 画像アセット
 # ============================================
-def create_image_assets_sheet(wb):
-    ws = wb.create_sheet("04_画像アセット")
+def create_image_assets_sheet(wb, workers=None):
+    sheet = SheetWriter(wb, "04_画像アセット", [25, 25, 12, 25, 20, 10, 30])
 
     headers = ["ファイル名", "プレビュー", "サイズ", "用途", "使用箇所", "状態", "備考"]
-    set_column_widths(ws, [25, 25, 12, 25, 20, 10, 30])
-
-    for col, header in enumerate(headers, 1):
-        cell = ws.cell(row=1, column=col, value=header)
-        apply_header_style(cell)
+    sheet.header(headers)
 
     # 画像アセットデータ
     images = [
@@ -241,59 +434,59 @@ def create_image_assets_sheet(wb):
         ("bg_game.png", "", "─", "ゲーム背景", "GameScene", "未作成", ""),
     ]
 
-    row_height = 80  # 画像用に行を高く
-    for row_idx, row_data in enumerate(images, 2):
-        if row_data[0].startswith("【") or row_data[0] == "":
-            pass  # セクション行は通常の高さ
-        else:
-            ws.row_dimensions[row_idx].height = row_height
-
-        for col_idx, value in enumerate(row_data, 1):
-            cell = ws.cell(row=row_idx, column=col_idx, value=value)
-            if row_data[0].startswith("【"):
-                apply_section_style(cell)
-            else:
-                apply_normal_style(cell)
-                cell.alignment = Alignment(horizontal='center', vertical='center')
-                # 状態に応じて色分け
-                if col_idx == 6:  # 状態列
-                    if value == "既存":
-                        cell.fill = PatternFill(start_color="C6EFCE", end_color="C6EFCE", fill_type="solid")
-                    elif value == "要作成":
-                        cell.fill = PatternFill(start_color="FFEB9C", end_color="FFEB9C", fill_type="solid")
-                    elif value == "未作成":
-                        cell.fill = PatternFill(start_color="FFC7CE", end_color="FFC7CE", fill_type="solid")
-
-    # 画像挿入を試みる
-    image_path = os.path.join(ASSET_BASE, "sakana", "sakana_normal.png")
-    if os.path.exists(image_path):
-        try:
-            img = XLImage(image_path)
-            max_width = 120
-            ratio = max_width / img.width
-            img.width = max_width
-            img.height = int(img.height * ratio)
-            ws.add_image(img, "B3")
-            ws.cell(row=3, column=3).value = f"{img.width}x{img.height}"
-        except Exception as e:
-            ws.cell(row=3, column=2).value = f"（エラー: {e}）"
-    else:
-        ws.cell(row=3, column=2).value = "（未検出）"
+    # Sprites フォルダの全画像のサムネイル（ストリーミングモードでは書いた後のセルを変えられないので、先に用意する）
+    sprite_paths = collect_sprite_images()
+    thumbnails = build_thumbnails(sprite_paths, workers)
+    by_name = {}
+    for path in sprite_paths:
+        by_name.setdefault(os.path.basename(path), path)
+    if "sakana_normal.png" not in by_name and os.path.exists(FALLBACK_FISH_PATH):
+        by_name["sakana_normal.png"] = FALLBACK_FISH_PATH
+        thumbnails.update(build_thumbnails([FALLBACK_FISH_PATH], 1))
+
+    # 一覧にない Sprites の画像は末尾にまとめて載せる
+    listed = {row[0] for row in images}
+    others = [path for path in sprite_paths if os.path.basename(path) not in listed]
+    if others:
+        images.append(("", "", "", "", "", "", ""))
+        images.append(("【Sprites フォルダ】", "", "", "", "", "", ""))
+        for path in others:
+            name = os.path.relpath(path, SPRITES_DIR).replace(os.sep, "/")
+            images.append((name, "", "─", "", "", "既存", ""))
 
-    return ws
+    row_height = 80  # 画像用に行を高く
+    for row_data in images:
+        if row_data[0].startswith("【"):
+            sheet.append(row_data, [STYLE_SECTION] * len(row_data))
+            continue
+
+        image_path = by_name.get(os.path.basename(row_data[0])) if row_data[0] else None
+        thumbnail = thumbnails.get(image_path)
+        if row_data[0] and thumbnail is None:
+            row_data = (row_data[0], "（未検出）") + tuple(row_data[2:])
+        elif thumbnail is not None:
+            row_data = (row_data[0], "", "{}x{}".format(*thumbnail["size"])) + tuple(row_data[3:])
+
+        styles = [STYLE_CENTER] * len(row_data)
+        styles[5] = status_style(row_data[5], STYLE_CENTER)  # 状態列は色分け
+        # セクション行・空行は通常の高さ
+        row = sheet.append(row_data, styles, height=row_height if row_data[0] else None)
+        if thumbnail is not None:
+            try:
+                sheet.add_image(thumbnail_image(thumbnail), f"B{row}")
+            except Exception as e:
+                print(f"Warning: {row_data[0]} のサムネイルを埋め込めません: {e}")
+
+    return sheet.ws
 
 # ============================================
 # シート5: サウンドアセット
 # ============================================
 def create_sound_assets_sheet(wb):
-    ws = wb.create_sheet("05_サウンドアセット")
+    sheet = SheetWriter(wb, "05_サウンドアセット", [25, 10, 10, 25, 25, 10, 30])
 
     headers = ["ファイル名", "種別", "長さ", "用途", "再生タイミング", "状態", "備考"]
-    set_column_widths(ws, [25, 10, 10, 25, 25, 10, 30])
-
-    for col, header in enumerate(headers, 1):
-        cell = ws.cell(row=1, column=col, value=header)
-        apply_header_style(cell)
+    sheet.header(headers)
 
     # サウンドアセットデータ
     sounds = [
@@ -317,53 +510,271 @@ def create_sound_assets_sheet(wb):
         ("voice_gameover.wav", "Voice", "─", "ゲームオーバーボイス", "GameOver時", "将来", ""),
     ]
 
-    for row_idx, row_data in enumerate(sounds, 2):
-        for col_idx, value in enumerate(row_data, 1):
-            cell = ws.cell(row=row_idx, column=col_idx, value=value)
-            if row_data[0].startswith("【"):
-                apply_section_style(cell)
+    for row_data in sounds:
+        if row_data[0].startswith("【"):
+            styles = [STYLE_SECTION] * len(row_data)
+        else:
+            styles = [STYLE_NORMAL] * len(row_data)
+            styles[5] = status_style(row_data[5])  # 状態列は色分け
+        sheet.append(row_data, styles)
+
+    return sheet.ws
+
+# ============================================
+# シート6・7: CSVデータ（全行をそのまま書き出す）
+# ============================================
+def create_csv_sheet(wb, title, csv_path, widths):
+    """
+    Resources の CSV を1行ずつ書き出す
+    "#" で始まる行はコメント（セクション見出し）として扱う
+    """
+    sheet = SheetWriter(wb, title, widths)
+    if not os.path.exists(csv_path):
+        sheet.header(["（未検出）"])
+        return sheet.ws
+
+    with open(csv_path, encoding="utf-8-sig", newline="") as f:
+        reader = csv.reader(f)
+        headers = next(reader, [])
+        sheet.header(headers)
+        for values in reader:
+            if not values:
+                continue
+            if values[0].startswith("#"):
+                comment = ",".join(values).lstrip("#").strip()
+                if comment.strip("="):
+                    sheet.append([comment] + [""] * (len(headers) - 1), [STYLE_SECTION] * len(headers))
+                continue
+            values = (values + [""] * len(headers))[:len(headers)]
+            sheet.append(values, [STYLE_NORMAL] * len(headers))
+
+    return sheet.ws
+
+def create_text_data_sheet(wb):
+    return create_csv_sheet(wb, "06_テキストデータ", os.path.join(RESOURCES_DIR, "TextData.csv"),
+                            [15, 15, 25, 50])
+
+def create_ui_layout_sheet(wb):
+    return create_csv_sheet(wb, "07_UIレイアウト", os.path.join(RESOURCES_DIR, "UILayoutData.csv"),
+                            [25] + [10] * 9 + [20])
+
+# ============================================
+# シート8: 更新履歴（specification_update_*.txt）
+# ============================================
+def collect_update_notes():
+    """docs/specification_update_*.txt をファイル名順（日付順）で返す"""
+    return sorted(glob.glob(UPDATE_NOTES_PATTERN))
+
+def parse_update_notes(path):
+    """
+    仕様書追記内容のテキストを (日付, 区分, 対象, 内容) の行にする
+      ==== で囲まれた部分   タイトル（日付を取り出す）・末尾の案内文
+      【...】               区分
+      ■ ...                 対象
+      - ... / 1. ...        内容
+    """
+    date = ""
+    match = re.search(r"(\d{4})(\d{2})(\d{2})", os.path.basename(path))
+    if match:
+        date = "/".join(match.groups())
+
+    rows = []
+    section = target = ""
+    in_fence = False
+    with open(path, encoding="utf-8-sig") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith("===="):
+                in_fence = not in_fence
+                continue
+            if in_fence:
+                match = re.search(r"\((\d{4}/\d{1,2}/\d{1,2})\)", line)
+                if match:
+                    date = match.group(1)
+                continue
+            if line.startswith("【") and line.endswith("】"):
+                section, target = line[1:-1], ""
+            elif line.startswith("■"):
+                target = line[1:].strip()
             else:
-                apply_normal_style(cell)
-                # 状態に応じて色分け
-                if col_idx == 6:  # 状態列
-                    if value == "既存":
-                        cell.fill = PatternFill(start_color="C6EFCE", end_color="C6EFCE", fill_type="solid")
-                    elif value == "要作成":
-                        cell.fill = PatternFill(start_color="FFEB9C", end_color="FFEB9C", fill_type="solid")
-                    elif value == "未作成":
-                        cell.fill = PatternFill(start_color="FFC7CE", end_color="FFC7CE", fill_type="solid")
-
-    return ws
+                content = re.sub(r"^(-|\d+\.)\s*", "", line)
+                rows.append((date, section, target, content))
+    return rows
+
+def create_update_notes_sheet(wb):
+    sheet = SheetWriter(wb, "08_更新履歴", [12, 16, 22, 70, 32])
+
+    headers = ["日付", "区分", "対象", "内容", "出典"]
+    sheet.header(headers)
+
+    for path in collect_update_notes():
+        name = os.path.basename(path)
+        for date, section, target, content in parse_update_notes(path):
+            sheet.append((date, section, target, content, name), [STYLE_NORMAL] * len(headers))
+
+    return sheet.ws
 
 # ============================================
-# メイン処理
+# 差分生成（シートごとの入力ハッシュ）
 # ============================================
-def main():
-    print("Sabake_osakana 仕様書を生成中...")
+# 全シート共通の書き出しコード（変わったら全シートを作り直す）
+COMMON_CODE = (create_named_styles, status_style, SheetWriter)
+
+def sheet_registry(workers=None):
+    """
+    シートの一覧（並び順）と、それぞれの生成関数・生成コード・入力ファイル
+    手書きのデータは生成関数のコード自体が入力になる
+    依存関係シートは Assets/ の GUID 索引（unity_asset_index）の内容が入力になる
+    """
+    index = scan_assets()
+    return [
+        {"title": "01_全体概要", "build": create_overview_sheet,
+         "code": [create_overview_sheet], "inputs": []},
+        {"title": "02_ファイル依存関係", "build": lambda wb: create_dependencies_sheet(wb, index),
+         "code": [create_dependencies_sheet, dependency_rows], "inputs": [],
+         "params": [index.digest(), PLANNED_FILES, DEPENDENCY_SECTIONS, THIRD_PARTY_DIRS]},
+        {"title": "03_画面遷移", "build": create_screen_flow_sheet,
+         "code": [create_screen_flow_sheet], "inputs": []},
+        {"title": "04_画像アセット", "build": lambda wb: create_image_assets_sheet(wb, workers),
+         "code": [create_image_assets_sheet, collect_sprite_images, render_thumbnail, thumbnail_image],
+         "inputs": collect_sprite_images() + [FALLBACK_FISH_PATH], "params": [THUMBNAIL_SIZE, THUMBNAIL_VERSION]},
+        {"title": "05_サウンドアセット", "build": create_sound_assets_sheet,
+         "code": [create_sound_assets_sheet], "inputs": []},
+        {"title": "06_テキストデータ", "build": create_text_data_sheet,
+         "code": [create_text_data_sheet, create_csv_sheet],
+         "inputs": [os.path.join(RESOURCES_DIR, "TextData.csv")]},
+        {"title": "07_UIレイアウト", "build": create_ui_layout_sheet,
+         "code": [create_ui_layout_sheet, create_csv_sheet],
+         "inputs": [os.path.join(RESOURCES_DIR, "UILayoutData.csv")]},
+        {"title": "08_更新履歴", "build": create_update_notes_sheet,
+         "code": [create_update_notes_sheet, parse_update_notes],
+         "inputs": collect_update_notes()},
+    ]
+
+def sheet_source_hash(entry):
+    """シートの生成コード・パラメータ・入力ファイルの内容から作るハッシュ"""
+    digest = hashlib.sha256()
+    for obj in list(COMMON_CODE) + entry["code"]:
+        digest.update(inspect.getsource(obj).encode("utf-8"))
+    digest.update(repr(entry.get("params")).encode("utf-8"))
+    for path in entry["inputs"]:
+        digest.update(os.path.basename(path).encode("utf-8"))
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(chunk)
+        else:
+            digest.update(b"<missing>")
+    return digest.hexdigest()
+
+def read_source_hashes(wb):
+    """非表示シートに保存した {シート名: ハッシュ}"""
+    if HASH_SHEET not in wb.sheetnames:
+        return {}
+    return {title: value for title, value in wb[HASH_SHEET].iter_rows(values_only=True) if title}
+
+def write_source_hashes(wb, hashes):
+    if HASH_SHEET in wb.sheetnames:
+        wb.remove(wb[HASH_SHEET])
+    ws = wb.create_sheet(HASH_SHEET)
+    ws.sheet_state = "hidden"
+    for title, value in hashes.items():
+        ws.append([title, value])
+
+def build_workbook(registry, streaming=False):
+    """全シートを作り直す"""
+    wb = new_workbook(streaming=streaming)
+    hashes = {}
+    for entry in registry:
+        with span(f"sheet {entry['title']}"):
+            entry["build"](wb)
+        hashes[entry["title"]] = sheet_source_hash(entry)
+    write_source_hashes(wb, hashes)
+    return wb
+
+def patch_workbook(wb, registry):
+    """
+    入力ハッシュが変わったシートだけ作り直して既存のブックに差し込む
+    Returns:
+        作り直したシート名のリスト
+    """
+    register_named_styles(wb)
+    old_hashes = read_source_hashes(wb)
+    hashes = {}
+    rebuilt = []
+    for entry in registry:
+        title = entry["title"]
+        hashes[title] = sheet_source_hash(entry)
+        if title in wb.sheetnames and old_hashes.get(title) == hashes[title]:
+            continue
+        if title in wb.sheetnames:
+            wb.remove(wb[title])
+        with span(f"sheet {title}"):
+            entry["build"](wb)
+        rebuilt.append(title)
+
+    if rebuilt or set(old_hashes) != set(hashes):
+        # 一覧にないシート（削除されたシート）を外し、並び順を一覧に合わせる
+        order = [entry["title"] for entry in registry] + [HASH_SHEET]
+        for ws in list(wb.worksheets):
+            if ws.title not in order:
+                wb.remove(ws)
+                rebuilt.append(ws.title)
+        write_source_hashes(wb, hashes)
+        wb._sheets.sort(key=lambda ws: order.index(ws.title))
+        wb.active = 0
+    return rebuilt
 
-    wb = Workbook()
+# ============================================
+# メイン処理
+# ============================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sabake_osakana 仕様書Excel生成")
+    parser.add_argument("--output", default=OUTPUT_PATH, help="出力先")
+    parser.add_argument("--streaming", action="store_true",
+                        help="write-only モードで1行ずつ書き出す（行数が多いとき用）")
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+                        help="サムネイル生成のプロセス数（既定: CPUコア数）")
+    parser.add_argument("--incremental", action="store_true",
+                        help="入力が変わったシートだけ作り直して既存の仕様書に差し込む")
+    args = parser.parse_args(argv)
 
-    # 各シート作成
-    create_overview_sheet(wb)
-    create_dependencies_sheet(wb)
-    create_screen_flow_sheet(wb)
-    create_image_assets_sheet(wb)
-    create_sound_assets_sheet(wb)
+    print("Sabake_osakana 仕様書を生成中...")
+    with span("sheet_registry"):
+        registry = sheet_registry(args.jobs)
+
+    if args.incremental and os.path.exists(args.output):
+        # 差し込みはセルを書き換えるため、ストリーミングモードは使わない
+        with span("xlsx_load"):
+            wb = load_workbook(args.output)
+        rebuilt = patch_workbook(wb, registry)
+        if not rebuilt:
+            print(f"✓ 変更なし（スキップ）: {args.output}")
+            return
+        print(f"作り直したシート: {', '.join(rebuilt)}")
+    else:
+        wb = build_workbook(registry, streaming=args.streaming)
 
     # 出力ディレクトリ確認
-    output_dir = os.path.dirname(OUTPUT_PATH)
-    if not os.path.exists(output_dir):
+    output_dir = os.path.dirname(args.output)
+    if output_dir and not os.path.exists(output_dir):
         os.makedirs(output_dir)
 
     # 保存
-    wb.save(OUTPUT_PATH)
-    print(f"✓ 仕様書を生成しました: {OUTPUT_PATH}")
+    with span("xlsx_save"):
+        wb.save(args.output)
+    print(f"✓ 仕様書を生成しました: {args.output}")
     print("\nシート構成:")
     print("  01_全体概要       - プロジェクト基本情報")
     print("  02_ファイル依存関係 - スクリプト/Prefab/シーンの関係")
     print("  03_画面遷移       - シーン間の遷移フロー")
     print("  04_画像アセット    - 画像ファイル一覧（プレビュー付き）")
     print("  05_サウンドアセット - BGM/SE/ボイス一覧")
+    print("  06_テキストデータ  - TextData.csv の全行")
+    print("  07_UIレイアウト    - UILayoutData.csv の全行")
+    print("  08_更新履歴       - specification_update_*.txt の内容")
 
 if __name__ == "__main__":
     main()
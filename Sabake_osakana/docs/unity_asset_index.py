@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+"""
+Unity の Assets/ 以下の GUID とアセット間の参照を索引にするスクリプト
+（仕様書の 02_ファイル依存関係 シートの元データ）
+
+  *.meta                   先頭の "guid: ..." だけを読んで GUID → アセットの対応を作る
+  シーン・Prefab などの YAML  "guid: ..." の参照をすべて拾い、依存グラフを作る
+  *.cs                     定義しているクラス名と、使っている識別子を拾う（スクリプト同士の依存）
+
+ファイルごとの解析結果はサイズと更新時刻をキーにキャッシュ（docs/.asset_index_cache.json）し、
+変わったファイルだけを読み直す。
+
+使い方:
+  python unity_asset_index.py                                  # 件数と所要時間
+  python unity_asset_index.py --deps Assets/Scenes/SampleScene.unity
+  python unity_asset_index.py --rdeps Assets/Scripts/BallController.cs
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import time
+
+DOCS_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.normpath(os.path.join(DOCS_DIR, ".."))
+ASSETS_DIR = os.path.join(PROJECT_ROOT, "Assets")
+CACHE_PATH = os.path.join(DOCS_DIR, ".asset_index_cache.json")
+CACHE_VERSION = 1
+
+# テキスト YAML で保存される Unity のアセット
+YAML_EXTENSIONS = {
+    ".unity", ".prefab", ".asset", ".mat", ".controller", ".overrideController", ".anim",
+    ".playable", ".spriteatlas", ".mask", ".physicsMaterial2D", ".physicMaterial", ".lighting",
+    ".preset", ".mixer", ".guiskin", ".fontsettings", ".renderTexture", ".terrainlayer",
+}
+SCRIPT_EXTENSION = ".cs"
+
+# .meta の GUID は2行目にあるので先頭だけ読めば足りる
+META_HEAD_BYTES = 256
+
+GUID_PATTERN = re.compile(rb"guid: ([0-9a-f]{32})")
+CLASS_PATTERN = re.compile(rb"\b(?:class|struct|enum|interface)\s+([A-Za-z_]\w*)")
+IDENTIFIER_PATTERN = re.compile(rb"\b[A-Z]\w*\b")
+COMMENT_PATTERN = re.compile(rb"//[^\n]*|/\*.*?\*/", re.S)
+
+
+def iter_files(root):
+    """
+    root 以下のファイルを (プロジェクト相対パス, DirEntry) で返す
+    Unity が無視するフォルダ（"." で始まる・"~" で終わる）は辿らない
+    """
+    stack = [root]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.name.startswith(".") or entry.name.endswith("~"):
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    rel = os.path.relpath(entry.path, PROJECT_ROOT).replace(os.sep, "/")
+                    yield rel, entry
+
+
+def file_kind(path):
+    if path.endswith(".meta"):
+        return "meta"
+    ext = os.path.splitext(path)[1]
+    if ext == SCRIPT_EXTENSION:
+        return "script"
+    if ext in YAML_EXTENSIONS:
+        return "yaml"
+    return None
+
+
+def parse_file(path, kind):
+    """ファイル1つを解析してキャッシュに入れる値を返す"""
+    if kind == "meta":
+        with open(path, "rb") as f:
+            match = GUID_PATTERN.search(f.read(META_HEAD_BYTES))
+        return match.group(1).decode() if match else None
+
+    with open(path, "rb") as f:
+        data = f.read()
+    if kind == "yaml":
+        # バイナリ形式で保存されたアセットは読まない
+        if not data.startswith(b"%YAML"):
+            return []
+        return sorted({m.decode() for m in GUID_PATTERN.findall(data)})
+
+    code = COMMENT_PATTERN.sub(b"", data)
+    return {
+        "defines": sorted({m.decode() for m in CLASS_PATTERN.findall(code)}),
+        "identifiers": sorted({m.decode() for m in IDENTIFIER_PATTERN.findall(code)}),
+    }
+
+
+class AssetIndex:
+    """GUID とアセット間の依存関係の索引"""
+
+    def __init__(self, entries):
+        self.guid_to_path = {}
+        self.path_to_guid = {}
+        self.assets = []
+        guid_refs = {}
+        scripts = {}
+        for path, (kind, value) in entries.items():
+            if kind == "meta":
+                if value:
+                    asset = path[:-len(".meta")]
+                    self.guid_to_path[value] = asset
+                    self.path_to_guid[asset] = value
+            else:
+                self.assets.append(path)
+                if kind == "yaml":
+                    guid_refs[path] = value
+                elif kind == "script":
+                    scripts[path] = value
+        self.assets.sort()
+
+        # クラス名 → 定義しているスクリプト（同名が複数あれば先に見つかった方）
+        self.class_to_script = {}
+        for path in sorted(scripts):
+            for name in scripts[path]["defines"]:
+                self.class_to_script.setdefault(name, path)
+
+        self.dependencies = {}
+        self.unresolved = {}
+        for path, guids in guid_refs.items():
+            deps = {self.guid_to_path[g] for g in guids if g in self.guid_to_path}
+            deps.discard(path)
+            self.dependencies[path] = sorted(deps)
+            self.unresolved[path] = [g for g in guids if g not in self.guid_to_path]
+        for path, info in scripts.items():
+            deps = {self.class_to_script[name] for name in info["identifiers"]
+                    if name in self.class_to_script}
+            deps.discard(path)
+            self.dependencies[path] = sorted(deps)
+
+        self.dependents = {}
+        for path, deps in self.dependencies.items():
+            for dep in deps:
+                self.dependents.setdefault(dep, []).append(path)
+        for users in self.dependents.values():
+            users.sort()
+
+    def deps(self, path):
+        return self.dependencies.get(path, [])
+
+    def rdeps(self, path):
+        return self.dependents.get(path, [])
+
+    def digest(self):
+        """アセットの一覧と依存関係から作るハッシュ（仕様書の差分生成用）"""
+        data = json.dumps([self.assets, self.dependencies], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+    def find(self, directory=None, extension=None):
+        """条件に合うアセットのパス（名前順）"""
+        prefix = directory.rstrip("/") + "/" if directory else ""
+        return [p for p in self.assets
+                if p.startswith(prefix) and (extension is None or p.endswith(extension))]
+
+
+def load_cache(cache_path):
+    try:
+        with open(cache_path, encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return cache.get("files", {}) if cache.get("version") == CACHE_VERSION else {}
+
+
+def scan_assets(assets_dir=ASSETS_DIR, cache_path=CACHE_PATH):
+    """
+    Assets/ 以下を走査して AssetIndex を返す
+    サイズと更新時刻がキャッシュと同じファイルは読まない
+    """
+    cache = load_cache(cache_path) if cache_path else {}
+    files = {}
+    entries = {}
+    parsed = 0
+    for rel, entry in iter_files(assets_dir):
+        kind = file_kind(rel)
+        if kind is None:
+            continue
+        st = entry.stat()
+        cached = cache.get(rel)
+        if cached and cached[0] == st.st_size and cached[1] == st.st_mtime_ns:
+            value = cached[2]
+        else:
+            value = parse_file(entry.path, kind)
+            parsed += 1
+        files[rel] = [st.st_size, st.st_mtime_ns, value]
+        entries[rel] = (kind, value)
+
+    if cache_path and (parsed or len(files) != len(cache)):
+        tmp_path = cache_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": CACHE_VERSION, "files": files}, f, ensure_ascii=False)
+        os.replace(tmp_path, cache_path)
+
+    index = AssetIndex(entries)
+    index.parsed = parsed
+    return index
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Unity アセットの GUID 索引と依存関係")
+    parser.add_argument("--deps", help="このアセットが参照しているアセット")
+    parser.add_argument("--rdeps", help="このアセットを参照しているアセット")
+    parser.add_argument("--no-cache", action="store_true", help="キャッシュを使わずに全ファイルを読む")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    index = scan_assets(cache_path=None if args.no_cache else CACHE_PATH)
+    elapsed = time.perf_counter() - start
+    print(f"アセット {len(index.assets)}件、GUID {len(index.guid_to_path)}件 "
+          f"（読み直し {index.parsed}件、{elapsed * 1000:.0f}ms）")
+
+    for label, path, paths in (("参照先", args.deps, index.deps(args.deps) if args.deps else None),
+                               ("参照元", args.rdeps, index.rdeps(args.rdeps) if args.rdeps else None)):
+        if path is None:
+            continue
+        print(f"{path} の{label}: {len(paths)}件")
+        for p in paths:
+            print(f"  {p}")
+
+
+if __name__ == "__main__":
+    main()